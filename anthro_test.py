@@ -1,47 +1,75 @@
 """
 Test script for Claude-based recipe analysis
 Now actually using Anthropic's Claude API!
+
+Pass --base-url URL to send the requests somewhere else, e.g. a local
+anthropic_stub.py.
 """
 import os
+import sys
 from dotenv import load_dotenv
 import anthropic
 import json
 
+from claude_accounting import recipe_scope, run_summary
+from model_tiers import get_default_router
+from recipe_schemas import make_tool, parse_quality_errors
+
 load_dotenv()
 
 client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
-MODELID = "claude-sonnet-4-20250514"
-
-
-def _call_claude(prompt: str) -> dict:
-    """Make a Claude API call and return parsed JSON response"""
-    response = client.messages.create(
-        model=MODELID,
-        max_tokens=4096,
-        messages=[
-            {
-                "role": "user",
-                "content": prompt + "\n\nRespond with valid JSON only, no markdown formatting."
-            }
-        ]
-    )
-    
-    text = response.content[0].text
-    
-    # Clean up potential markdown code blocks
-    if text.startswith("```"):
-        text = text.split("\n", 1)[1]
-        if text.endswith("```"):
-            text = text[:-3]
-        elif "```" in text:
-            text = text.rsplit("```", 1)[0]
-    
-    return json.loads(text.strip())
+
+
+ANALYZE_TOOL = make_tool("record_analysis", "Record the recipe analysis.", {
+    "type": "object",
+    "properties": {
+        "ingredients": {"type": "array", "items": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "amount": {"type": ["number", "null"]},
+                "unit": {"type": "string"},
+                "notes": {"type": "string"},
+            },
+            "required": ["name", "amount", "unit"],
+        }},
+        "servings": {"type": "number"},
+        "meal_type": {"type": "string"},
+        "portion_size": {"type": "string"},
+        "calories_per_serving": {"type": "number"},
+    },
+    "required": ["ingredients", "servings"],
+})
+
+SCALE_TOOL = make_tool("record_scaled", "Record the scaled recipe and shopping list.", {
+    "type": "object",
+    "properties": {
+        "scaled_ingredients": {"type": "array", "items": {"type": "object"}},
+        "shopping_list": {"type": "array", "items": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "amount": {"type": "number"},
+                "units": {"type": "string"},
+                "notes": {"type": "string"},
+            },
+            "required": ["name", "amount", "units"],
+        }},
+        "storage_tips": {"type": "object", "additionalProperties": {"type": "string"}},
+        "estimated_cost": {"type": "number"},
+    },
+    "required": ["shopping_list", "estimated_cost"],
+})
+
+
+def _call_claude(prompt: str, tool: dict, check=None) -> dict:
+    """Make a Claude API call answered through tool and return its validated input; with check, try the fast model first"""
+    return get_default_router().complete_tool(client, prompt, tool, check=check, max_tokens=4096)
 
 
 def analyze_recipe(recipe_text: str) -> dict:
     """Analyze recipe for ingredients, serving size, and scaling information."""
-    prompt = f"""Analyze this recipe and provide the following information in JSON format:
+    prompt = f"""Analyze this recipe and provide the following information:
 1. List of ingredients with:
    - name
    - amount
@@ -52,7 +80,7 @@ def analyze_recipe(recipe_text: str) -> dict:
 4. Portion size per serving
 5. Estimated calories per serving
 
-Format your response as a JSON object with these keys:
+Record it with the record_analysis tool, using these keys:
 - ingredients: array of ingredient objects
 - servings: number
 - meal_type: string
@@ -62,7 +90,7 @@ Format your response as a JSON object with these keys:
 Recipe text:
 {recipe_text}"""
     
-    return _call_claude(prompt)
+    return _call_claude(prompt, ANALYZE_TOOL, check=parse_quality_errors)
 
 
 def scale_recipe(recipe_data: dict, target_meals: int) -> dict:
@@ -78,7 +106,7 @@ Calculate the new quantities needed and provide:
 3. Storage recommendations for bulk ingredients
 4. Estimated total cost
 
-Format as JSON with these keys:
+Record it with the record_scaled tool, using these keys:
 - scaled_ingredients: array of adjusted ingredients
 - shopping_list: array of optimized items to buy (each with: name, amount, units, notes)
 - storage_tips: object with storage advice
@@ -90,45 +118,50 @@ Consider:
 - Common store quantities
 - Ingredient shelf life"""
     
-    return _call_claude(prompt)
+    return _call_claude(prompt, SCALE_TOOL)
 
 
 def process_recipe(recipe_text: str, meals_per_week: int = 7):
     """Main function to analyze and scale recipe."""
-    print("Analyzing recipe with Claude...")
-    recipe_data = analyze_recipe(recipe_text)
+    # Recipes here are text, so their first line stands in for the URL in the call log
+    with recipe_scope((recipe_text.strip().splitlines() or ['recipe'])[0].strip()):
+        print("Analyzing recipe with Claude...")
+        recipe_data = analyze_recipe(recipe_text)
     
-    print("\nOriginal Recipe Analysis:")
-    print(f"Serves: {recipe_data.get('servings', 'Unknown')} people")
-    print(f"Meal Type: {recipe_data.get('meal_type', 'Unknown')}")
-    print(f"Calories per serving: {recipe_data.get('calories_per_serving', 'Unknown')}")
+        print("\nOriginal Recipe Analysis:")
+        print(f"Serves: {recipe_data.get('servings', 'Unknown')} people")
+        print(f"Meal Type: {recipe_data.get('meal_type', 'Unknown')}")
+        print(f"Calories per serving: {recipe_data.get('calories_per_serving', 'Unknown')}")
     
-    servings_needed = meals_per_week
-    print(f"\nScaling recipe for {servings_needed} meals...")
+        servings_needed = meals_per_week
+        print(f"\nScaling recipe for {servings_needed} meals...")
     
-    scaled_data = scale_recipe(recipe_data, servings_needed)
+        scaled_data = scale_recipe(recipe_data, servings_needed)
     
-    print("\nScaled Recipe Information:")
-    print("\nShopping List:")
-    for item in scaled_data.get('shopping_list', []):
-        if isinstance(item, dict):
-            print(f"- {item.get('name', 'Unknown')}: {item.get('amount', '')} {item.get('units', '')}")
-        else:
-            print(f"- {item}")
+        print("\nScaled Recipe Information:")
+        print("\nShopping List:")
+        for item in scaled_data.get('shopping_list', []):
+            if isinstance(item, dict):
+                print(f"- {item.get('name', 'Unknown')}: {item.get('amount', '')} {item.get('units', '')}")
+            else:
+                print(f"- {item}")
     
-    print("\nStorage Tips:")
-    for ingredient, tip in scaled_data.get('storage_tips', {}).items():
-        print(f"- {ingredient}: {tip}")
+        print("\nStorage Tips:")
+        for ingredient, tip in scaled_data.get('storage_tips', {}).items():
+            print(f"- {ingredient}: {tip}")
     
-    print(f"\nEstimated Total Cost: ${scaled_data.get('estimated_cost', 0):.2f}")
+        print(f"\nEstimated Total Cost: ${scaled_data.get('estimated_cost', 0):.2f}")
     
-    return {
-        'original_recipe': recipe_data,
-        'scaled_recipe': scaled_data
-    }
+        return {
+            'original_recipe': recipe_data,
+            'scaled_recipe': scaled_data
+        }
 
 
 if __name__ == "__main__":
+    if '--base-url' in sys.argv[:-1]:
+        client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'),
+                                     base_url=sys.argv[sys.argv.index('--base-url') + 1])
     example_recipe = """
     Classic Chicken Stir-Fry
     
@@ -151,3 +184,5 @@ if __name__ == "__main__":
     print("\n" + "="*50)
     print("Full Result:")
     print(json.dumps(result, indent=2))
+    print(f"Model tiers: {json.dumps(get_default_router().summary(), indent=2)}")
+    print(run_summary())
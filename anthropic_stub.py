@@ -0,0 +1,711 @@
+#!/usr/bin/env python3
+"""
+Local Anthropic API Stand-in
+Offline stand-in for the Anthropic endpoints this repo uses, so the Claude
+pipeline can be exercised without network access, an API key or cost.
+
+Implements messages.create (POST /v1/messages, streamed or not) and the
+Message Batches endpoints (create, retrieve, results). Batches report
+"in_progress" for --batch-delay seconds and then end.
+
+messages.create answers after --latency seconds (--slow-rate of them after
+--slow-latency instead, for tail latency), plus output tokens at
+--output-tps tokens per second; streamed responses send their first token
+after the latency and the rest at that rate. With --rpm/--tpm it enforces
+per-minute limits the way the API does: over-limit requests get a 429 with
+Retry-After. --error-rate fails that fraction of requests with one of
+--error-statuses (500 and 529 by default). Answers longer than the request's
+max_tokens, or --max-output-tokens, are cut off there with stop_reason
+"max_tokens", keeping the finished part of a tool answer.
+
+Answers come from a --replay file of recorded responses keyed by a hash of
+the request, when it has one. Otherwise they are made locally: parse prompts
+run the ingredient-line parser over the recipe text and scale prompts run
+the local scaler, so responses have the JSON shapes the pipeline expects.
+Requests that force a tool get the answer as that tool's input. With
+--upstream, misses go to the real API instead (using the caller's API key),
+and --record appends new answers to the replay file, so a run against the
+real API can be replayed offline. --strict answers misses with a 404.
+
+Usage:
+    python anthropic_stub.py [--port 8765] [--batch-delay 2] [--latency 0.5] [--output-tps 80]
+        [--slow-rate 0.05 --slow-latency 5] [--error-rate 0.02 --error-statuses 500,529]
+        [--rpm 50] [--tpm 40000] [--burst 10] [--max-output-tokens 300] [--replay calls.jsonl [--record] [--upstream URL] [--strict]]
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=stub \\
+        python recipe_cli.py --batch urls.txt
+"""
+import re
+import json
+import time
+import random
+import uuid
+import hashlib
+import argparse
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from ingredients import parse_ingredient_line
+from json_stream import salvage_json
+from rate_limiter import TokenBucket, DEFAULT_BURST_SECONDS
+from recipe_locator import CHARS_PER_TOKEN, estimate_tokens
+from recipe_scaler import scale_locally
+
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_DELAY = 2.0
+DEFAULT_LATENCY = 0.0
+DEFAULT_SLOW_LATENCY = 5.0
+DEFAULT_ERROR_STATUSES = (500, 529)
+DEFAULT_UPSTREAM_TIMEOUT = 600
+
+# Characters of text or tool-input JSON per streamed delta
+STREAM_CHUNK_CHARS = 16
+
+ERROR_TYPES = {
+    400: "invalid_request_error",
+    404: "not_found_error",
+    429: "rate_limit_error",
+    500: "api_error",
+    503: "api_error",
+    529: "overloaded_error",
+}
+
+_SERVINGS_RE = re.compile(r'\b(?:serves|servings|yield|makes)\b\D{0,20}(\d+)', re.IGNORECASE)
+_TARGET_RE = re.compile(r'(?:to|Requested servings:)\s*(\d+)(?:\s*servings)?', re.IGNORECASE)
+_RECIPE_HEADER_RE = re.compile(r'^Recipe(?: text| data)?:\s*', re.IGNORECASE | re.MULTILINE)
+# claude_client's continuation prompt, listing the items an answer cut off at max_tokens already has
+_RECEIVED_RE = re.compile(r'cut off at the output limit after these items:\n((?:- .*\n?)+)')
+
+
+def _text_of(content) -> str:
+    if isinstance(content, str):
+        return content
+    return '\n'.join(block.get('text', '') for block in content or [] if isinstance(block, dict))
+
+
+def _recipe_section(text: str) -> str:
+    match = None
+    for match in _RECIPE_HEADER_RE.finditer(text):
+        pass
+    return text[match.end():] if match else text
+
+
+def stub_parse(text: str) -> Dict:
+    """Parse-prompt answer: ingredient lines run through parse_ingredient_line"""
+    lines = [line.strip() for line in _recipe_section(text).splitlines() if line.strip()]
+    ingredients = []
+    for line in lines:
+        parsed = parse_ingredient_line(line)
+        if parsed['amount'] is not None and parsed['name']:
+            ingredients.append(parsed)
+    servings = _SERVINGS_RE.search(text)
+    return {
+        "recipe_name": lines[0][:80] if lines else "Recipe",
+        "original_servings": int(servings.group(1)) if servings else 4,
+        "ingredients": ingredients,
+    }
+
+
+def stub_scale(text: str) -> Dict:
+    """Scale-prompt answer: the recipe JSON run through scale_locally"""
+    section = _recipe_section(text)
+    try:
+        recipe = json.loads(section[section.index('{'):section.rindex('}') + 1])
+    except ValueError:
+        recipe = {}
+    target = _TARGET_RE.findall(text)
+    scaled, _ = scale_locally(recipe, int(target[-1]) if target else 4)
+    return scaled
+
+
+def _without_received(answer: Dict, text: str) -> Dict:
+    """A continuation's answer: answer minus the array items the request says were received"""
+    match = _RECEIVED_RE.search(text)
+    if not match:
+        return answer
+    for line in match.group(1).splitlines():
+        path, _, names = line[2:].partition(': ')
+        node = answer
+        for key in path.split('.')[:-1]:
+            node = node.get(key) if isinstance(node, dict) else None
+        key = path.split('.')[-1]
+        if isinstance(node, dict) and isinstance(node.get(key), list):
+            received = set(names.split(', '))
+            node[key] = [item for item in node[key] if not (isinstance(item, dict) and item.get('name') in received)]
+    return answer
+
+
+def stub_reply(params: Dict) -> str:
+    """Deterministic response text for a messages.create request body"""
+    system = _text_of(params.get('system'))
+    user = _text_of((params.get('messages') or [{}])[-1].get('content'))
+    instructions = f"{system}\n{user}"
+
+    if 'then scale' in instructions:
+        parsed = stub_parse(user)
+        target = _TARGET_RE.findall(user)
+        scaled, _ = scale_locally(parsed, int(target[0]) if target else 4)
+        answer = {"recipe_data": parsed, "scaled_data": scaled}
+    elif re.search(r'\bScale\b', instructions):
+        answer = stub_scale(user)
+    elif re.search(r'\bAnalyze\b', instructions):
+        answer = stub_parse(user)
+    else:
+        return "{}"
+    return json.dumps(_without_received(answer, user))
+
+
+def stub_message(params: Dict, max_output_tokens: Optional[int] = None) -> Dict:
+    """
+    A Message object answering params, cut off with stop_reason "max_tokens"
+    past params' max_tokens or max_output_tokens if that is lower.
+    """
+    text = stub_reply(params)
+    limit = min(filter(None, (params.get('max_tokens'), max_output_tokens)), default=None)
+    truncated = limit is not None and estimate_tokens(text) > limit
+    if truncated:
+        text = text[:limit * CHARS_PER_TOKEN]
+    tool_choice = params.get('tool_choice') or {}
+    if tool_choice.get('type') == 'tool':
+        try:
+            value, _ = salvage_json(text)
+        except ValueError:
+            value = {}
+        content = [{
+            "type": "tool_use",
+            "id": f"toolu_stub_{uuid.uuid4().hex[:20]}",
+            "name": tool_choice['name'],
+            "input": value,
+        }]
+        stop_reason = "tool_use"
+    else:
+        content = [{"type": "text", "text": text}]
+        stop_reason = "end_turn"
+    if truncated:
+        stop_reason = "max_tokens"
+    prompt = _text_of(params.get('system')) + ''.join(
+        _text_of(m.get('content')) for m in params.get('messages') or []
+    )
+    return {
+        "id": f"msg_stub_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": params.get('model', 'stub'),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": estimate_tokens(prompt), "output_tokens": estimate_tokens(text)},
+    }
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts is not None else None
+
+
+class StubReplay:
+    """
+    Recorded messages.create responses in a JSON-lines file, keyed by a hash
+    of the request fields that decide the answer.
+    """
+
+    KEY_FIELDS = ('model', 'system', 'messages', 'tools', 'tool_choice', 'max_tokens', 'temperature')
+
+    def __init__(self, path: str, record: bool = False):
+        """
+        Initialize the store.
+
+        Args:
+            path: JSON-lines file of {"key", "message"} records (need not exist yet)
+            record: Append answers passed to put() to the file
+        """
+        self.path = path
+        self.record = record
+        self.hits = 0
+        self.misses = 0
+        self._messages: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._messages[entry['key']] = entry['message']
+        except OSError:
+            pass
+
+    @classmethod
+    def key(cls, params: Dict) -> str:
+        """Hash of a request body; streaming and metadata don't change the answer"""
+        fields = {name: params.get(name) for name in cls.KEY_FIELDS}
+        canonical = json.dumps(fields, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, params: Dict) -> Optional[Dict]:
+        with self._lock:
+            message = self._messages.get(self.key(params))
+            if message is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return message
+
+    def put(self, params: Dict, message: Dict):
+        key = self.key(params)
+        with self._lock:
+            self._messages[key] = message
+            if self.record:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps({"key": key, "message": message}) + '\n')
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+
+class StubBatches:
+    """In-memory Message Batches store"""
+
+    def __init__(self, batch_delay: float = DEFAULT_BATCH_DELAY, replay: Optional[StubReplay] = None):
+        self.batch_delay = batch_delay
+        self.replay = replay
+        self._batches: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, requests: List[Dict]) -> str:
+        batch_id = f"msgbatch_stub_{uuid.uuid4().hex[:20]}"
+        results = []
+        for r in requests:
+            message = (self.replay.get(r['params']) if self.replay is not None else None) or stub_message(r['params'])
+            results.append({"custom_id": r['custom_id'], "result": {"type": "succeeded", "message": message}})
+        with self._lock:
+            self._batches[batch_id] = {"created": time.time(), "results": results}
+        return batch_id
+
+    def get(self, batch_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._batches.get(batch_id)
+
+    def describe(self, batch_id: str, base_url: str) -> Dict:
+        batch = self.get(batch_id)
+        created = batch['created']
+        ended = time.time() >= created + self.batch_delay
+        total = len(batch['results'])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else total,
+                "succeeded": total if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": _iso(created),
+            "expires_at": _iso(created + timedelta(days=1).total_seconds()),
+            "ended_at": _iso(created + self.batch_delay) if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+
+class StubLimits:
+    """
+    Per-minute request and token limits for messages.create; None disables a limit.
+
+    burst_seconds is how much of the budget can be spent at once; the API
+    may enforce a per-minute limit over shorter intervals.
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 burst_seconds: float = DEFAULT_BURST_SECONDS):
+        self.requests = TokenBucket(rpm, burst_seconds) if rpm else None
+        self.tokens = TokenBucket(tpm, burst_seconds) if tpm else None
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def admit(self, tokens: int) -> float:
+        """0 if the request may proceed (and is charged), else seconds until it could"""
+        with self._lock:
+            wait = max(
+                self.requests.wait_time(1) if self.requests else 0.0,
+                self.tokens.wait_time(tokens) if self.tokens else 0.0,
+            )
+            if wait > 0:
+                self.rejected += 1
+                return wait
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            return 0.0
+
+
+@dataclass
+class StubBehavior:
+    """How messages.create answers: timing, injected errors and where answers come from"""
+    latency: float = DEFAULT_LATENCY
+    slow_rate: float = 0.0
+    slow_latency: float = DEFAULT_SLOW_LATENCY
+    output_tps: Optional[float] = None
+    error_rate: float = 0.0
+    error_statuses: Sequence[int] = DEFAULT_ERROR_STATUSES
+    replay: Optional[StubReplay] = None
+    upstream: Optional[str] = None
+    strict: bool = False
+    max_output_tokens: Optional[int] = None
+
+    def first_token_delay(self) -> float:
+        return self.slow_latency if random.random() < self.slow_rate else self.latency
+
+    def generation_seconds(self, output_tokens: int) -> float:
+        return output_tokens / self.output_tps if self.output_tps else 0.0
+
+    def injected_error(self) -> Optional[int]:
+        """Status to fail this request with, or None"""
+        if self.error_rate and random.random() < self.error_rate:
+            return random.choice(list(self.error_statuses))
+        return None
+
+
+@dataclass
+class StubStats:
+    """What the stub served; service_seconds is the delay it added to simulate the API"""
+    requests: int = 0
+    replayed: int = 0
+    synthesized: int = 0
+    forwarded: int = 0
+    missed: int = 0
+    injected_errors: int = 0
+    rate_limited: int = 0
+    streamed: int = 0
+    service_seconds: float = 0.0
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        result['service_seconds'] = round(self.service_seconds, 3)
+        return result
+
+
+def _chunks(text: str, size: int = STREAM_CHUNK_CHARS) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)] or ['']
+
+
+def stream_events(message: Dict) -> List[Tuple[str, Dict, int]]:
+    """
+    The server-sent events streaming message, as (event, data, output
+    tokens it carries); the deltas together carry the message's output tokens.
+    """
+    usage = message.get('usage') or {}
+    output_tokens = usage.get('output_tokens') or 0
+    events: List[Tuple[str, Dict, int]] = [(
+        'message_start',
+        {"type": "message_start", "message": {
+            **message, "content": [], "stop_reason": None, "stop_sequence": None,
+            "usage": {**usage, "output_tokens": 1},
+        }},
+        0,
+    )]
+    deltas = []
+    for index, block in enumerate(message.get('content') or []):
+        if block.get('type') == 'tool_use':
+            start = {**block, "input": {}}
+            pieces = [("input_json_delta", "partial_json", chunk)
+                      for chunk in _chunks(json.dumps(block.get('input') or {}))]
+        else:
+            start = {**block, "text": ""}
+            pieces = [("text_delta", "text", chunk) for chunk in _chunks(block.get('text', ''))]
+        events.append(('content_block_start', {"type": "content_block_start", "index": index, "content_block": start}, 0))
+        for delta_type, field_name, chunk in pieces:
+            deltas.append(len(events))
+            events.append(('content_block_delta', {
+                "type": "content_block_delta", "index": index, "delta": {"type": delta_type, field_name: chunk},
+            }, 0))
+        events.append(('content_block_stop', {"type": "content_block_stop", "index": index}, 0))
+    # Spread the output tokens over the deltas in proportion to their length
+    total_chars = sum(len(json.dumps(events[i][1]['delta'])) for i in deltas) or 1
+    assigned = 0
+    for n, i in enumerate(deltas):
+        event, data, _ = events[i]
+        tokens = (output_tokens - assigned if n == len(deltas) - 1
+                  else round(output_tokens * len(json.dumps(data['delta'])) / total_chars))
+        assigned += tokens
+        events[i] = (event, data, tokens)
+    events.append(('message_delta', {
+        "type": "message_delta",
+        "delta": {"stop_reason": message.get('stop_reason'), "stop_sequence": message.get('stop_sequence')},
+        "usage": {"output_tokens": output_tokens},
+    }, 0))
+    events.append(('message_stop', {"type": "message_stop"}, 0))
+    return events
+
+
+def _make_handler(batches: StubBatches, limits: StubLimits, behavior: StubBehavior, stats: StubStats):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _base_url(self) -> str:
+            host, port = self.server.server_address[:2]
+            return f"http://{host}:{port}"
+
+        def _send(self, status: int, body: bytes, content_type: str = 'application/json',
+                  headers: Optional[Dict[str, str]] = None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json(self, status: int, payload: Dict):
+            self._send(status, json.dumps(payload).encode())
+
+        def _error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+            body = {"type": "error", "error": {"type": ERROR_TYPES.get(status, "api_error"), "message": message}}
+            self._send(status, json.dumps(body).encode(), headers=headers)
+
+        def _not_found(self):
+            self._error(404, self.path)
+
+        def _route(self) -> Tuple[List[str], str]:
+            path = self.path.split('?', 1)[0].rstrip('/')
+            return path.split('/'), path
+
+        def _forward(self, params: Dict) -> Tuple[int, Dict]:
+            """Ask the real API; streaming is done here, so upstream answers in one piece"""
+            headers = {name: self.headers[name] for name in ('x-api-key', 'anthropic-version', 'anthropic-beta')
+                       if self.headers.get(name)}
+            response = requests.post(
+                f"{behavior.upstream.rstrip('/')}/v1/messages",
+                json={k: v for k, v in params.items() if k != 'stream'},
+                headers=headers,
+                timeout=DEFAULT_UPSTREAM_TIMEOUT,
+            )
+            return response.status_code, response.json()
+
+        def _answer(self, params: Dict) -> Tuple[int, Optional[Dict], bool]:
+            """(status, message or error body, whether to simulate API timing)"""
+            replay = behavior.replay
+            message = replay.get(params) if replay is not None else None
+            if message is not None:
+                stats.add(replayed=1)
+                return 200, message, True
+            if behavior.upstream:
+                status, body = self._forward(params)
+                stats.add(forwarded=1)
+                if status == 200 and replay is not None:
+                    replay.put(params, body)
+                return status, body, False
+            if behavior.strict:
+                stats.add(missed=1)
+                return 404, None, False
+            message = stub_message(params, behavior.max_output_tokens)
+            stats.add(synthesized=1)
+            if replay is not None and replay.record:
+                replay.put(params, message)
+            return 200, message, True
+
+        def _stream(self, message: Dict):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            for event, data, tokens in stream_events(message):
+                delay = behavior.generation_seconds(tokens)
+                if delay:
+                    time.sleep(delay)
+                    stats.add(service_seconds=delay)
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+                self.wfile.flush()
+
+        def _create_message(self, params: Dict):
+            stats.add(requests=1)
+            status = behavior.injected_error()
+            if status:
+                stats.add(injected_errors=1)
+                self._error(status, "Injected by the stub (--error-rate)")
+                return
+            status, message, simulate = self._answer(params)
+            if status == 404 and message is None:
+                self._error(404, "No recorded response for this request (--strict)")
+                return
+            if status != 200:
+                self._json(status, message)
+                return
+
+            usage = message.get('usage') or {}
+            wait = limits.admit((usage.get('input_tokens') or 0) + (usage.get('output_tokens') or 0))
+            if wait:
+                stats.add(rate_limited=1)
+                self._error(429, "Number of requests or tokens has exceeded your rate limit", {
+                    'retry-after': str(max(1, round(wait))),
+                    'retry-after-ms': str(int(wait * 1000)),
+                })
+                return
+            delay = behavior.first_token_delay() if simulate else 0.0
+            if delay:
+                time.sleep(delay)
+                stats.add(service_seconds=delay)
+            if params.get('stream'):
+                stats.add(streamed=1)
+                self._stream(message)
+                return
+            delay = behavior.generation_seconds(usage.get('output_tokens') or 0) if simulate else 0.0
+            if delay:
+                time.sleep(delay)
+                stats.add(service_seconds=delay)
+            self._json(200, message)
+
+        def do_POST(self):
+            parts, path = self._route()
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if path == '/v1/messages':
+                self._create_message(body)
+            elif path == '/v1/messages/batches':
+                batch_id = batches.create(body.get('requests') or [])
+                self._json(200, batches.describe(batch_id, self._base_url()))
+            else:
+                self._not_found()
+
+        def do_GET(self):
+            parts, path = self._route()
+            if len(parts) >= 5 and parts[1:4] == ['v1', 'messages', 'batches'] and batches.get(parts[4]):
+                batch_id = parts[4]
+                if len(parts) == 5:
+                    self._json(200, batches.describe(batch_id, self._base_url()))
+                    return
+                if len(parts) == 6 and parts[5] == 'results':
+                    lines = '\n'.join(json.dumps(r) for r in batches.get(batch_id)['results'])
+                    self._send(200, (lines + '\n').encode(), 'application/binary')
+                    return
+            self._not_found()
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+def make_stub_server(
+    port: int = 0,
+    batch_delay: float = DEFAULT_BATCH_DELAY,
+    latency: float = DEFAULT_LATENCY,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    burst_seconds: float = DEFAULT_BURST_SECONDS,
+    slow_rate: float = 0.0,
+    slow_latency: float = DEFAULT_SLOW_LATENCY,
+    output_tps: Optional[float] = None,
+    error_rate: float = 0.0,
+    error_statuses: Sequence[int] = DEFAULT_ERROR_STATUSES,
+    replay: Optional[str] = None,
+    record: bool = False,
+    upstream: Optional[str] = None,
+    strict: bool = False,
+    max_output_tokens: Optional[int] = None,
+) -> StubServer:
+    """
+    A stub bound to 127.0.0.1:port (0 for any free port), not yet serving.
+    Its StubLimits, StubStats and StubReplay (or None) are kept as
+    server.limits, server.stats and server.replay.
+    """
+    store = StubReplay(replay, record) if replay else None
+    behavior = StubBehavior(latency, slow_rate, slow_latency, output_tps, error_rate, tuple(error_statuses),
+                            store, upstream, strict, max_output_tokens)
+    limits = StubLimits(rpm, tpm, burst_seconds)
+    stats = StubStats()
+    server = StubServer(('127.0.0.1', port), _make_handler(StubBatches(batch_delay, store), limits, behavior, stats))
+    server.limits = limits
+    server.stats = stats
+    server.replay = store
+    return server
+
+
+def start_stub_server(port: int = 0, **options) -> StubServer:
+    """
+    Start a background stub (options as make_stub_server); point
+    ANTHROPIC_BASE_URL at http://127.0.0.1:<server.server_address[1]>.
+    """
+    server = make_stub_server(port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--batch-delay', type=float, default=DEFAULT_BATCH_DELAY,
+                        help='seconds a batch stays in_progress')
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY,
+                        help='seconds before each messages.create response (or its first token)')
+    parser.add_argument('--output-tps', type=float, help='output tokens per second after the first')
+    parser.add_argument('--slow-rate', type=float, default=0.0,
+                        help='fraction of messages.create responses that take --slow-latency instead')
+    parser.add_argument('--slow-latency', type=float, default=DEFAULT_SLOW_LATENCY)
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of messages.create requests that fail with one of --error-statuses')
+    parser.add_argument('--error-statuses', default=','.join(map(str, DEFAULT_ERROR_STATUSES)),
+                        help='comma-separated status codes for injected errors')
+    parser.add_argument('--rpm', type=float, help='requests per minute before 429s')
+    parser.add_argument('--tpm', type=float, help='input+output tokens per minute before 429s')
+    parser.add_argument('--burst', type=float, default=DEFAULT_BURST_SECONDS,
+                        help='seconds of the per-minute limits that can be used at once')
+    parser.add_argument('--max-output-tokens', type=int,
+                        help='cut answers off at this many output tokens, like a low max_tokens')
+    parser.add_argument('--replay', metavar='FILE', help='JSON-lines file of recorded responses to serve')
+    parser.add_argument('--record', action='store_true', help='append new answers to the --replay file')
+    parser.add_argument('--upstream', metavar='URL',
+                        help='send requests with no recorded response here (e.g. https://api.anthropic.com)')
+    parser.add_argument('--strict', action='store_true', help='404 requests with no recorded response')
+    args = parser.parse_args()
+    if (args.record or args.strict) and not args.replay:
+        parser.error('--record and --strict need --replay')
+
+    server = make_stub_server(
+        args.port, args.batch_delay, args.latency, args.rpm, args.tpm, args.burst, args.slow_rate,
+        args.slow_latency, args.output_tps, args.error_rate,
+        [int(status) for status in args.error_statuses.split(',') if status.strip()],
+        args.replay, args.record, args.upstream, args.strict, args.max_output_tokens,
+    )
+    print(f"🧪 Anthropic stand-in on http://127.0.0.1:{args.port}")
+    print(f"   export ANTHROPIC_BASE_URL=http://127.0.0.1:{args.port}")
+    if server.replay is not None:
+        print(f"   📼 {len(server.replay)} recorded responses in {args.replay}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    stats = server.stats
+    print(f"\n📊 {stats.requests} requests: {stats.replayed} replayed, {stats.synthesized} synthesized, "
+          f"{stats.forwarded} forwarded, {stats.missed} missed, {stats.injected_errors} injected errors, "
+          f"{stats.rate_limited} rate limited; {stats.service_seconds:.1f}s simulated API time")
+
+
+if __name__ == "__main__":
+    main()
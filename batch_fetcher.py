@@ -0,0 +1,105 @@
+"""
+Batch Recipe Fetcher
+Fetches many recipe URLs concurrently with asyncio.
+
+Downloads go through the shared pooled RecipeFetcher (so the page cache,
+streaming caps and keep-alive pools all apply) on worker threads, gated by
+a global in-flight limit and a per-host limit so one site is never hammered.
+Results are yielded as they complete, not in input order.
+"""
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from recipe_fetcher import RecipeFetcher, get_default_fetcher
+
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_PER_HOST = 4
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching one URL in a batch"""
+    url: str
+    index: int
+    html: Optional[str] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchFetcher:
+    """Concurrent URL fetcher with global and per-host in-flight limits"""
+
+    def __init__(
+        self,
+        fetcher: Optional[RecipeFetcher] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_host: int = DEFAULT_PER_HOST,
+    ):
+        """
+        Initialize the batch fetcher.
+
+        Args:
+            fetcher: RecipeFetcher to download with (default: the shared one)
+            max_concurrency: Maximum requests in flight across all hosts
+            per_host: Maximum requests in flight to any single host
+        """
+        self.fetcher = fetcher or get_default_fetcher()
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self._global: Optional[asyncio.Semaphore] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='recipe-fetch')
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def fetch_one(self, url: str, index: int = 0) -> FetchResult:
+        """Fetch one URL within the concurrency limits; errors are captured, not raised"""
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._global, self._host_semaphore(url):
+            start = time.perf_counter()
+            try:
+                loop = asyncio.get_running_loop()
+                html = await loop.run_in_executor(self._executor, self.fetcher.fetch_html, url)
+                return FetchResult(url, index, html=html, elapsed=time.perf_counter() - start)
+            except requests.RequestException as e:
+                return FetchResult(url, index, error=f"Failed to fetch recipe: {e}",
+                                   elapsed=time.perf_counter() - start)
+            except Exception as e:
+                # Anything else one URL raises (a cache I/O error, say) is still that URL's failure only
+                return FetchResult(url, index, error=f"Failed to fetch recipe: {type(e).__name__}: {e}",
+                                   elapsed=time.perf_counter() - start)
+
+    async def fetch_all(self, urls: Iterable[str]) -> AsyncIterator[FetchResult]:
+        """Fetch every URL concurrently, yielding results as they complete"""
+        tasks = [asyncio.ensure_future(self.fetch_one(url, i)) for i, url in enumerate(urls)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def read_url_list(path: str) -> List[str]:
+    """Read URLs from a file, one per line; blank lines and # comments are skipped"""
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
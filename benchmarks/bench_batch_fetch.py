@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: wall-clock time to fetch a batch of recipe URLs serially vs
+with the asyncio BatchFetcher.
+
+Spreads the URLs over several local servers (one per simulated recipe
+site), each adding --latency-ms of server think time per page.
+
+Usage:
+    python benchmarks/bench_batch_fetch.py
+    python benchmarks/bench_batch_fetch.py --urls 200 --sites 3 --per-host 4
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_fetcher import BatchFetcher
+from recipe_fetcher import RecipeFetcher
+from local_server import start_page_server
+from corpus import synthetic_recipe_page
+
+
+async def run_batch(fetcher: RecipeFetcher, urls, max_concurrency: int, per_host: int) -> float:
+    batch = BatchFetcher(fetcher, max_concurrency=max_concurrency, per_host=per_host)
+    start = time.perf_counter()
+    failures = 0
+    async for result in batch.fetch_all(urls):
+        failures += not result.ok
+    batch.close()
+    if failures:
+        print(f"⚠️  {failures} fetches failed")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--urls', type=int, default=60, help="URLs in the batch")
+    parser.add_argument('--sites', type=int, default=3, help="Simulated recipe sites")
+    parser.add_argument('--latency-ms', type=float, default=100.0, help="Server time per page")
+    parser.add_argument('--max-concurrency', type=int, default=16)
+    parser.add_argument('--per-host', type=int, default=4)
+    args = parser.parse_args()
+
+    page = synthetic_recipe_page(100).encode()
+    servers = [start_page_server(page, response_delay=args.latency_ms / 1000) for _ in range(args.sites)]
+    urls = [
+        f"http://127.0.0.1:{servers[i % args.sites].server_address[1]}/recipe/{i}"
+        for i in range(args.urls)
+    ]
+
+    with RecipeFetcher() as fetcher:
+        start = time.perf_counter()
+        for url in urls:
+            fetcher.fetch_html(url)
+        serial = time.perf_counter() - start
+
+    with RecipeFetcher() as fetcher:
+        concurrent = asyncio.run(run_batch(fetcher, urls, args.max_concurrency, args.per_host))
+
+    print(f"📊 {args.urls} URLs over {args.sites} sites, {args.latency_ms:.0f} ms/page")
+    print(f"serial      {serial:7.2f} s")
+    print(f"concurrent  {concurrent:7.2f} s  (global={args.max_concurrency}, per host={args.per_host})")
+    print(f"⚡ Speedup: {serial / concurrent:.1f}x")
+
+    for server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
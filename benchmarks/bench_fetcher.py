@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-URL fetch latency with a warm connection pool vs a cold one.
+
+Cold = a fresh RecipeFetcher (new connection, handshake) for every URL.
+Warm = one shared RecipeFetcher reusing keep-alive connections.
+
+With no URLs the benchmark serves a synthetic recipe page from a local
+HTTP/1.1 server that sleeps --connect-delay-ms on every new connection to
+stand in for DNS + TCP + TLS setup to a real recipe site.
+
+Usage:
+    python benchmarks/bench_fetcher.py
+    python benchmarks/bench_fetcher.py --requests 50 --connect-delay-ms 80
+    python benchmarks/bench_fetcher.py https://www.bonappetit.com/recipe/... [more urls]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recipe_fetcher import RecipeFetcher
+from local_server import start_page_server
+
+PAGE = ("<html><body><h1>Test Recipe</h1><ul>"
+        + "".join(f"<li>{i} cups flour</li>" for i in range(200))
+        + "</ul></body></html>").encode()
+
+
+def bench_cold(urls: List[str]) -> List[float]:
+    timings = []
+    for url in urls:
+        start = time.perf_counter()
+        with RecipeFetcher() as fetcher:
+            fetcher.fetch_html(url)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_warm(urls: List[str]) -> List[float]:
+    timings = []
+    with RecipeFetcher() as fetcher:
+        fetcher.fetch_html(urls[0])  # prime the pool
+        for url in urls:
+            start = time.perf_counter()
+            fetcher.fetch_html(url)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(label: str, timings: List[float]):
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"{label:<6} n={len(ms):<4} mean={statistics.mean(ms):8.2f} ms  "
+          f"p50={statistics.median(ms):8.2f} ms  p95={p95:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('urls', nargs='*', help="Real recipe URLs (default: local synthetic server)")
+    parser.add_argument('--requests', type=int, default=30, help="Requests per mode against the local server")
+    parser.add_argument('--connect-delay-ms', type=float, default=50.0,
+                        help="Simulated connection setup cost on the local server")
+    args = parser.parse_args()
+
+    server = None
+    if args.urls:
+        urls = args.urls
+    else:
+        server = start_page_server(PAGE, connect_delay=args.connect_delay_ms / 1000)
+        port = server.server_address[1]
+        urls = [f"http://127.0.0.1:{port}/recipe/{i}" for i in range(args.requests)]
+
+    print(f"📊 Fetch latency over {len(urls)} URLs")
+    cold = bench_cold(urls)
+    warm = bench_warm(urls)
+    _report("cold", cold)
+    _report("warm", warm)
+    print(f"⚡ Warm pool speedup: {statistics.mean(cold) / statistics.mean(warm):.1f}x")
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
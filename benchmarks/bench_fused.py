@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end Claude latency of two-call parse → scale versus the
+single-call fused mode.
+
+Calls the real API (ANTHROPIC_API_KEY) with the response cache bypassed.
+
+Usage:
+    python benchmarks/bench_fused.py                     # built-in sample recipe
+    python benchmarks/bench_fused.py recipe.txt --runs 5 --servings 7
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from contextlib import redirect_stdout
+from io import StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import RecipeAssistant
+
+SAMPLE_RECIPE = """Loaded Scalloped Potatoes
+Yield 8 servings
+
+Ingredients:
+6 slices thick-cut bacon
+3 lb. russet potatoes, peeled
+1½ cups heavy cream
+1 cup whole milk
+8 oz. Gruyère cheese, coarsely grated
+4 garlic cloves, finely grated
+1 bunch chives, thinly sliced
+2 Tbsp. unsalted butter
+Kosher salt and freshly ground black pepper
+
+Instructions:
+Cook bacon until crisp. Whisk cream, milk, garlic and some bacon fat. Layer potatoes
+with the cream mixture and cheese, then bake until golden. Top with bacon and chives."""
+
+
+def run_two_call(assistant: RecipeAssistant, text: str) -> float:
+    start = time.perf_counter()
+    assistant.parse_recipe(text)
+    assistant.scale_recipe()
+    return time.perf_counter() - start
+
+
+def run_fused(assistant: RecipeAssistant, text: str) -> float:
+    start = time.perf_counter()
+    assistant.parse_and_scale(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('recipe', nargs='?', help="Recipe text file (default: built-in sample)")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--servings', type=int, default=7)
+    args = parser.parse_args()
+
+    text = open(args.recipe).read() if args.recipe else SAMPLE_RECIPE
+    assistant = RecipeAssistant(num_meals=args.servings, use_cache=False)
+
+    timings = {"two-call": [], "fused": []}
+    for _ in range(args.runs):
+        with redirect_stdout(StringIO()):
+            timings["two-call"].append(run_two_call(assistant, text))
+            timings["fused"].append(run_fused(assistant, text))
+
+    print(f"📊 {args.runs} runs, scaling to {args.servings} servings")
+    for mode, values in timings.items():
+        print(f"{mode:<9} mean={statistics.mean(values):6.2f} s  "
+              f"min={min(values):6.2f} s  max={max(values):6.2f} s")
+    print(f"⚡ Fused speedup: {statistics.mean(timings['two-call']) / statistics.mean(timings['fused']):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
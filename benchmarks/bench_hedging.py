@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Claude parse-call tail latency with and without hedged requests.
+
+Sends the same parse requests one at a time to the local Anthropic
+stand-in, which answers most requests after --latency seconds and a
+--slow-rate fraction after --slow-latency seconds. Each run goes through a
+fresh ClaudeResilience that first sees --warmup requests to learn the
+latency percentiles. It runs once as-is and once with hedging, where any
+request still running past the observed p90 gets a duplicate, --runs times
+over. Reports p50/p95/p99/max latency and how many extra requests the
+hedges cost, counting the losing responses that came back discarded. Needs
+no network or API key.
+
+Usage:
+    python benchmarks/bench_hedging.py
+    python benchmarks/bench_hedging.py --requests 200 --slow-rate 0.1 --slow-latency 3 --runs 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import anthropic
+
+from anthropic_stub import start_stub_server
+from claude_client import message_params
+from claude_resilience import ClaudeResilience, LatencyWindow, ResiliencePolicy
+from model_tiers import DEFAULT_STRONG_MODEL as MODELID
+from recipe_cli import PARSE_INSTRUCTIONS, build_parse_prompt
+from recipe_schemas import PARSE_TOOL
+
+
+def recipe_params(i: int):
+    prompt = build_parse_prompt(f"""Sheet Pan Gnocchi {i}
+Serves 4
+1 lb shelf-stable gnocchi
+1 pint cherry tomatoes
+1 red onion, sliced
+2 tbsp olive oil""")
+    return message_params(prompt, MODELID, 4096, PARSE_INSTRUCTIONS, PARSE_TOOL)
+
+
+def run(base_url: str, args, hedge: bool) -> None:
+    client = anthropic.Anthropic(api_key="stub", base_url=base_url)
+    resilience = ClaudeResilience(ResiliencePolicy(hedge=hedge, min_samples=args.warmup))
+
+    discarded = []
+
+    def call(i: int):
+        params = recipe_params(i)
+        return resilience.call(
+            "parse", lambda timeout: client.with_options(max_retries=0, timeout=timeout).messages.create(**params),
+            on_discard=discarded.append,
+        )
+
+    for i in range(args.warmup):
+        call(i)
+    timings: List[float] = []
+    for i in range(args.requests):
+        start = time.perf_counter()
+        call(i)
+        timings.append(time.perf_counter() - start)
+
+    # Let the last losers finish so their discarded responses are counted
+    if resilience._pool is not None:
+        resilience._pool.shutdown(wait=True)
+    window = LatencyWindow(len(timings), timings)
+    stats = resilience.stats.of("parse")
+    print(f"{'hedged' if hedge else 'plain':<7} p50 {window.percentile(50):6.3f}s  p95 {window.percentile(95):6.3f}s  "
+          f"p99 {window.percentile(99):6.3f}s  max {max(timings):6.3f}s  "
+          f"{stats.hedges:3d} hedges ({stats.hedge_wins} won, +{stats.hedges / args.requests:.0%} requests, "
+          f"{len(discarded)} discarded)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=20, help="Requests to learn percentiles from first")
+    parser.add_argument('--latency', type=float, default=0.1, help="Stub seconds per normal response")
+    parser.add_argument('--slow-rate', type=float, default=0.05, help="Fraction of slow responses")
+    parser.add_argument('--slow-latency', type=float, default=2.0, help="Stub seconds per slow response")
+    parser.add_argument('--runs', type=int, default=1, help="Plain/hedged pairs to run")
+    parser.add_argument('--seed', type=int, help="Seed for which responses the stub makes slow")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    print(f"📊 {args.requests} parse calls, {args.latency * 1000:.0f} ms/response, "
+          f"{args.slow_rate:.0%} take {args.slow_latency:.1f} s")
+    server = start_stub_server(latency=args.latency, slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        for _ in range(args.runs):
+            run(base_url, args, hedge=False)
+            run(base_url, args, hedge=True)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
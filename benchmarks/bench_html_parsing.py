@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recipe text extraction time and peak memory per HTML parser backend.
+
+Runs the same make_soup → JSON-LD → page_text steps as extract_recipe_text
+over a corpus of saved pages and checks that every backend produces output
+identical to html.parser. Peak memory comes from tracemalloc, which sees
+Python-level allocations (the soup) but not libxml2's transient C buffers.
+
+Usage:
+    python benchmarks/bench_html_parsing.py                 # synthetic 600 KB pages
+    python benchmarks/bench_html_parsing.py --corpus pages/ # directory of saved .html
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_parsing import available_backends, make_soup, page_text
+from recipe_jsonld import extract_structured_recipe
+from corpus import load_corpus, synthetic_corpus
+
+STRIP_TAGS = ["script", "style", "nav", "footer", "header", "aside"]
+
+
+def extract(html: str, backend: str):
+    soup = make_soup(html, backend)
+    structured = extract_structured_recipe(soup)
+    return page_text(soup, STRIP_TAGS), structured
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--corpus', help="Directory of saved recipe pages (default: synthetic)")
+    parser.add_argument('--pages', type=int, default=5, help="Synthetic page count")
+    parser.add_argument('--size-kb', type=int, default=600, help="Synthetic page size")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per page")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.pages, args.size_kb)
+    backends = available_backends()
+    total_kb = sum(len(html) for _, html in pages) / 1024
+    print(f"📊 {len(pages)} pages, {total_kb:.0f} KB total, backends: {', '.join(backends)}")
+
+    reference = {name: extract(html, 'html.parser') for name, html in pages}
+
+    print(f"{'backend':<12} {'mean ms/page':>13} {'p95 ms':>9} {'peak MB':>9}  identical")
+    for backend in backends:
+        timings = []
+        peaks = []
+        mismatches = []
+        for name, html in pages:
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = extract(html, backend)
+                timings.append(time.perf_counter() - start)
+
+            tracemalloc.start()
+            extract(html, backend)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+            if result != reference[name]:
+                mismatches.append(name)
+
+        ms = sorted(t * 1000 for t in timings)
+        p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+        identical = "yes" if not mismatches else f"NO ({', '.join(mismatches)})"
+        print(f"{backend:<12} {statistics.mean(ms):>13.1f} {p95:>9.1f} "
+              f"{max(peaks) / 1024 / 1024:>9.1f}  {identical}")
+
+
+if __name__ == "__main__":
+    main()
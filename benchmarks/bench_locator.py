@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parse-prompt tokens per page with the recipe block locator
+versus the old blind 8000-character slice.
+
+Usage:
+    python benchmarks/bench_locator.py                 # synthetic pages
+    python benchmarks/bench_locator.py --corpus pages/ # directory of saved .html
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_parsing import make_soup, page_text
+from recipe_locator import locate_recipe, locator_stats
+from corpus import load_corpus, synthetic_corpus
+
+STRIP_TAGS = ["script", "style", "nav", "footer", "header"]
+BASELINE_CHARS = 8000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--corpus', help="Directory of saved recipe pages (default: synthetic)")
+    parser.add_argument('--pages', type=int, default=5, help="Synthetic page count")
+    parser.add_argument('--budget', type=int, default=2000, help="Token budget for the located text")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.pages, 300)
+
+    print(f"{'page':<28} {'located':>8} {'baseline':>9} {'tokens':>7} {'saved':>7} {'ms':>7}")
+    for name, html in pages:
+        start = time.perf_counter()
+        soup = make_soup(html)
+        full_text = page_text(soup, STRIP_TAGS)
+        result = locate_recipe(soup, full_text, max_tokens=args.budget, baseline_chars=BASELINE_CHARS)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{name[:28]:<28} {'yes' if result.found else 'no':>8} {result.baseline_tokens:>9} "
+              f"{result.tokens:>7} {result.tokens_saved:>7} {elapsed:>7.1f}")
+
+    totals = locator_stats.to_dict()
+    print(f"\n✂️  Saved ~{totals['tokens_saved_per_page']} input tokens per page "
+          f"({totals['located']}/{totals['pages']} pages located)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recipe pipeline overhead outside the Claude API.
+
+Serves a synthetic recipe page (without JSON-LD, so every recipe needs a
+Claude parse) from a local page server and points the pipeline at the local
+Anthropic stand-in, which adds --latency seconds per response plus output
+tokens at --output-tps. Runs --recipes recipes through recipe_cli's
+process_recipe one at a time and then through process_recipes all at once,
+and reports wall time next to the time the stub spent simulating the API;
+the difference is what the pipeline itself costs (fetching, locating,
+prompt building, validation, scaling, client overhead). Needs no network or
+API key.
+
+With --replay FILE the stub serves recorded responses from FILE (see
+anthropic_stub.py --record), falling back to its own answers.
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --recipes 20 --latency 0.3 --output-tps 80 --size-kb 300
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep benchmark calls out of the user's call log and latency history
+os.environ.setdefault('ANTHROPIC_API_KEY', 'stub')
+os.environ['CLAUDE_ACCOUNTING_DISABLE'] = '1'
+os.environ['CLAUDE_LATENCY_PATH'] = ''
+
+from anthropic_stub import start_stub_server
+from benchmarks.corpus import synthetic_recipe_page
+from benchmarks.local_server import start_page_server
+from recipe_cli import process_recipe, process_recipes
+
+
+def report(name: str, recipes: int, wall: float, stats, before) -> None:
+    requests = stats.requests - before[0]
+    service = stats.service_seconds - before[1]
+    line = (f"{name:<6} {wall:7.2f}s wall  {wall / recipes * 1000:7.1f} ms/recipe  {requests:3d} Claude calls  "
+            f"{service:7.2f}s stub time  ")
+    if name == "sync":
+        line += f"overhead {(wall - service) / recipes * 1000:6.1f} ms/recipe"
+    else:
+        # Concurrent calls overlap, so stub time exceeds wall time
+        line += f"{service / wall:4.1f} calls in flight on average"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--recipes', type=int, default=10)
+    parser.add_argument('--servings', type=int, default=7)
+    parser.add_argument('--size-kb', type=int, default=300, help="Size of the synthetic recipe page")
+    parser.add_argument('--latency', type=float, default=0.2, help="Stub seconds before each response")
+    parser.add_argument('--output-tps', type=float, default=None, help="Stub output tokens per second")
+    parser.add_argument('--replay', metavar='FILE', help="Recorded responses for the stub to serve")
+    args = parser.parse_args()
+
+    page = synthetic_recipe_page(args.size_kb, jsonld=False).encode()
+    pages = start_page_server(page)
+    stub = start_stub_server(latency=args.latency, output_tps=args.output_tps, replay=args.replay)
+    base_url = f"http://127.0.0.1:{stub.server_address[1]}"
+    urls = [f"http://127.0.0.1:{pages.server_address[1]}/recipe/{i}" for i in range(args.recipes)]
+    print(f"📊 {args.recipes} recipes, {len(page) // 1024} KB pages, stub {args.latency * 1000:.0f} ms/response"
+          f"{f' + {args.output_tps:.0f} tokens/s' if args.output_tps else ''}")
+
+    try:
+        before = (stub.stats.requests, stub.stats.service_seconds)
+        start = time.perf_counter()
+        results = [process_recipe(url, args.servings, use_cache=False, base_url=base_url) for url in urls]
+        report("sync", args.recipes, time.perf_counter() - start, stub.stats, before)
+        failed = [r.get('error') for r in results if not r.get('success')]
+
+        async def run_async():
+            return [r async for r in process_recipes(urls, args.servings, use_cache=False, base_url=base_url)]
+
+        before = (stub.stats.requests, stub.stats.service_seconds)
+        start = time.perf_counter()
+        results = asyncio.run(run_async())
+        report("async", args.recipes, time.perf_counter() - start, stub.stats, before)
+        failed += [r.get('error') for r in results if not r.get('success')]
+
+        if stub.replay is not None:
+            print(f"📼 replay: {stub.replay.hits} hits, {stub.replay.misses} misses")
+        if failed:
+            print(f"⚠️  {len(failed)} recipe(s) failed: {failed[0]}")
+    finally:
+        stub.shutdown()
+        pages.shutdown()
+
+
+if __name__ == "__main__":
+    main()
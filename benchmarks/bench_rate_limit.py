@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Claude parse-call throughput against a rate-limited API.
+
+Runs the same parse requests against the local Anthropic stand-in (which
+answers after --latency seconds and returns 429 with Retry-After above
+--rpm/--tpm) three ways:
+
+    serial     one sync request at a time, SDK retries (the old path)
+    unpaced    all requests at once on the async client, SDK retries only
+    limiter    async, paced by a RateLimiter set to the same limits
+
+and reports wall time, throughput, 429s and failed requests. Needs no
+network or API key.
+
+Usage:
+    python benchmarks/bench_rate_limit.py
+    python benchmarks/bench_rate_limit.py --requests 60 --rpm 300 --latency 0.5 --concurrency 8
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import anthropic
+
+from anthropic_stub import start_stub_server
+from claude_client import acomplete_tool, complete_tool
+from rate_limiter import RateLimiter
+from model_tiers import DEFAULT_STRONG_MODEL as MODELID
+from recipe_cli import PARSE_INSTRUCTIONS, build_parse_prompt
+from recipe_schemas import PARSE_TOOL
+
+
+def recipe_prompt(i: int) -> str:
+    return build_parse_prompt(f"""Weeknight Chili {i}
+Serves 4
+2 lb ground beef
+1 onion, diced
+3 cloves garlic, minced
+2 tbsp chili powder
+1 can kidney beans""")
+
+
+def run_serial(base_url: str, count: int) -> int:
+    client = anthropic.Anthropic(api_key="stub", base_url=base_url)
+    failures = 0
+    for i in range(count):
+        try:
+            complete_tool(client, recipe_prompt(i), MODELID, PARSE_TOOL, use_cache=False, prefix=PARSE_INSTRUCTIONS)
+        except (anthropic.APIError, ValueError):
+            failures += 1
+    return failures
+
+
+async def run_async(base_url: str, count: int, limiter: RateLimiter, sdk_retries: int) -> int:
+    client = anthropic.AsyncAnthropic(api_key="stub", base_url=base_url, max_retries=sdk_retries)
+    results = await asyncio.gather(*(
+        acomplete_tool(client, recipe_prompt(i), MODELID, PARSE_TOOL, use_cache=False, prefix=PARSE_INSTRUCTIONS,
+                       limiter=limiter)
+        for i in range(count)
+    ), return_exceptions=True)
+    await client.close()
+    return sum(isinstance(r, Exception) for r in results)
+
+
+def measure(name: str, args, run) -> None:
+    server = start_stub_server(latency=args.latency, rpm=args.rpm, tpm=args.tpm, burst_seconds=args.burst)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    start = time.perf_counter()
+    failures = run(base_url)
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    print(f"{name:<9} {elapsed:7.2f} s  {args.requests / elapsed:6.2f} req/s  "
+          f"{server.limits.rejected:4d} x 429  {failures:3d} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--rpm', type=float, default=300.0, help="Stub requests per minute")
+    parser.add_argument('--tpm', type=float, default=None, help="Stub tokens per minute")
+    parser.add_argument('--burst', type=float, default=1.0, help="Seconds of budget the stub allows at once")
+    parser.add_argument('--latency', type=float, default=0.5, help="Stub seconds per response")
+    parser.add_argument('--concurrency', type=int, default=8, help="Limiter in-flight ceiling")
+    parser.add_argument('--skip-serial', action='store_true')
+    args = parser.parse_args()
+
+    print(f"📊 {args.requests} parse calls, stub limit {args.rpm:.0f} req/min"
+          f"{f', {args.tpm:.0f} tok/min' if args.tpm else ''}, {args.latency * 1000:.0f} ms/response")
+    if not args.skip_serial:
+        measure("serial", args, lambda url: run_serial(url, args.requests))
+
+    unlimited = RateLimiter(requests_per_minute=1e9, tokens_per_minute=1e12,
+                            max_concurrency=args.requests, max_retries=0)
+    measure("unpaced", args, lambda url: asyncio.run(run_async(url, args.requests, unlimited, sdk_retries=2)))
+
+    limiter = RateLimiter(requests_per_minute=args.rpm, tokens_per_minute=args.tpm or 1e12,
+                          max_concurrency=args.concurrency, burst_seconds=args.burst)
+    measure("limiter", args, lambda url: asyncio.run(run_async(url, args.requests, limiter, sdk_retries=0)))
+    print(f"🚦 Limiter: {limiter.stats.to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Walmart page weight and load time with request blocking on and off.
+
+Loads --items searches and their first product pages on a local fake store
+(benchmarks/fake_store.py) whose pages pull in a stylesheet, a script, a
+font, an analytics script and an image per product, once per request_blocking
+profile, each in a fresh browser with a throwaway profile (so nothing comes
+from cache). The fake store's /analytics/ path is added to every profile's
+URL patterns, standing in for the real tracker domains. Reports per page:
+load time, KB received over the wire (from the CDP Network events) and
+requests sent and blocked. Needs Chrome and undetected_chromedriver, but no
+network or Walmart account.
+
+Usage:
+    python benchmarks/bench_walmart_blocking.py
+    python benchmarks/bench_walmart_blocking.py --items 10 --static-delay 0.1 --static-kb 50 --profiles off minimal
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_walmart_pool import INGREDIENTS
+from benchmarks.fake_store import start_fake_store
+from request_blocking import BLOCK_PROFILES
+from walmart_cart import WalmartCart
+
+FAKE_TRACKERS = ['*/analytics/*']
+
+
+def run(profile: str, base_url: str, queries) -> None:
+    cart = WalmartCart(headless=True, base_url=base_url, profile_dir=None, block=profile, block_urls=FAKE_TRACKERS)
+    try:
+        cart._init_browser()
+        network = cart.network
+        network.wait_idle(max_inflight=0)
+        before = (network.requests, network.bytes, network.blocked)
+        times = []
+        for query in queries:
+            url = cart._search_url(query)
+            start = time.perf_counter()
+            cart._open(cart.driver, url)
+            times.append(time.perf_counter() - start)
+            product, _ = cart._extract(cart.driver, query, url)
+            start = time.perf_counter()
+            cart._open(cart.driver, product.url)
+            times.append(time.perf_counter() - start)
+        # Late requests (async scripts, lazy images) belong to the last page
+        network.wait_idle(max_inflight=0)
+        requests, received, blocked = (network.requests - before[0], network.bytes - before[1],
+                                       network.blocked - before[2])
+    finally:
+        cart.cleanup()
+    pages = len(times)
+    print(f"{profile:<8} {statistics.mean(times) * 1000:7.1f} ms/page  {received / 1024 / pages:8.1f} KB/page  "
+          f"{requests / pages:5.1f} requests/page  {blocked / pages:5.1f} blocked/page")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--results', type=int, default=24, help="Products (and images) per results page")
+    parser.add_argument('--static-delay', type=float, default=0.05, help="Fake store seconds per static file")
+    parser.add_argument('--static-kb', type=int, default=20, help="Size of each static file")
+    parser.add_argument('--profiles', nargs='+', default=list(BLOCK_PROFILES), choices=list(BLOCK_PROFILES))
+    args = parser.parse_args()
+
+    store = start_fake_store(0.1, 0.1, args.results, static_delay=args.static_delay, static_kb=args.static_kb)
+    base_url = f"http://127.0.0.1:{store.server_address[1]}"
+    queries = (INGREDIENTS * (args.items // len(INGREDIENTS) + 1))[:args.items]
+    print(f"📊 {args.items} searches + product pages, {args.results} images per search, "
+          f"static files {args.static_kb} KB after {args.static_delay * 1000:.0f} ms")
+    try:
+        for profile in args.profiles:
+            run(profile, base_url, queries)
+    finally:
+        store.shutdown()
+
+
+if __name__ == "__main__":
+    main()
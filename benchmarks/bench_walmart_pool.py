@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: WalmartCart.search_and_preview wall time and memory versus browser and tab count.
+
+Searches the same ingredient list on a local fake store (benchmarks/
+fake_store.py, --search-delay seconds of server time per results page) with
+1, 2, 4, ... Chrome workers, then with 2, 4, ... tabs of a single browser,
+and reports wall time, seconds per item, the speedup over one browser and
+the peak RSS of all Chrome processes (Linux only). Checks that every run
+returns the ingredients in their original order. Needs Chrome and
+undetected_chromedriver, but no network or Walmart account.
+
+Usage:
+    python benchmarks/bench_walmart_pool.py
+    python benchmarks/bench_walmart_pool.py --items 20 --workers 1 2 4 6 --tabs 4 6 --search-delay 0.5
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import contextlib
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_store import start_fake_store
+from walmart_cart import DEFAULT_SEARCH_DELAY, WalmartCart
+
+INGREDIENTS = [
+    "chicken breast", "broccoli", "soy sauce", "garlic", "ginger", "rice", "green onion", "sesame oil",
+    "carrots", "honey", "red pepper flakes", "cornstarch", "yellow onion", "olive oil", "lemon", "parsley",
+    "black beans", "cumin", "tortillas", "cheddar cheese", "sour cream", "cilantro", "lime", "avocado",
+]
+
+
+def children_rss_mb() -> Optional[float]:
+    """RSS of every process descended from this one (chromedriver and Chrome), or None off Linux"""
+    if not os.path.isdir('/proc'):
+        return None
+    parents: Dict[int, int] = {}
+    rss: Dict[int, int] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/status') as f:
+                fields = dict(line.split(':', 1) for line in f if ':' in line)
+        except OSError:
+            continue
+        parents[int(entry)] = int(fields['PPid'])
+        rss[int(entry)] = int(fields.get('VmRSS', '0 kB').split()[0])
+    descendants, frontier = set(), {os.getpid()}
+    while frontier:
+        frontier = {pid for pid, ppid in parents.items() if ppid in frontier} - descendants
+        descendants |= frontier
+    return sum(rss[pid] for pid in descendants) / 1024
+
+
+class PeakRSS:
+    """Samples children_rss_mb in the background and keeps the highest reading"""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            value = children_rss_mb()
+            if value is not None:
+                self.peak = max(self.peak or 0.0, value)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run(base_url: str, ingredients, args, workers: int = 1, tabs: int = 1) -> float:
+    cart = WalmartCart(headless=True, workers=workers, tabs=tabs, search_delay=args.rest, base_url=base_url)
+    try:
+        cart._init_browser()  # launch the signed-in browser outside the timing, as login() would
+        with PeakRSS() as memory:
+            start = time.perf_counter()
+            with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+                items = cart.search_and_preview(ingredients)
+            elapsed = time.perf_counter() - start
+    finally:
+        cart.cleanup()
+    assert [item.ingredient_name for item in items] == [ing['name'] for ing in ingredients], "results out of order"
+    found = sum(1 for item in items if item.product)
+    name = f"{tabs:2d} tabs     " if tabs > 1 else f"{workers:2d} browser(s)"
+    peak = f"{memory.peak:6.0f} MB" if memory.peak is not None else "     - MB"
+    print(f"{name}  {elapsed:7.2f}s  {elapsed / len(items):5.2f}s/item  {found}/{len(items)} found  {peak}", end='')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--items', type=int, default=12)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--tabs', type=int, nargs='*', default=[2, 4], help="Tab counts to run in one browser")
+    parser.add_argument('--search-delay', type=float, default=0.3, help="Fake store seconds per results page")
+    parser.add_argument('--rest', type=float, default=DEFAULT_SEARCH_DELAY,
+                        help="Seconds each browser waits between searches")
+    args = parser.parse_args()
+
+    store = start_fake_store(search_delay=args.search_delay)
+    base_url = f"http://127.0.0.1:{store.server_address[1]}"
+    names = (INGREDIENTS * (args.items // len(INGREDIENTS) + 1))[:args.items]
+    ingredients = [{"name": name, "amount": 1, "unit": "", "category": ""} for name in names]
+    print(f"📊 {args.items} searches, {args.search_delay * 1000:.0f} ms/results page, {args.rest:.1f}s rest per browser")
+    try:
+        baseline = None
+        for workers in args.workers:
+            elapsed = run(base_url, ingredients, args, workers=workers)
+            baseline = baseline or elapsed
+            print(f"  {baseline / elapsed:4.1f}x")
+        for tabs in args.tabs:
+            elapsed = run(base_url, ingredients, args, tabs=tabs)
+            print(f"  {baseline / elapsed:4.1f}x" if baseline else "")
+    finally:
+        store.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Walmart page loads with a fresh vs. a reused Chrome profile.
+
+Launches the signed-in browser twice on the same new profile directory
+against a local fake store (benchmarks/fake_store.py) whose pages pull in a
+stylesheet, a script and an image per product, all cacheable:
+
+    cold   empty profile: signs in through /account/login, then loads the
+           home page, --items searches and their first product pages
+    warm   the profile the cold run left behind: checks the session is
+           recognised (login() would skip the manual step), then loads the
+           same pages from the HTTP cache
+
+and reports load time per page and static files fetched from the store.
+Needs Chrome and undetected_chromedriver, but no network or Walmart account.
+
+Usage:
+    python benchmarks/bench_walmart_profile.py
+    python benchmarks/bench_walmart_profile.py --items 10 --static-delay 0.1 --static-kb 50
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_walmart_pool import INGREDIENTS
+from benchmarks.fake_store import start_fake_store
+from walmart_cart import WalmartCart
+
+
+def run(name: str, store, base_url: str, profile_dir: str, queries) -> None:
+    cart = WalmartCart(headless=True, base_url=base_url, profile_dir=profile_dir)
+    try:
+        cart._init_browser()
+        cart._open(cart.driver, base_url)
+        session = cart.signed_in()
+        if not session:
+            cart._open(cart.driver, f"{base_url}/account/login")
+        static_before = store.requests.get('static', 0)
+        times = []
+        for query in queries:
+            url = cart._search_url(query)
+            start = time.perf_counter()
+            cart._open(cart.driver, url)
+            times.append(time.perf_counter() - start)
+            product, _ = cart._extract(cart.driver, query, url)
+            start = time.perf_counter()
+            cart._open(cart.driver, product.url)
+            times.append(time.perf_counter() - start)
+        static = store.requests.get('static', 0) - static_before
+    finally:
+        cart.cleanup()
+    print(f"{name:<5} {'signed in' if session else 'signed out':<10} "
+          f"{statistics.mean(times) * 1000:7.1f} ms/page mean  {statistics.median(times) * 1000:7.1f} ms median  "
+          f"{static:4d} static files fetched ({len(times)} pages)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--results', type=int, default=24, help="Products (and images) per results page")
+    parser.add_argument('--static-delay', type=float, default=0.05, help="Fake store seconds per static file")
+    parser.add_argument('--static-kb', type=int, default=20, help="Size of each static file")
+    args = parser.parse_args()
+
+    store = start_fake_store(0.1, 0.1, args.results, static_delay=args.static_delay, static_kb=args.static_kb)
+    base_url = f"http://127.0.0.1:{store.server_address[1]}"
+    profile_dir = tempfile.mkdtemp(prefix='walmart_profile_')
+    queries = (INGREDIENTS * (args.items // len(INGREDIENTS) + 1))[:args.items]
+    print(f"📊 {args.items} searches + product pages, {args.results} images per search, "
+          f"static files {args.static_kb} KB after {args.static_delay * 1000:.0f} ms")
+    try:
+        run("cold", store, base_url, profile_dir, queries)
+        run("warm", store, base_url, profile_dir, queries)
+    finally:
+        store.shutdown()
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
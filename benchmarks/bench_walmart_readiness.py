@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-item Walmart search and add-to-cart latency, fixed sleeps vs. readiness waits.
+
+Searches --items ingredients and adds them all to the cart on a local fake
+store (benchmarks/fake_store.py) twice with one browser:
+
+    fixed      the waits walmart_cart.py used to have: 2 s after every page
+               load, 1 s after each search, 2 s after each Add to cart click
+               and 2 s more between adds
+    readiness  page_readiness signals (results grid filled in, button
+               clickable, cart badge changed) with the default politeness
+               floors (WALMART_SEARCH_DELAY / WALMART_ADD_DELAY)
+
+and reports seconds per item for each phase. Needs Chrome and
+undetected_chromedriver, but no network or Walmart account.
+
+Usage:
+    python benchmarks/bench_walmart_readiness.py
+    python benchmarks/bench_walmart_readiness.py --items 10 --search-delay 0.5 --product-delay 0.4 --cart-delay 0.3
+"""
+import os
+import sys
+import time
+import argparse
+import contextlib
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_walmart_pool import INGREDIENTS
+from benchmarks.fake_store import start_fake_store
+from walmart_cart import WalmartCart
+
+
+class FixedSleeps(WalmartCart):
+    """WalmartCart with the unconditional sleeps it had before page_readiness"""
+
+    def _open(self, driver, url: str):
+        super()._open(driver, url)
+        time.sleep(2)
+
+    def _find(self, driver, query: str, category: str):
+        result = super()._find(driver, query, category)
+        time.sleep(1)  # rate limiting
+        return result
+
+    def _await_cart_update(self, badge: Optional[str]) -> bool:
+        time.sleep(2)
+        return True
+
+    def add_to_cart(self, product) -> bool:
+        added = super().add_to_cart(product)
+        time.sleep(2)  # rate limiting
+        return added
+
+
+def run(name: str, cart: WalmartCart, ingredients) -> None:
+    try:
+        cart._init_browser()
+        with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+            start = time.perf_counter()
+            items = cart.search_and_preview(ingredients)
+            searched = time.perf_counter()
+            summary = cart.add_all_to_cart(items)
+            added = time.perf_counter()
+    finally:
+        cart.cleanup()
+    n = len(items)
+    print(f"{name:<10} search {(searched - start) / n:5.2f}s/item  add {(added - searched) / n:5.2f}s/item  "
+          f"total {added - start:6.1f}s  {summary.get('success', 0)}/{n} added")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--items', type=int, default=8)
+    parser.add_argument('--search-delay', type=float, default=0.3, help="Fake store seconds per results page")
+    parser.add_argument('--product-delay', type=float, default=0.3, help="Fake store seconds per product page")
+    parser.add_argument('--cart-delay', type=float, default=0.2, help="Fake store seconds per cart add")
+    args = parser.parse_args()
+
+    store = start_fake_store(args.search_delay, args.product_delay, cart_delay=args.cart_delay)
+    base_url = f"http://127.0.0.1:{store.server_address[1]}"
+    ingredients = [{"name": name, "amount": 1, "unit": "", "category": ""} for name in INGREDIENTS[:args.items]]
+    print(f"📊 {len(ingredients)} items; fake store {args.search_delay * 1000:.0f} ms/search, "
+          f"{args.product_delay * 1000:.0f} ms/product page, {args.cart_delay * 1000:.0f} ms/cart add")
+    try:
+        run("fixed", FixedSleeps(headless=True, search_delay=0, add_delay=0, base_url=base_url), ingredients)
+        run("readiness", WalmartCart(headless=True, base_url=base_url), ingredients)
+    finally:
+        store.shutdown()
+
+
+if __name__ == "__main__":
+    main()
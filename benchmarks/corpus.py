@@ -0,0 +1,98 @@
+"""
+Benchmark corpus helpers.
+
+Loads saved recipe pages from a directory, or generates synthetic
+ad-heavy recipe pages shaped like the real ones (nav menus, inline SVGs,
+hydration blobs, affiliate blocks, JSON-LD and an ingredient list).
+"""
+import os
+import json
+import random
+from typing import List, Tuple
+
+INGREDIENTS = [
+    "3 lb. russet potatoes, peeled", "1½ cups heavy cream", "6 slices thick-cut bacon",
+    "8 oz. Gruyère cheese, coarsely grated", "4 garlic cloves, finely grated",
+    "1 bunch chives, thinly sliced", "2 Tbsp. unsalted butter", "Kosher salt",
+    "1 tsp. freshly ground black pepper", "½ cup sour cream",
+]
+
+
+def load_corpus(directory: str) -> List[Tuple[str, str]]:
+    """Return (name, html) for every .html/.htm file in a directory"""
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(directory, name), encoding='utf-8', errors='replace') as f:
+                pages.append((name, f.read()))
+    return pages
+
+
+def synthetic_recipe_page(size_kb: int = 600, seed: int = 0, jsonld: bool = True) -> str:
+    """Build a recipe page padded with boilerplate to roughly size_kb"""
+    rng = random.Random(seed)
+    target = size_kb * 1024
+
+    nav = "<nav><ul>" + "".join(
+        f"<li><a href='/section/{i}'>Section {i}</a><span>Chevron</span></li>" for i in range(60)
+    ) + "</ul></nav>"
+    header = f"<header><div class='logo'>Recipe Site</div>{nav}</header>"
+
+    ld = {
+        "@context": "https://schema.org",
+        "@type": "Recipe",
+        "name": f"Loaded Scalloped Potatoes {seed}",
+        "recipeYield": "8 servings",
+        "prepTime": "PT30M",
+        "cookTime": "PT1H30M",
+        "nutrition": {"calories": "450 kcal"},
+        "recipeIngredient": INGREDIENTS,
+    }
+    ld_script = f"<script type='application/ld+json'>{json.dumps(ld)}</script>" if jsonld else ""
+
+    recipe = (
+        "<article class='recipe'>"
+        f"<h1>Loaded Scalloped Potatoes {seed}</h1>"
+        "<div class='recipe-info'><p>Total Time 2 hours</p><p>Yield 8 servings</p></div>"
+        "<div class='ingredients'><h2>Ingredients</h2><ul>"
+        + "".join(f"<li class='ingredient'>{line}</li>" for line in INGREDIENTS)
+        + "</ul></div><div class='instructions'><h2>Preparation</h2><ol>"
+        + "".join(f"<li><p>Step {i}: Cook the potatoes until tender and golden, about {i * 5} minutes.</p></li>"
+                  for i in range(1, 8))
+        + "</ol></div></article>"
+    )
+
+    chunks = []
+    size = 0
+    while size < target:
+        kind = rng.choice(['ad', 'svg', 'hydration', 'affiliate', 'related'])
+        if kind == 'ad':
+            chunk = f"<div class='ad-slot' data-slot='{rng.random()}'><iframe src='/ads/{rng.randint(0, 1e6)}'></iframe></div>"
+        elif kind == 'svg':
+            points = " ".join(f"{rng.randint(0, 500)},{rng.randint(0, 500)}" for _ in range(120))
+            chunk = f"<svg viewBox='0 0 500 500'><polyline points='{points}'/></svg>"
+        elif kind == 'hydration':
+            blob = json.dumps({f"k{i}": rng.random() for i in range(200)})
+            chunk = f"<script>window.__PRELOADED_STATE__ = {blob};</script>"
+        elif kind == 'affiliate':
+            chunk = ("<aside class='affiliate'><p>All products featured are independently selected by our editors. "
+                     "However, when you buy something through the retail links below, we earn an affiliate commission.</p>"
+                     f"<a href='https://amazon.com/dp/{rng.randint(0, 1e9)}'>Mandoline $57 $54 At Amazon</a></aside>")
+        else:
+            chunk = "<div class='related'><h3>You might also like</h3><ul>" + "".join(
+                f"<li><a href='/recipe/{rng.randint(0, 1e6)}'>Related recipe {j}</a></li>" for j in range(10)
+            ) + "</ul></div>"
+        chunks.append(chunk)
+        size += len(chunk)
+
+    split = len(chunks) // 2
+    footer = "<footer><p>Newsletter</p><p>© Recipe Site</p></footer>"
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Recipe {seed}</title>"
+        f"<style>body {{ font-family: sans-serif; }}</style>{ld_script}</head><body>"
+        f"{header}{''.join(chunks[:split])}{recipe}{''.join(chunks[split:])}{footer}</body></html>"
+    )
+
+
+def synthetic_corpus(count: int = 5, size_kb: int = 600) -> List[Tuple[str, str]]:
+    return [(f"synthetic-{i}.html", synthetic_recipe_page(size_kb, seed=i)) for i in range(count)]
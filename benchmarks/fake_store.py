@@ -0,0 +1,153 @@
+"""
+Local stand-in for the Walmart pages WalmartCart automates.
+
+    /                 home page with the cart badge
+    /search?q=...     a results grid (div[data-item-id] tiles with title, price and /ip/ link)
+    /ip/<slug>/<id>   a product page with an Add to cart button that bumps the cart badge
+    /account/login    signs in: sets the customer cookie, after which the header says "Hi, Tester"
+    /static/...       the site's stylesheet, script, font and images (tile images per item id),
+                      static_kb each after static_delay, cacheable for a year
+    /analytics/...    an uncacheable tracking script, like static files otherwise
+
+Search and product pages are served after search_delay / product_delay
+seconds of server think time, and cart adds after cart_delay. Point
+WalmartCart(base_url=...) at http://127.0.0.1:<port>.
+"""
+import json
+import time
+import zlib
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<link rel="stylesheet" href="/static/site.css"><script src="/static/app.js"></script>
+<link rel="preload" href="/static/brand.woff2" as="font" type="font/woff2" crossorigin>
+<script async src="/analytics/collect.js"></script></head>
+<body>
+<header><a href="/"><img src="/static/logo.svg" alt="Store"></a>
+<a link-identifier="Account" href="/account/login">{account}</a>
+<span data-automation-id="cart-count" class="cart-count">{cart}</span></header>
+<main>{main}</main>
+</body></html>"""
+
+
+def _tile(query: str, i: int) -> str:
+    slug = quote(query.replace(' ', '-'))
+    item_id = 100000 + zlib.crc32(f"{query}/{i}".encode()) % 900000
+    return (
+        f"<div data-item-id='{item_id}'>"
+        f"<a href='/ip/{slug}-{i}/{item_id}'><img src='/static/img/{item_id}.svg' alt=''>"
+        f"<span data-automation-id='product-title'>"
+        f"Great Value {escape(query.title())} {i + 1}</span></a>"
+        f"<div data-automation-id='product-price'><span class='f2'>${1.5 + i:.2f}</span></div>"
+        f"</div>"
+    )
+
+
+STATIC_TYPES = {'.css': 'text/css', '.js': 'application/javascript', '.svg': 'image/svg+xml', '.woff2': 'font/woff2'}
+# Padding inside a comment, in each static type's comment syntax
+STATIC_PADDING = {'.css': '/*{}*/', '.js': '/*{}*/', '.svg': '<svg xmlns="http://www.w3.org/2000/svg"><!--{}--></svg>'}
+
+
+def _make_handler(store: 'FakeStore'):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _send(self, status: int, body: str, content_type: str = 'text/html; charset=utf-8', headers=()):
+            data = body.encode()
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _page(self, title: str, main: str, signed_in: bool = False, headers=()):
+            signed_in = signed_in or 'customer=' in self.headers.get('Cookie', '')
+            account = "Hi, Tester" if signed_in else "Sign In"
+            self._send(200, PAGE.format(title=escape(title), account=account, cart=store.cart_count, main=main),
+                       headers=headers)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            store.count(url.path)
+            if url.path.startswith(('/static/', '/analytics/')):
+                time.sleep(store.static_delay)
+                extension = url.path[url.path.rfind('.'):]
+                body = STATIC_PADDING.get(extension, '{}').format('x' * (store.static_kb * 1024))
+                cache = 'public, max-age=31536000, immutable' if url.path.startswith('/static/') else 'no-store'
+                self._send(200, body, STATIC_TYPES.get(extension, 'application/octet-stream'),
+                           [('Cache-Control', cache)])
+            elif url.path == '/account/login':
+                self._page("Store", "<p>Welcome back</p>", signed_in=True,
+                           headers=[('Set-Cookie', 'customer=Tester; Path=/; Max-Age=2592000')])
+            elif url.path == '/search':
+                time.sleep(store.search_delay)
+                query = parse_qs(url.query).get('q', [''])[0]
+                tiles = ''.join(_tile(query, i) for i in range(store.results))
+                self._page(f"{query} - Search", f"<section id='results'>{tiles}</section>")
+            elif url.path.startswith('/ip/'):
+                time.sleep(store.product_delay)
+                title = url.path.split('/')[2].replace('-', ' ')
+                item_id = url.path.rstrip('/').split('/')[-1]
+                self._page(title, (
+                    f"<h1>{escape(title)}</h1><img src='/static/img/{quote(item_id)}.svg' alt=''>"
+                    "<button data-automation-id='add-to-cart-button' onclick=\"fetch('/cart/add', {method: 'POST'})"
+                    ".then(r => r.json()).then(c => document.querySelector('.cart-count').textContent = c.count)\">"
+                    "Add to cart</button>"
+                ))
+            else:
+                self._page("Store", "<p>Welcome</p>")
+
+        def do_POST(self):
+            if urlsplit(self.path).path == '/cart/add':
+                time.sleep(store.cart_delay)
+                with store.lock:
+                    store.cart_count += 1
+                self._send(200, json.dumps({"count": store.cart_count}), 'application/json')
+            else:
+                self._send(404, "not found", 'text/plain')
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class FakeStore(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, search_delay: float = 0.3, product_delay: float = 0.3, results: int = 24,
+                 cart_delay: float = 0.2, static_delay: float = 0.05, static_kb: int = 20):
+        self.search_delay = search_delay
+        self.product_delay = product_delay
+        self.cart_delay = cart_delay
+        self.static_delay = static_delay
+        self.static_kb = static_kb
+        self.results = results
+        self.cart_count = 0
+        self.requests = {}
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', port), _make_handler(self))
+
+    def handle_error(self, request, client_address):
+        pass
+
+    def count(self, path: str):
+        """Tally a request by its first path segment (search, ip, ...)"""
+        kind = path.split('/')[1] or 'home'
+        with self.lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+
+
+def start_fake_store(search_delay: float = 0.3, product_delay: float = 0.3, results: int = 24,
+                     cart_delay: float = 0.2, static_delay: float = 0.05, static_kb: int = 20) -> FakeStore:
+    """Start a background fake store; its URL is http://127.0.0.1:<store.server_address[1]>"""
+    store = FakeStore(0, search_delay, product_delay, results, cart_delay, static_delay, static_kb)
+    threading.Thread(target=store.serve_forever, daemon=True).start()
+    return store
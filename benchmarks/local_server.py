@@ -0,0 +1,47 @@
+"""
+Local HTTP/1.1 page server for benchmarks.
+
+Serves one page for every path, with optional delays standing in for
+connection setup (DNS + TCP + TLS) and server think time.
+"""
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _make_handler(page: bytes, connect_delay: float, response_delay: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            time.sleep(connect_delay)
+            super().setup()
+
+        def do_GET(self):
+            time.sleep(response_delay)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """Ignores clients hanging up early (the fetcher stops reading once the recipe is seen)"""
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+def start_page_server(page: bytes, connect_delay: float = 0.0, response_delay: float = 0.0) -> ThreadingHTTPServer:
+    """Start a background server; the URL base is http://127.0.0.1:<server.server_address[1]>"""
+    server = QuietHTTPServer(('127.0.0.1', 0), _make_handler(page, connect_delay, response_delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,304 @@
+"""
+Claude Call Accounting
+Append-only log of every Claude response: model, prompt type, input/output
+and prompt-cache tokens, wall time, time to first token and estimated cost,
+tagged with the recipe it was made for and the run that made it.
+
+wall_seconds is one request from send to full response, including the
+resilience layer's retries but not time spent waiting on the rate limiter.
+ttft_seconds is only known for streamed responses; a non-streamed response
+arrives all at once. Message Batches results have neither and are priced
+at the batch discount.
+
+Records are JSON lines in CLAUDE_ACCOUNTING_PATH; with
+CLAUDE_ACCOUNTING_DISABLE set they are only kept in memory for the run's
+own summary.
+
+Usage:
+    python claude_accounting.py                # p50/p95/p99 per prompt type and model, $ per recipe
+    python claude_accounting.py --run last     # only the most recent run
+    python claude_accounting.py --since 24     # only the last 24 hours
+    python claude_accounting.py --json         # the same, as JSON
+"""
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+DEFAULT_ACCOUNTING_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'thought_to_table', 'claude_calls.jsonl')
+
+# USD per million input and output tokens
+MODEL_PRICES = {
+    "claude-haiku-4-5-20251001": (1.00, 5.00),
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+    "claude-sonnet-4-20250514": (3.00, 15.00),
+    "claude-sonnet-4-5-20250929": (3.00, 15.00),
+    "claude-opus-4-1-20250805": (15.00, 75.00),
+}
+
+# Prompt-cache writes and reads, relative to the input price
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+# Message Batches requests are billed at half price
+BATCH_DISCOUNT = 0.5
+
+# Identifies this process's records in the log
+RUN_ID = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+_recipe: ContextVar[Optional[str]] = ContextVar('accounting_recipe', default=None)
+
+
+def usage_cost(model: str, usage) -> float:
+    """Estimated USD for a model's usage (an API usage object or anything with the same fields); 0 for unknown models"""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    tokens = lambda name: getattr(usage, name, 0) or 0
+    return (
+        tokens('input_tokens') * input_price
+        + tokens('cache_creation_input_tokens') * input_price * CACHE_WRITE_MULTIPLIER
+        + tokens('cache_read_input_tokens') * input_price * CACHE_READ_MULTIPLIER
+        + tokens('output_tokens') * output_price
+    ) / 1_000_000
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of values, None if there are none"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@contextmanager
+def recipe_scope(recipe: Optional[str]):
+    """Tag the Claude calls made inside the block (and asyncio tasks it starts) with recipe"""
+    token = _recipe.set(recipe)
+    try:
+        yield
+    finally:
+        _recipe.reset(token)
+
+
+@dataclass
+class CallRecord:
+    """One Claude response"""
+    time: float
+    run: str
+    recipe: Optional[str]
+    model: str
+    prompt_type: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    wall_seconds: Optional[float] = None
+    ttft_seconds: Optional[float] = None
+    stop_reason: Optional[str] = None
+    batch: bool = False
+    cost: float = 0.0
+
+
+class AccountingLog:
+    """Append-only JSON-lines log of CallRecords; also keeps this run's records in memory"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_ACCOUNTING_PATH):
+        """
+        Initialize the log.
+
+        Args:
+            path: JSON-lines file to append to; None keeps records in memory only
+        """
+        self.path = path
+        self.records: List[CallRecord] = []
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> 'AccountingLog':
+        """Build a log from CLAUDE_ACCOUNTING_PATH / CLAUDE_ACCOUNTING_DISABLE"""
+        if os.getenv('CLAUDE_ACCOUNTING_DISABLE', '').lower() in ('1', 'true', 'yes'):
+            return cls(path=None)
+        return cls(path=os.getenv('CLAUDE_ACCOUNTING_PATH', DEFAULT_ACCOUNTING_PATH))
+
+    def append(self, record: CallRecord):
+        line = json.dumps(asdict(record)) + '\n'
+        with self._lock:
+            self.records.append(record)
+            if self.path:
+                # One write per line in append mode, so concurrent processes don't interleave records
+                with open(self.path, 'a') as f:
+                    f.write(line)
+
+    def read(self) -> Iterator[Dict]:
+        """Every record in the file, skipping lines that don't parse"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+_default_log: Optional[AccountingLog] = None
+_default_lock = threading.Lock()
+
+
+def get_default_log() -> AccountingLog:
+    """Process-wide log from the environment"""
+    global _default_log
+    with _default_lock:
+        if _default_log is None:
+            _default_log = AccountingLog.from_env()
+        return _default_log
+
+
+def record_response(
+    response,
+    params: Dict,
+    prompt_type: str,
+    wall_seconds: Optional[float] = None,
+    ttft_seconds: Optional[float] = None,
+    batch: bool = False,
+) -> CallRecord:
+    """Log one messages.create/stream/batch response for the request params"""
+    usage = getattr(response, 'usage', None)
+    model = params.get('model') or getattr(response, 'model', '')
+    tokens = lambda name: getattr(usage, name, 0) or 0
+    record = CallRecord(
+        time=round(time.time(), 3),
+        run=RUN_ID,
+        recipe=_recipe.get(),
+        model=model,
+        prompt_type=prompt_type,
+        input_tokens=tokens('input_tokens'),
+        output_tokens=tokens('output_tokens'),
+        cache_creation_input_tokens=tokens('cache_creation_input_tokens'),
+        cache_read_input_tokens=tokens('cache_read_input_tokens'),
+        wall_seconds=round(wall_seconds, 4) if wall_seconds is not None else None,
+        ttft_seconds=round(ttft_seconds, 4) if ttft_seconds is not None else None,
+        stop_reason=getattr(response, 'stop_reason', None),
+        batch=batch,
+        cost=round(usage_cost(model, usage) * (BATCH_DISCOUNT if batch else 1.0), 8),
+    )
+    get_default_log().append(record)
+    return record
+
+
+def _percentiles(values: List[float], digits: int = 3) -> Dict[str, Optional[float]]:
+    return {f'p{pct}': (round(percentile(values, pct), digits) if values else None) for pct in (50, 95, 99)}
+
+
+def aggregate(records: Iterable[Dict]) -> Dict:
+    """
+    Summarize records: per prompt type and model, call counts with wall time
+    and TTFT percentiles, mean tokens and total cost; per recipe, cost and
+    wall time percentiles across recipes.
+    """
+    groups: Dict[str, List[Dict]] = {}
+    recipes: Dict[str, List[Dict]] = {}
+    for record in records:
+        name = f"{record['prompt_type']} {record['model']}{' (batch)' if record.get('batch') else ''}"
+        groups.setdefault(name, []).append(record)
+        if record.get('recipe'):
+            recipes.setdefault(record['recipe'], []).append(record)
+
+    by_type = {}
+    for name, rows in sorted(groups.items()):
+        walls = [r['wall_seconds'] for r in rows if r.get('wall_seconds') is not None]
+        ttfts = [r['ttft_seconds'] for r in rows if r.get('ttft_seconds') is not None]
+        by_type[name] = {
+            'calls': len(rows),
+            'wall_seconds': _percentiles(walls),
+            'ttft_seconds': _percentiles(ttfts),
+            'avg_input_tokens': round(sum(r['input_tokens'] + r['cache_creation_input_tokens']
+                                          + r['cache_read_input_tokens'] for r in rows) / len(rows)),
+            'avg_output_tokens': round(sum(r['output_tokens'] for r in rows) / len(rows)),
+            'cost': round(sum(r['cost'] for r in rows), 6),
+        }
+
+    costs = [sum(r['cost'] for r in rows) for rows in recipes.values()]
+    walls = [sum(r.get('wall_seconds') or 0.0 for r in rows) for rows in recipes.values()]
+    per_recipe = {
+        'recipes': len(recipes),
+        'calls_per_recipe': round(sum(len(rows) for rows in recipes.values()) / len(recipes), 2) if recipes else 0,
+        'cost': {**_percentiles(costs, 6), 'mean': round(sum(costs) / len(costs), 6) if costs else None},
+        'claude_seconds': _percentiles(walls),
+    }
+    return {
+        'calls': sum(len(rows) for rows in groups.values()),
+        'cost': round(sum(r['cost'] for rows in groups.values() for r in rows), 6),
+        'by_type': by_type,
+        'per_recipe': per_recipe,
+    }
+
+
+def run_summary() -> str:
+    """One line on this run's Claude calls, for the end of a CLI run"""
+    records = list(get_default_log().records)
+    if not records:
+        return ""
+    parts = []
+    for prompt_type in dict.fromkeys(r.prompt_type for r in records):
+        rows = [r for r in records if r.prompt_type == prompt_type]
+        wall = sum(r.wall_seconds or 0.0 for r in rows)
+        parts.append(f"{prompt_type} {len(rows)}× {wall:.1f}s")
+    tokens = sum(r.input_tokens + r.cache_creation_input_tokens + r.cache_read_input_tokens + r.output_tokens
+                 for r in records)
+    return f"🧾 Claude: {', '.join(parts)}; {tokens} tokens, ${sum(r.cost for r in records):.4f}"
+
+
+def _fmt(value: Optional[float], unit: str = 's') -> str:
+    return f"{value:.2f}{unit}" if value is not None else "-"
+
+
+def main():
+    log = AccountingLog.from_env()
+    if not log.path:
+        log = AccountingLog()
+    records = list(log.read())
+
+    if '--since' in sys.argv:
+        hours = float(sys.argv[sys.argv.index('--since') + 1])
+        records = [r for r in records if r['time'] >= time.time() - hours * 3600]
+    if '--run' in sys.argv:
+        run = sys.argv[sys.argv.index('--run') + 1]
+        if run == 'last' and records:
+            run = records[-1]['run']
+        records = [r for r in records if r['run'] == run]
+
+    summary = aggregate(records)
+    if '--json' in sys.argv:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"🧾 Claude call log: {log.path}")
+    print(f"   {summary['calls']} calls, ${summary['cost']:.4f}")
+    print(f"   {'prompt type / model':<44} {'calls':>5} {'p50':>7} {'p95':>7} {'p99':>7} {'ttft p50':>9} "
+          f"{'in':>6} {'out':>6} {'cost':>9}")
+    for name, group in summary['by_type'].items():
+        wall = group['wall_seconds']
+        print(f"   {name:<44} {group['calls']:>5} {_fmt(wall['p50']):>7} {_fmt(wall['p95']):>7} "
+              f"{_fmt(wall['p99']):>7} {_fmt(group['ttft_seconds']['p50']):>9} {group['avg_input_tokens']:>6} "
+              f"{group['avg_output_tokens']:>6} ${group['cost']:>8.4f}")
+    per_recipe = summary['per_recipe']
+    if per_recipe['recipes']:
+        cost = per_recipe['cost']
+        seconds = per_recipe['claude_seconds']
+        print(f"   Per recipe ({per_recipe['recipes']} recipes, {per_recipe['calls_per_recipe']} calls each): "
+              f"${cost['mean']:.4f} mean, p50 ${cost['p50']:.4f}, p95 ${cost['p95']:.4f}, p99 ${cost['p99']:.4f}; "
+              f"Claude time p50 {_fmt(seconds['p50'])}, p95 {_fmt(seconds['p95'])}, p99 {_fmt(seconds['p99'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,655 @@
+"""
+Claude Client Helpers
+Shared request path for the Claude calls in main.py, recipe_cli.py and
+anthro_test.py. Each caller keeps its own prompts and tools; this
+module owns sending the request, the persistent response cache and
+Anthropic prompt caching.
+
+Prompts are split into a static instruction prefix, sent as a system block
+with a cache_control breakpoint, and the per-recipe content, sent last as
+the user message. Identical prefixes are then read from Anthropic's prompt
+cache instead of being processed again. The API only caches prefixes above
+a model-specific minimum (1024 tokens for Sonnet); shorter ones are sent
+normally and show up as zero cache reads.
+
+complete_tool/stream_tool force the answer through a tool whose
+input_schema describes the expected JSON. The tool input is checked with
+the tool's compiled validator; an invalid answer is sent back as an error
+tool_result so the model can correct just that response, instead of the
+caller failing on json.loads and rerunning the whole pipeline.
+
+A tool answer cut off at max_tokens is not thrown away: the array elements
+that arrived whole are salvaged (json_stream.salvage_json) and a
+continuation request asks only for the items after them. A full retry with
+a larger limit is made only when nothing could be salvaged.
+truncation_stats compares the two.
+
+acomplete_tool is the asyncio form, for overlapping calls across recipes;
+its requests share a rate_limiter.RateLimiter budget.
+
+Every response is logged to claude_accounting with its model, prompt
+type, token usage, wall time and (for streams) time to first token.
+
+Non-streaming requests go through claude_resilience, which sets each
+request's timeout from the latencies seen for its prompt type, retries
+timeouts and transient errors with jittered backoff and, when enabled,
+hedges slow requests with a duplicate.
+"""
+import copy
+import json
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from types import SimpleNamespace
+from typing import Dict, Generator, Iterator, List, Optional, Tuple, TypeVar
+
+import anthropic
+
+from claude_accounting import record_response
+from json_stream import array_names, drop_partial_tail, merge_continuation, salvage_json
+from llm_cache import cache_key, get_default_cache
+from claude_resilience import SERVER_ERROR_STATUSES, get_default_resilience
+from rate_limiter import RateLimiter, estimate_request_tokens, get_default_limiter
+from recipe_schemas import prompt_type, validator_for
+
+T = TypeVar('T')
+
+# Correction round trips allowed after a tool answer fails validation
+DEFAULT_TOOL_RETRIES = 1
+
+# Continuation requests allowed for one answer cut off at max_tokens
+MAX_CONTINUATIONS = 2
+
+# Cap on the doubled output limit of a full retry, made when nothing could be salvaged
+MAX_RETRY_TOKENS = 16384
+
+
+class StructuredOutputError(ValueError):
+    """Claude's tool input still failed validation after the allowed retries"""
+
+    def __init__(self, tool_name: str, errors: List[str]):
+        self.tool_name = tool_name
+        self.errors = errors
+        super().__init__(f"{tool_name} output invalid: {'; '.join(errors[:5])}")
+
+
+@dataclass
+class PromptCacheStats:
+    """Running totals of Anthropic prompt-cache usage across API calls"""
+    requests: int = 0
+    input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+    def record(self, usage):
+        with _stats_lock:
+            self.requests += 1
+            self.input_tokens += getattr(usage, 'input_tokens', 0) or 0
+            self.cache_creation_input_tokens += getattr(usage, 'cache_creation_input_tokens', 0) or 0
+            self.cache_read_input_tokens += getattr(usage, 'cache_read_input_tokens', 0) or 0
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        prompt_tokens = self.input_tokens + self.cache_creation_input_tokens + self.cache_read_input_tokens
+        result['cache_read_ratio'] = round(self.cache_read_input_tokens / prompt_tokens, 4) if prompt_tokens else 0.0
+        return result
+
+
+@dataclass
+class StructuredOutputStats:
+    """Counts of tool answers that passed validation, failed it, and were retried"""
+    calls: int = 0
+    valid_first_try: int = 0
+    validation_failures: int = 0
+    retries: int = 0
+    failed: int = 0
+
+    def record(self, **counters: int):
+        with _stats_lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        result['failure_rate'] = round(self.validation_failures / self.calls, 4) if self.calls else 0.0
+        return result
+
+
+@dataclass
+class TruncationStats:
+    """
+    Answers cut off at max_tokens, and what recovering them cost.
+
+    tokens_saved is the salvaged output that a full retry would have
+    generated again, less the extra prompt tokens the continuation request
+    spent listing the items already received. full_retry_tokens is the
+    output spent regenerating answers nothing could be salvaged from.
+    """
+    truncated: int = 0
+    salvaged_items: int = 0
+    continuations: int = 0
+    tokens_saved: int = 0
+    full_retries: int = 0
+    full_retry_tokens: int = 0
+
+    def record(self, **counters: int):
+        with _stats_lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class UsageMeter:
+    """Token usage of the responses received inside one metered() block"""
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+    def add(self, usage):
+        self.requests += 1
+        for name in ('input_tokens', 'output_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens'):
+            setattr(self, name, getattr(self, name) + (getattr(usage, name, 0) or 0))
+
+
+_usage_meter: ContextVar[Optional[UsageMeter]] = ContextVar('usage_meter', default=None)
+
+
+@contextmanager
+def metered() -> Iterator[UsageMeter]:
+    """
+    Count the usage of every Claude response received inside the block,
+    follow-up requests included, also from asyncio tasks started inside it.
+    """
+    meter = UsageMeter()
+    token = _usage_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _usage_meter.reset(token)
+
+
+def _record_usage(response, params: Dict, wall_seconds: Optional[float], ttft_seconds: Optional[float] = None):
+    record_response(response, params, prompt_type(params), wall_seconds, ttft_seconds)
+    usage = getattr(response, 'usage', None)
+    prompt_cache_stats.record(usage)
+    meter = _usage_meter.get()
+    if meter is not None:
+        with _stats_lock:
+            meter.add(usage)
+
+
+_stats_lock = threading.Lock()
+prompt_cache_stats = PromptCacheStats()
+structured_output_stats = StructuredOutputStats()
+truncation_stats = TruncationStats()
+
+
+def message_params(
+    prompt: str,
+    model: str,
+    max_tokens: int = 4096,
+    prefix: Optional[str] = None,
+    tool: Optional[Dict] = None,
+) -> Dict:
+    """
+    messages.create arguments for a prompt, with the prefix as a cached system
+    block and, when a tool is given, the answer forced through that tool
+    """
+    params = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    if prefix:
+        params["system"] = [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}]
+    if tool:
+        params["tools"] = [tool]
+        params["tool_choice"] = {"type": "tool", "name": tool["name"]}
+    return params
+
+
+def request_cache_key(
+    prompt: str,
+    model: str,
+    max_tokens: int = 4096,
+    prefix: Optional[str] = None,
+    tool: Optional[Dict] = None,
+) -> str:
+    """Response-cache key for the request message_params builds"""
+    extra = {}
+    if prefix:
+        extra["prefix"] = prefix
+    if tool:
+        extra["tool"] = tool
+    return cache_key(model, max_tokens, prompt, extra=extra or None)
+
+
+def complete(
+    client: anthropic.Anthropic,
+    prompt: str,
+    model: str,
+    max_tokens: int = 4096,
+    use_cache: bool = True,
+    prefix: Optional[str] = None,
+) -> str:
+    """
+    Send a single user-message request and return the response text.
+
+    Args:
+        client: Anthropic client
+        prompt: Per-request user message (recipe text, servings, recipe JSON)
+        model: Model ID
+        max_tokens: Output token limit
+        use_cache: Set False to bypass the response cache for this call
+        prefix: Static instructions, sent first with a prompt-cache breakpoint
+
+    Returns:
+        The text of the first content block
+    """
+    cache = get_default_cache() if use_cache else None
+    key: Optional[str] = None
+    if cache is not None:
+        key = request_cache_key(prompt, model, max_tokens, prefix)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached.text
+
+    response = _create(client, message_params(prompt, model, max_tokens, prefix))
+    text = response.content[0].text
+    if response.stop_reason != 'max_tokens':
+        _store(cache, key, model, text, response)
+    return text
+
+
+def stream_complete(
+    client: anthropic.Anthropic,
+    prompt: str,
+    model: str,
+    max_tokens: int = 4096,
+    use_cache: bool = True,
+    prefix: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Streaming form of complete: yield response text chunks as they are generated.
+
+    A response-cache hit is yielded as a single chunk. The full text is
+    cached once the stream finishes, exactly as complete would.
+    """
+    cache = get_default_cache() if use_cache else None
+    key: Optional[str] = None
+    if cache is not None:
+        key = request_cache_key(prompt, model, max_tokens, prefix)
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached.text
+            return
+
+    params = message_params(prompt, model, max_tokens, prefix)
+    chunks = []
+    timing = {'start': time.monotonic()}
+    with client.messages.stream(**params) as stream:
+        for chunk in _timed(stream.text_stream, timing):
+            chunks.append(chunk)
+            yield chunk
+        response = stream.get_final_message()
+    _record_usage(response, params, timing['wall'], timing.get('ttft'))
+    if response.stop_reason != 'max_tokens':
+        _store(cache, key, model, ''.join(chunks), response)
+
+
+def _timed(chunks: Iterator[str], timing: Dict) -> Iterator[str]:
+    """
+    Pass chunks through, noting the time to the first one and the stream's
+    wall time from timing['start']. Time the consumer spends between chunks
+    (searching the store for an item, say) is left out of the wall time.
+    """
+    paused = 0.0
+    for chunk in chunks:
+        timing.setdefault('ttft', time.monotonic() - timing['start'])
+        suspended = time.monotonic()
+        yield chunk
+        paused += time.monotonic() - suspended
+    timing['wall'] = time.monotonic() - timing['start'] - paused
+
+
+def _store(cache, key: Optional[str], model: str, text: str, response):
+    """Put a complete response in the response cache, with its token usage"""
+    usage = getattr(response, 'usage', None)
+    if cache is not None:
+        cache.put(
+            key,
+            model,
+            text,
+            input_tokens=getattr(usage, 'input_tokens', 0) or 0,
+            output_tokens=getattr(usage, 'output_tokens', 0) or 0,
+        )
+
+
+def tool_input(response, tool_name: str) -> Tuple[Optional[object], Dict]:
+    """Return (tool_use block, its input) from a response, or (None, {})"""
+    for block in response.content:
+        if getattr(block, 'type', None) == 'tool_use' and block.name == tool_name:
+            return block, block.input if isinstance(block.input, dict) else {}
+    return None, {}
+
+
+def _correction_messages(prompt: str, block, errors: List[str]) -> List[Dict]:
+    """Conversation asking the model to resend a tool call that failed validation"""
+    problems = '\n'.join(f"- {error}" for error in errors[:20])
+    return [
+        {"role": "user", "content": prompt},
+        {"role": "assistant", "content": [
+            {"type": "tool_use", "id": block.id, "name": block.name, "input": block.input},
+        ]},
+        {"role": "user", "content": [{
+            "type": "tool_result",
+            "tool_use_id": block.id,
+            "is_error": True,
+            "content": f"The input did not match the schema:\n{problems}\nCall the tool again with the complete, corrected input.",
+        }]},
+    ]
+
+
+def _tokens(response, field: str) -> int:
+    return getattr(getattr(response, 'usage', None), field, 0) or 0
+
+
+def _salvage(data: Dict, partial_json: Optional[str]) -> Dict:
+    """The finished part of a truncated tool input, from the raw JSON when streamed"""
+    if partial_json:
+        try:
+            value, _ = salvage_json(partial_json)
+        except ValueError:
+            value = None
+        if isinstance(value, dict):
+            return value
+    return drop_partial_tail(copy.deepcopy(data))
+
+
+def _continuation_prompt(prompt: str, tool: Dict, received: Dict[str, List[str]]) -> str:
+    listed = '\n'.join(f"- {path}: {', '.join(names)}" for path, names in received.items())
+    return (
+        f"{prompt}\n\nAn earlier answer was cut off at the output limit after these items:\n{listed}\n\n"
+        f"Call {tool['name']} again with every other field filled in, but list only the items "
+        f"that come after these."
+    )
+
+
+# Follow-up logic is written once as a generator that yields the
+# messages.create params it needs sent and is sent back each response;
+# validated_tool_input drives it with a sync client and
+# avalidated_tool_input with an async one.
+Exchange = Generator[Dict, object, T]
+
+
+def _recover_truncated(
+    prompt: str,
+    tool: Dict,
+    params: Dict,
+    response,
+    partial_json: Optional[str] = None,
+) -> Exchange:
+    """
+    Rebuild a tool answer cut off at max_tokens: keep the finished items and
+    request only the remainder, or retry in full with a larger output limit
+    when no item finished. Returns (tool_use block, input) like tool_input.
+    """
+    truncation_stats.record(truncated=1)
+    block, data = tool_input(response, tool["name"])
+    partial = _salvage(data, partial_json)
+    received = array_names(partial)
+
+    if not received:
+        retry = yield {**params, "max_tokens": min(params["max_tokens"] * 2, MAX_RETRY_TOKENS)}
+        truncation_stats.record(full_retries=1, full_retry_tokens=_tokens(retry, 'output_tokens'))
+        return tool_input(retry, tool["name"])
+
+    truncation_stats.record(salvaged_items=sum(len(names) for names in received.values()))
+    for _ in range(MAX_CONTINUATIONS):
+        messages = [{"role": "user", "content": _continuation_prompt(prompt, tool, received)}]
+        rest_response = yield {**params, "messages": messages}
+        overhead = _tokens(rest_response, 'input_tokens') - _tokens(response, 'input_tokens')
+        truncation_stats.record(
+            continuations=1,
+            tokens_saved=max(0, _tokens(response, 'output_tokens') - overhead),
+        )
+        rest_block, rest = tool_input(rest_response, tool["name"])
+        if rest_block is None:
+            break
+        block = rest_block
+        cut_off = rest_response.stop_reason == 'max_tokens'
+        partial = merge_continuation(partial, drop_partial_tail(rest) if cut_off else rest)
+        if not cut_off:
+            break
+        response = rest_response
+        received = array_names(partial)
+
+    if block is None:
+        return None, partial
+    return SimpleNamespace(type='tool_use', id=block.id, name=block.name, input=partial), partial
+
+
+def tool_exchange(
+    prompt: str,
+    tool: Dict,
+    params: Dict,
+    response,
+    max_retries: int,
+    partial_json: Optional[str] = None,
+) -> Exchange:
+    """
+    Follow-up requests that turn response into validated tool input.
+
+    An answer cut off at max_tokens is first completed with _recover_truncated
+    (partial_json is the raw streamed input, if there is one); invalid input
+    is then sent back for correction up to max_retries times.
+    """
+    validate = validator_for(tool)
+    if response.stop_reason == 'max_tokens':
+        block, data = yield from _recover_truncated(prompt, tool, params, response, partial_json)
+    else:
+        block, data = tool_input(response, tool["name"])
+    errors = validate(data) if block is not None else ["no tool call in response"]
+    structured_output_stats.record(calls=1, valid_first_try=int(not errors), validation_failures=int(bool(errors)))
+
+    attempts = 0
+    while errors and attempts < max_retries and block is not None:
+        attempts += 1
+        structured_output_stats.record(retries=1)
+        response = yield {**params, "messages": _correction_messages(prompt, block, errors)}
+        block, data = tool_input(response, tool["name"])
+        errors = validate(data) if block is not None else ["no tool call in response"]
+
+    if errors:
+        structured_output_stats.record(failed=1)
+        raise StructuredOutputError(tool["name"], errors)
+    return data
+
+
+def _create(client: anthropic.Anthropic, params: Dict):
+    # Retries are left to the resilience layer, so the SDK's are turned off
+    def send(timeout: float):
+        return client.with_options(max_retries=0, timeout=timeout).messages.create(**params)
+
+    start = time.monotonic()
+    # A hedge's losing request is still billed, so its usage is logged when it finishes
+    response = get_default_resilience().call(
+        prompt_type(params), send, on_discard=lambda lost: _record_usage(lost, params, None)
+    )
+    _record_usage(response, params, time.monotonic() - start)
+    return response
+
+
+async def _acreate(client: anthropic.AsyncAnthropic, params: Dict, limiter: RateLimiter):
+    # Inside the limiter's slot, so a request's latency excludes its wait for
+    # budget; 429/529 propagate to the limiter, which pauses every caller
+    def send(timeout: float):
+        return client.with_options(max_retries=0, timeout=timeout).messages.create(**params)
+
+    started = []
+
+    def attempt():
+        started.append(time.monotonic())
+        return get_default_resilience().acall(prompt_type(params), send, SERVER_ERROR_STATUSES)
+
+    response = await limiter.call(attempt, estimate_request_tokens(params))
+    _record_usage(response, params, time.monotonic() - started[-1])
+    return response
+
+
+def validated_tool_input(
+    client: anthropic.Anthropic,
+    prompt: str,
+    tool: Dict,
+    params: Dict,
+    response,
+    max_retries: int,
+    partial_json: Optional[str] = None,
+) -> Dict:
+    """
+    Run tool_exchange with a sync client and return the validated tool input.
+
+    Raises:
+        StructuredOutputError: still invalid after the retries
+    """
+    exchange = tool_exchange(prompt, tool, params, response, max_retries, partial_json)
+    try:
+        request = next(exchange)
+        while True:
+            request = exchange.send(_create(client, request))
+    except StopIteration as done:
+        return done.value
+
+
+async def avalidated_tool_input(
+    client: anthropic.AsyncAnthropic,
+    prompt: str,
+    tool: Dict,
+    params: Dict,
+    response,
+    max_retries: int,
+    limiter: RateLimiter,
+) -> Dict:
+    """Async validated_tool_input; follow-up requests go through limiter"""
+    exchange = tool_exchange(prompt, tool, params, response, max_retries)
+    try:
+        request = next(exchange)
+        while True:
+            request = exchange.send(await _acreate(client, request, limiter))
+    except StopIteration as done:
+        return done.value
+
+
+def complete_tool(
+    client: anthropic.Anthropic,
+    prompt: str,
+    model: str,
+    tool: Dict,
+    max_tokens: int = 4096,
+    use_cache: bool = True,
+    prefix: Optional[str] = None,
+    max_retries: int = DEFAULT_TOOL_RETRIES,
+) -> Dict:
+    """
+    Send a request whose answer is forced through tool and return the validated tool input.
+
+    Raises:
+        StructuredOutputError: the input still failed validation after max_retries corrections
+    """
+    cache = get_default_cache() if use_cache else None
+    key: Optional[str] = None
+    if cache is not None:
+        key = request_cache_key(prompt, model, max_tokens, prefix, tool)
+        cached = cache.get(key)
+        if cached is not None:
+            return json.loads(cached.text)
+
+    params = message_params(prompt, model, max_tokens, prefix, tool)
+    response = _create(client, params)
+    data = validated_tool_input(client, prompt, tool, params, response, max_retries)
+    _store(cache, key, model, json.dumps(data), response)
+    return data
+
+
+async def acomplete_tool(
+    client: anthropic.AsyncAnthropic,
+    prompt: str,
+    model: str,
+    tool: Dict,
+    max_tokens: int = 4096,
+    use_cache: bool = True,
+    prefix: Optional[str] = None,
+    max_retries: int = DEFAULT_TOOL_RETRIES,
+    limiter: Optional[RateLimiter] = None,
+) -> Dict:
+    """
+    Async complete_tool. Every request, follow-ups included, waits for room
+    under limiter (the process-wide one from the environment by default),
+    so many of these can run at once without exceeding the API limits.
+    """
+    limiter = limiter or get_default_limiter()
+    cache = get_default_cache() if use_cache else None
+    key: Optional[str] = None
+    if cache is not None:
+        key = request_cache_key(prompt, model, max_tokens, prefix, tool)
+        cached = cache.get(key)
+        if cached is not None:
+            return json.loads(cached.text)
+
+    params = message_params(prompt, model, max_tokens, prefix, tool)
+    response = await _acreate(client, params, limiter)
+    data = await avalidated_tool_input(client, prompt, tool, params, response, max_retries, limiter)
+    _store(cache, key, model, json.dumps(data), response)
+    return data
+
+
+def stream_tool(
+    client: anthropic.Anthropic,
+    prompt: str,
+    model: str,
+    tool: Dict,
+    max_tokens: int = 4096,
+    use_cache: bool = True,
+    prefix: Optional[str] = None,
+    max_retries: int = DEFAULT_TOOL_RETRIES,
+) -> Generator[str, None, Dict]:
+    """
+    Streaming complete_tool: yield the tool input's JSON text as it is
+    generated, then return the validated input.
+
+    Correction retries and truncation continuations are not streamed, so the
+    returned input can hold more, or different, items than the streamed
+    text: callers showing items as they arrive should reconcile with it.
+    """
+    cache = get_default_cache() if use_cache else None
+    key: Optional[str] = None
+    if cache is not None:
+        key = request_cache_key(prompt, model, max_tokens, prefix, tool)
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached.text
+            return json.loads(cached.text)
+
+    params = message_params(prompt, model, max_tokens, prefix, tool)
+    chunks = []
+    timing = {'start': time.monotonic()}
+    with client.messages.stream(**params) as stream:
+        deltas = (
+            event.delta.partial_json for event in stream
+            if event.type == 'content_block_delta' and getattr(event.delta, 'type', None) == 'input_json_delta'
+        )
+        for chunk in _timed(deltas, timing):
+            chunks.append(chunk)
+            yield chunk
+        response = stream.get_final_message()
+    _record_usage(response, params, timing['wall'], timing.get('ttft'))
+    data = validated_tool_input(client, prompt, tool, params, response, max_retries, ''.join(chunks))
+    _store(cache, key, model, json.dumps(data), response)
+    return data
@@ -0,0 +1,378 @@
+"""
+Claude Call Resilience
+Timeouts, retries and hedged requests around messages.create, set from
+the latencies actually observed for each prompt type (parse, scale, ...).
+
+Each prompt type keeps a rolling window of recent response times. Once
+min_samples have been seen, a request's timeout is the observed p99 times
+timeout_multiplier, clamped to [min_timeout, max_timeout]; until then it is
+default_timeout. A timed-out request counts as a sample at the timeout, so
+timeouts stretch when the API slows down.
+
+With hedging on, a request still running past the type's p90 gets a
+duplicate, and whichever answers first is used. That percentile comes from
+a second window holding only the requests whose answers were used, each
+timed from its own send: timed-out requests and hedge losers stay out of
+it, so a slow tail doesn't pull the hedge delay up to the slow latency.
+A hedge costs a second request's tokens, which is why it's off by default.
+The losing sync request can't be interrupted; it runs to completion and its
+response goes to the caller's on_discard so its usage is still logged. The
+losing async request is cancelled. Timeouts, connection errors and
+transient status codes are retried with jittered exponential backoff,
+honoring Retry-After when the server sends one.
+
+Latency windows are saved to CLAUDE_LATENCY_PATH at exit, so single-recipe
+runs start from the previous runs' percentiles.
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import random
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, asdict, field
+from typing import Awaitable, Callable, Deque, Dict, Iterable, Optional, Tuple, TypeVar
+
+import anthropic
+
+from claude_accounting import percentile
+from rate_limiter import retry_after
+
+DEFAULT_LATENCY_PATH = os.path.expanduser('~/.cache/thought_to_table/claude_latency.json')
+
+# Status codes worth retrying: rate limited, server errors, overloaded
+TRANSIENT_STATUSES = (429, 500, 502, 503, 504, 529)
+# The async path leaves 429/529 to the rate limiter, which pauses all callers
+SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+
+T = TypeVar('T')
+
+
+@dataclass
+class ResiliencePolicy:
+    """Timeout, hedging and retry settings"""
+    default_timeout: float = 120.0
+    min_timeout: float = 10.0
+    max_timeout: float = 600.0
+    timeout_percentile: float = 99.0
+    timeout_multiplier: float = 2.0
+    hedge: bool = False
+    hedge_percentile: float = 90.0
+    min_samples: int = 20
+    window: int = 200
+    max_retries: int = 3
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> 'ResiliencePolicy':
+        """Policy from CLAUDE_TIMEOUT, CLAUDE_HEDGE and CLAUDE_MAX_RETRIES"""
+        return cls(
+            default_timeout=float(os.getenv('CLAUDE_TIMEOUT', cls.default_timeout)),
+            hedge=os.getenv('CLAUDE_HEDGE', '').lower() in ('1', 'true', 'yes'),
+            max_retries=int(os.getenv('CLAUDE_MAX_RETRIES', cls.max_retries)),
+        )
+
+
+class LatencyWindow:
+    """The last `size` response times for one prompt type, with percentiles"""
+
+    def __init__(self, size: int = 200, samples: Iterable[float] = ()):
+        self.samples: Deque[float] = deque(samples, maxlen=size)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        return percentile(self.samples, pct)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+
+@dataclass
+class TypeStats:
+    """Per-prompt-type counters"""
+    calls: int = 0
+    timeouts: int = 0
+    retries: int = 0
+    failures: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+
+
+@dataclass
+class ResilienceStats:
+    types: Dict[str, TypeStats] = field(default_factory=dict)
+
+    def of(self, prompt_type: str) -> TypeStats:
+        return self.types.setdefault(prompt_type, TypeStats())
+
+
+class ClaudeResilience:
+    """Adaptive timeouts, hedging and retries for Claude requests, per prompt type"""
+
+    def __init__(self, policy: Optional[ResiliencePolicy] = None, latency_path: Optional[str] = None):
+        """
+        Initialize the resilience layer.
+
+        Args:
+            policy: Timeout/hedge/retry settings (default: ResiliencePolicy())
+            latency_path: JSON file to load latency windows from and save them to (default: none)
+        """
+        self.policy = policy or ResiliencePolicy()
+        self.latency_path = latency_path
+        self.windows: Dict[str, LatencyWindow] = {}
+        # Latencies of the requests whose answers were used, for hedge delays
+        self.answered: Dict[str, LatencyWindow] = {}
+        self.stats = ResilienceStats()
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        if latency_path:
+            self.load()
+
+    def _window(self, prompt_type: str, windows: Optional[Dict[str, LatencyWindow]] = None) -> LatencyWindow:
+        windows = self.windows if windows is None else windows
+        with self._lock:
+            if prompt_type not in windows:
+                windows[prompt_type] = LatencyWindow(self.policy.window)
+            return windows[prompt_type]
+
+    def observe(self, prompt_type: str, seconds: float, answered: bool = True):
+        """Add a response time; answered=False for timeouts and hedge losers"""
+        windows = [self._window(prompt_type)]
+        if answered:
+            windows.append(self._window(prompt_type, self.answered))
+        with self._lock:
+            for window in windows:
+                window.add(seconds)
+
+    def timeout(self, prompt_type: str) -> float:
+        """Request timeout for prompt_type from its observed latency"""
+        window = self._window(prompt_type)
+        if len(window) < self.policy.min_samples:
+            return self.policy.default_timeout
+        observed = window.percentile(self.policy.timeout_percentile) * self.policy.timeout_multiplier
+        return min(self.policy.max_timeout, max(self.policy.min_timeout, observed))
+
+    def hedge_delay(self, prompt_type: str) -> Optional[float]:
+        """Seconds after which to send a duplicate request, or None to not hedge"""
+        window = self._window(prompt_type, self.answered)
+        if not self.policy.hedge or len(window) < self.policy.min_samples:
+            return None
+        return window.percentile(self.policy.hedge_percentile)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = retry_after(error) if isinstance(error, anthropic.APIStatusError) else None
+        if delay is None:
+            delay = min(self.policy.backoff_base * 2 ** (attempt - 1), self.policy.backoff_max)
+            delay *= random.uniform(0.5, 1.5)
+        return delay
+
+    def _transient(self, error: Exception, statuses) -> bool:
+        if isinstance(error, anthropic.APIStatusError):
+            return error.status_code in statuses
+        return isinstance(error, anthropic.APIConnectionError)  # includes APITimeoutError
+
+    def _failed_attempt(self, prompt_type: str, error: Exception, timeout: float, attempt: int, statuses) -> float:
+        """Book a failed attempt; return the backoff before the next one, or re-raise"""
+        stats = self.stats.of(prompt_type)
+        if isinstance(error, anthropic.APITimeoutError):
+            stats.timeouts += 1
+            self.observe(prompt_type, timeout, answered=False)
+        if not self._transient(error, statuses) or attempt > self.policy.max_retries:
+            stats.failures += 1
+            raise error
+        stats.retries += 1
+        delay = self._backoff(attempt, error)
+        print(f"⚠️  Claude {prompt_type} request failed ({type(error).__name__}); "
+              f"retry {attempt}/{self.policy.max_retries} in {delay:.1f}s", file=sys.stderr)
+        return delay
+
+    def call(
+        self,
+        prompt_type: str,
+        send: Callable[[float], T],
+        statuses=TRANSIENT_STATUSES,
+        on_discard: Optional[Callable[[T], None]] = None,
+    ) -> T:
+        """
+        Run send(timeout) with retries, and a hedged duplicate when enabled.
+
+        send must make one request with the given timeout and no retries of its own.
+        on_discard is called (in the caller's context, from a worker thread)
+        with the result of a hedge's losing request once it completes.
+        """
+        self.stats.of(prompt_type).calls += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = self.timeout(prompt_type)
+            try:
+                return self._hedged(prompt_type, send, timeout, on_discard)
+            except Exception as e:
+                time.sleep(self._failed_attempt(prompt_type, e, timeout, attempt, statuses))
+
+    @staticmethod
+    def _timed(send: Callable[[float], T], timeout: float) -> Tuple[T, float]:
+        start = time.monotonic()
+        result = send(timeout)
+        return result, time.monotonic() - start
+
+    def _discard(self, prompt_type: str, future: Future, on_discard: Optional[Callable[[T], None]],
+                 context: contextvars.Context):
+        """Done callback for a hedge's losing request: keep its latency and hand over its result"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        result, seconds = future.result()
+        self.observe(prompt_type, seconds, answered=False)
+        if on_discard is not None:
+            context.run(on_discard, result)
+
+    def _hedged(
+        self, prompt_type: str, send: Callable[[float], T], timeout: float,
+        on_discard: Optional[Callable[[T], None]] = None,
+    ) -> T:
+        delay = self.hedge_delay(prompt_type)
+        if delay is None:
+            result, seconds = self._timed(send, timeout)
+            self.observe(prompt_type, seconds)
+            return result
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='claude-hedge')
+        primary = self._pool.submit(self._timed, send, timeout)
+        done, _ = wait([primary], timeout=delay)
+        futures = pending = {primary}
+        if not done:
+            self.stats.of(prompt_type).hedges += 1
+            futures = pending = {primary, self._pool.submit(self._timed, send, timeout)}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The loser can't be interrupted; it finishes in the pool
+                    context = contextvars.copy_context()
+                    for loser in futures - {future}:
+                        loser.add_done_callback(lambda f: self._discard(prompt_type, f, on_discard, context))
+                    result, seconds = future.result()
+                    self.observe(prompt_type, seconds)
+                    if future is not primary:
+                        self.stats.of(prompt_type).hedge_wins += 1
+                    return result
+                error = future.exception()
+        raise error
+
+    async def acall(
+        self,
+        prompt_type: str,
+        send: Callable[[float], Awaitable[T]],
+        statuses=SERVER_ERROR_STATUSES,
+    ) -> T:
+        """Async call; the request that loses a hedge is cancelled"""
+        self.stats.of(prompt_type).calls += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = self.timeout(prompt_type)
+            try:
+                return await self._ahedged(prompt_type, send, timeout)
+            except Exception as e:
+                await asyncio.sleep(self._failed_attempt(prompt_type, e, timeout, attempt, statuses))
+
+    @staticmethod
+    async def _atimed(send: Callable[[float], Awaitable[T]], timeout: float) -> Tuple[T, float]:
+        start = time.monotonic()
+        result = await send(timeout)
+        return result, time.monotonic() - start
+
+    async def _ahedged(self, prompt_type: str, send: Callable[[float], Awaitable[T]], timeout: float) -> T:
+        delay = self.hedge_delay(prompt_type)
+        if delay is None:
+            result, seconds = await self._atimed(send, timeout)
+            self.observe(prompt_type, seconds)
+            return result
+
+        primary = asyncio.ensure_future(self._atimed(send, timeout))
+        done, _ = await asyncio.wait([primary], timeout=delay)
+        pending = {primary}
+        if not done:
+            self.stats.of(prompt_type).hedges += 1
+            pending.add(asyncio.ensure_future(self._atimed(send, timeout)))
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        result, seconds = task.result()
+                        self.observe(prompt_type, seconds)
+                        if task is not primary:
+                            self.stats.of(prompt_type).hedge_wins += 1
+                        return result
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per prompt type: counters plus p50/p95/p99 latency and the current timeout"""
+        result = {}
+        for prompt_type, window in list(self.windows.items()):
+            entry = asdict(self.stats.of(prompt_type))
+            for pct in (50, 95, 99):
+                value = window.percentile(pct)
+                entry[f'p{pct}'] = round(value, 3) if value is not None else None
+            entry['samples'] = len(window)
+            entry['timeout'] = round(self.timeout(prompt_type), 1)
+            result[prompt_type] = entry
+        return result
+
+    def load(self):
+        try:
+            with open(self.latency_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data.get('windows'), dict):
+            # Saved before answered latencies were kept apart; seed both from the one window
+            data = {'windows': data, 'answered': data}
+        for name, windows in (('windows', self.windows), ('answered', self.answered)):
+            for prompt_type, samples in data.get(name, {}).items():
+                windows[prompt_type] = LatencyWindow(self.policy.window, samples)
+
+    def save(self):
+        if not self.latency_path or not self.windows:
+            return
+        os.makedirs(os.path.dirname(self.latency_path) or '.', exist_ok=True)
+        tmp = f"{self.latency_path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({
+                name: {t: list(w.samples) for t, w in windows.items()}
+                for name, windows in (('windows', self.windows), ('answered', self.answered))
+            }, f)
+        os.replace(tmp, self.latency_path)
+
+
+_default_resilience: Optional[ClaudeResilience] = None
+_default_lock = threading.Lock()
+
+
+def get_default_resilience() -> ClaudeResilience:
+    """Process-wide resilience layer from the environment, saved at exit"""
+    global _default_resilience
+    with _default_lock:
+        if _default_resilience is None:
+            _default_resilience = ClaudeResilience(
+                ResiliencePolicy.from_env(),
+                latency_path=os.getenv('CLAUDE_LATENCY_PATH', DEFAULT_LATENCY_PATH),
+            )
+            atexit.register(_default_resilience.save)
+        return _default_resilience
@@ -0,0 +1,51 @@
+"""
+HTML Parsing Backends
+Picks the fastest BeautifulSoup tree builder available for recipe pages.
+
+lxml (C-backed) is used when installed and falls back to the pure-Python
+html.parser otherwise. Set RECIPE_HTML_PARSER to force a backend.
+"""
+import os
+from typing import Iterable, List, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Fastest first
+PREFERRED_BACKENDS = ['lxml', 'html.parser']
+
+
+def available_backends() -> List[str]:
+    """Tree builders usable in this environment, fastest first"""
+    return [b for b in PREFERRED_BACKENDS if b != 'lxml' or LXML_AVAILABLE]
+
+
+def default_backend() -> str:
+    """Backend from RECIPE_HTML_PARSER if usable, else the fastest installed one"""
+    requested = os.getenv('RECIPE_HTML_PARSER')
+    if requested and requested in available_backends():
+        return requested
+    return available_backends()[0]
+
+
+def make_soup(html: str, backend: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parse HTML with the chosen (or default) backend.
+
+    Args:
+        html: Page markup
+        backend: 'lxml' or 'html.parser'; None picks default_backend()
+    """
+    return BeautifulSoup(html, backend or default_backend())
+
+
+def page_text(soup: BeautifulSoup, strip_tags: Iterable[str]) -> str:
+    """Remove non-content elements and return newline-separated visible text"""
+    for el in soup(list(strip_tags)):
+        el.decompose()
+    return soup.get_text(separator='\n', strip=True)
@@ -0,0 +1,227 @@
+"""
+Ingredient Parsing
+Turns free-text ingredient lines ("1 ½ lb. russet potatoes, peeled") into the
+{name, amount, unit, category, notes} dicts used throughout the pipeline.
+"""
+import re
+from typing import Dict, Optional, Tuple
+
+CATEGORIES = ('produce', 'dairy', 'meat', 'seafood', 'pantry', 'spices', 'frozen', 'bakery')
+
+UNICODE_FRACTIONS = {
+    '½': '1/2', '⅓': '1/3', '⅔': '2/3', '¼': '1/4', '¾': '3/4',
+    '⅕': '1/5', '⅖': '2/5', '⅗': '3/5', '⅘': '4/5', '⅙': '1/6', '⅚': '5/6',
+    '⅛': '1/8', '⅜': '3/8', '⅝': '5/8', '⅞': '7/8',
+}
+
+# Spelling → canonical unit; canonical names follow the parse_recipe prompt
+UNIT_ALIASES = {
+    'lb': 'lb', 'lbs': 'lb', 'pound': 'lb', 'pounds': 'lb',
+    'oz': 'oz', 'ounce': 'oz', 'ounces': 'oz',
+    'cup': 'cup', 'cups': 'cup', 'c': 'cup',
+    'tbsp': 'tbsp', 'tbs': 'tbsp', 'tablespoon': 'tbsp', 'tablespoons': 'tbsp', 'T': 'tbsp',
+    'tsp': 'tsp', 'teaspoon': 'tsp', 'teaspoons': 'tsp', 't': 'tsp',
+    'g': 'g', 'gram': 'g', 'grams': 'g',
+    'kg': 'kg', 'kilogram': 'kg', 'kilograms': 'kg',
+    'ml': 'ml', 'milliliter': 'ml', 'milliliters': 'ml', 'millilitre': 'ml', 'millilitres': 'ml',
+    'l': 'l', 'liter': 'l', 'liters': 'l', 'litre': 'l', 'litres': 'l',
+    'qt': 'qt', 'quart': 'qt', 'quarts': 'qt',
+    'pt': 'pt', 'pint': 'pt', 'pints': 'pt',
+    'gal': 'gallon', 'gallon': 'gallon', 'gallons': 'gallon',
+    'clove': 'clove', 'cloves': 'clove',
+    'can': 'can', 'cans': 'can',
+    'bunch': 'bunch', 'bunches': 'bunch',
+    'head': 'head', 'heads': 'head',
+    'stalk': 'stalk', 'stalks': 'stalk',
+    'sprig': 'sprig', 'sprigs': 'sprig',
+    'slice': 'slice', 'slices': 'slice',
+    'stick': 'stick', 'sticks': 'stick',
+    'package': 'package', 'packages': 'package', 'pkg': 'package',
+    'jar': 'jar', 'jars': 'jar',
+    'bottle': 'bottle', 'bottles': 'bottle',
+    'pinch': 'pinch', 'pinches': 'pinch',
+    'dash': 'dash', 'dashes': 'dash',
+    'fl oz': 'fl oz', 'fl. oz': 'fl oz', 'fluid ounce': 'fl oz', 'fluid ounces': 'fl oz',
+    'whole': 'whole', 'piece': 'whole', 'pieces': 'whole', 'each': 'whole', 'ea': 'whole',
+    'dozen': 'dozen',
+}
+
+# Size of each measurable unit in its family's base: teaspoons for volume, ounces for weight
+VOLUME_TSP = {
+    'tsp': 1.0, 'tbsp': 3.0, 'fl oz': 6.0, 'cup': 48.0, 'pt': 96.0, 'qt': 192.0, 'gallon': 768.0,
+    'ml': 1 / 4.92892, 'l': 1000 / 4.92892,
+}
+WEIGHT_OZ = {'oz': 1.0, 'lb': 16.0, 'g': 1 / 28.3495, 'kg': 1000 / 28.3495}
+
+# Checked in order; first keyword hit wins, default is pantry
+CATEGORY_KEYWORDS = [
+    ('frozen', ['frozen']),
+    ('pantry', ['broth', 'stock', 'sauce', 'oil', 'vinegar', 'flour', 'sugar', 'honey',
+                'peanut butter', 'syrup', 'rice', 'pasta', 'noodle', 'bean', 'lentil',
+                'chickpea', 'baking', 'cornstarch', 'mustard', 'ketchup', 'mayonnaise',
+                'tomato paste', 'canned', 'chocolate', 'vanilla', 'oats', 'nuts', 'almond']),
+    ('spices', ['salt', 'paprika', 'cumin', 'oregano', 'thyme', 'cinnamon',
+                'nutmeg', 'chili powder', 'cayenne', 'turmeric', 'coriander', 'bay leaf',
+                'bay leaves', 'seasoning', 'garlic powder', 'onion powder', 'spice',
+                'red pepper flakes', 'allspice', 'black pepper', 'white pepper',
+                'ground pepper', 'peppercorn']),
+    ('seafood', ['shrimp', 'salmon', 'tuna', 'cod', 'fish', 'crab', 'scallop', 'clam',
+                 'mussel', 'lobster', 'tilapia', 'anchovy', 'anchovies']),
+    ('meat', ['chicken', 'beef', 'pork', 'bacon', 'sausage', 'turkey', 'lamb', 'ham',
+              'steak', 'prosciutto', 'chorizo', 'ground meat']),
+    ('dairy', ['milk', 'cream', 'cheese', 'butter', 'yogurt', 'egg', 'parmesan',
+               'gruyère', 'gruyere', 'cheddar', 'mozzarella', 'ricotta', 'half-and-half']),
+    ('bakery', ['bread', 'bun', 'tortilla', 'pita', 'baguette', 'roll', 'croissant']),
+    ('produce', ['potato', 'onion', 'garlic', 'scallion', 'chive', 'tomato', 'lettuce',
+                 'spinach', 'kale', 'carrot', 'celery', 'pepper', 'lemon', 'lime',
+                 'apple', 'banana', 'berry', 'berries', 'broccoli', 'cabbage', 'cucumber', 'zucchini',
+                 'squash', 'mushroom', 'herb', 'parsley', 'cilantro', 'basil', 'mint',
+                 'ginger', 'avocado', 'shallot', 'leek', 'corn', 'pea', 'eggplant']),
+]
+_CATEGORY_PATTERNS = [
+    (category, re.compile(r'\b(?:' + '|'.join(re.escape(k) for k in keywords) + r')(?:s|es)?\b'))
+    for category, keywords in CATEGORY_KEYWORDS
+]
+
+_NUMBER = r'\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?'
+_QUANTITY_RE = re.compile(
+    rf'^\s*(?P<qty>{_NUMBER})(?:\s*(?:-|–|to)\s*(?P<qty_hi>{_NUMBER}))?\s*'
+)
+_PAREN_RE = re.compile(r'\(([^)]*)\)')
+_PLUS_RE = re.compile(r'^\s*(?:plus|\+)\s+(.*)$', re.IGNORECASE)
+_SIZE_RE = re.compile(r'^(extra[- ]large|large|medium|small)\s+', re.IGNORECASE)
+
+# Count units that often trail the name ("3 garlic cloves")
+TRAILING_UNITS = ('clove', 'sprig', 'stalk', 'head', 'bunch')
+
+
+def parse_number(text: str) -> Optional[float]:
+    """Parse '2', '1.5', '3/4' or '1 1/2' into a float"""
+    text = text.strip()
+    try:
+        if ' ' in text:
+            whole, frac = text.split(None, 1)
+            return float(whole) + parse_number(frac)
+        if '/' in text:
+            num, den = text.split('/', 1)
+            return float(num) / float(den)
+        return float(text)
+    except (ValueError, TypeError, ZeroDivisionError):
+        return None
+
+
+def _normalize_fractions(line: str) -> str:
+    for char, frac in UNICODE_FRACTIONS.items():
+        line = re.sub(rf'(\d){char}', rf'\1 {frac}', line)
+        line = line.replace(char, frac)
+    return line
+
+
+def guess_category(name: str) -> str:
+    """Best-effort grocery category for an ingredient name"""
+    lowered = name.lower()
+    for category, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(lowered):
+            return category
+    return 'pantry'
+
+
+def normalize_unit(unit: str) -> Optional[str]:
+    """Map a unit spelling to its canonical form, or None if unknown"""
+    unit = unit.strip().rstrip('.')
+    if unit in UNIT_ALIASES:
+        return UNIT_ALIASES[unit]
+    return UNIT_ALIASES.get(unit.lower())
+
+
+def convert_amount(amount: float, from_unit: str, to_unit: str) -> Optional[float]:
+    """Convert between two units of the same family, or None if they don't mix"""
+    for table in (VOLUME_TSP, WEIGHT_OZ):
+        if from_unit in table and to_unit in table:
+            return amount * table[from_unit] / table[to_unit]
+    return amount if from_unit == to_unit else None
+
+
+def _split_quantity(line: str) -> Tuple[Optional[float], str]:
+    match = _QUANTITY_RE.match(line)
+    if not match:
+        return None, line
+    amount = parse_number(match.group('qty_hi') or match.group('qty'))
+    return amount, line[match.end():]
+
+
+def parse_ingredient_line(line: str) -> Dict:
+    """
+    Parse one free-text ingredient line.
+
+    Args:
+        line: e.g. "2 (15-oz.) cans chickpeas, rinsed"
+
+    Returns:
+        Dict with name, amount (float or None), unit, category, notes
+    """
+    text = _normalize_fractions(' '.join(line.split()))
+    notes = []
+
+    amount, rest = _split_quantity(text)
+
+    # "1 (15-oz.) can ..." — package size goes to notes
+    rest = rest.lstrip()
+    if rest.startswith('('):
+        paren = _PAREN_RE.match(rest)
+        if paren:
+            notes.append(paren.group(1).strip())
+            rest = rest[paren.end():].lstrip()
+
+    unit = None
+    if amount is not None:
+        parts = rest.split(None, 2)
+        if len(parts) >= 2 and normalize_unit(f"{parts[0]} {parts[1]}"):
+            unit = normalize_unit(f"{parts[0]} {parts[1]}")
+            rest = parts[2] if len(parts) > 2 else ''
+        elif parts:
+            unit = normalize_unit(parts[0])
+            if unit:
+                rest = rest.split(None, 1)[1] if len(parts) > 1 else ''
+    if unit is None:
+        unit = 'whole'
+
+    # "1 Tbsp. plus 2 tsp. kosher salt" — fold the second measure into the first
+    plus = _PLUS_RE.match(rest)
+    if plus and amount is not None:
+        extra_amount, extra_rest = _split_quantity(plus.group(1))
+        extra_parts = extra_rest.split(None, 1)
+        extra_unit = normalize_unit(extra_parts[0]) if extra_parts else None
+        extra = convert_amount(extra_amount, extra_unit, unit) if extra_amount and extra_unit else None
+        if extra is not None:
+            amount += extra
+            rest = extra_parts[1] if len(extra_parts) > 1 else ''
+
+    rest = re.sub(r'^of\s+', '', rest.strip(), flags=re.IGNORECASE)
+    for paren in _PAREN_RE.findall(rest):
+        notes.append(paren.strip())
+    rest = _PAREN_RE.sub('', rest)
+
+    name, _, trailing = rest.partition(',')
+    if trailing.strip():
+        notes.append(trailing.strip())
+    name = ' '.join(name.split()).strip(' .;:-').lower()
+
+    size = _SIZE_RE.match(name)
+    if size:
+        notes.insert(0, size.group(1))
+        name = name[size.end():]
+
+    if unit == 'whole' and amount is not None:
+        head, _, last = name.rpartition(' ')
+        if head and normalize_unit(last) in TRAILING_UNITS:
+            unit = normalize_unit(last)
+            name = head
+
+    return {
+        "name": name,
+        "amount": round(amount, 3) if amount is not None else None,
+        "unit": unit,
+        "category": guess_category(name),
+        "notes": ', '.join(n for n in notes if n),
+    }
@@ -0,0 +1,241 @@
+"""
+Incremental JSON Array Reader
+Pulls the elements of one named array out of a JSON document while it is
+still being generated, so each shopping-list item can be acted on as soon
+as its closing brace arrives instead of after the whole response.
+
+Only the bracket structure is tracked while scanning; each completed
+element is handed to json.loads on its own. Markdown fences or prose
+around the JSON are skipped over. Text is dropped once it has been
+scanned, keeping only the element (or key) still being written, so
+feeding a long response in small chunks stays linear.
+
+salvage_json applies the same scan to a response that was cut off (e.g. at
+max_tokens): it keeps every array element whose closing bracket arrived,
+drops the element that was being written, and closes the open containers,
+so what did arrive can be used instead of the whole response being lost.
+"""
+import re
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_TRAILING_COMMA_RE = re.compile(r',(\s*[}\]])')
+
+
+class JSONArrayStream:
+    """Feed text chunks in, get back the elements of the array under `key` as they complete"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.done = False
+        # Unscanned text plus the part of the element or key still being written
+        self._text = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._awaiting: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk and return any elements it completed"""
+        self._text += chunk
+        text = self._text
+        items = []
+        i = self._pos
+        while i < len(text) and not self.done:
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._array_depth is None:
+                        self._last_string = text[self._string_start + 1:i]
+                        self._awaiting = 'colon'
+            elif c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c.isspace():
+                pass
+            elif self._awaiting == 'colon' and c == ':':
+                self._awaiting = 'bracket' if self._last_string == self.key else None
+            elif self._awaiting == 'bracket' and c == '[':
+                self._awaiting = None
+                self._depth += 1
+                self._array_depth = self._depth
+            else:
+                self._awaiting = None
+                if c in '{[':
+                    self._depth += 1
+                    if self._array_depth is not None and self._depth == self._array_depth + 1:
+                        self._item_start = i
+                elif c in '}]':
+                    if self._array_depth is not None:
+                        if self._depth == self._array_depth + 1 and self._item_start is not None:
+                            try:
+                                items.append(json.loads(text[self._item_start:i + 1]))
+                            except ValueError:
+                                pass
+                            self._item_start = None
+                        elif self._depth == self._array_depth:
+                            self.done = True
+                    self._depth -= 1
+            i += 1
+        self._pos = i
+        self._trim()
+        return items
+
+    def _trim(self):
+        """Drop the scanned text that no element or key still needs"""
+        if self.done:
+            self._text, self._pos, self._item_start = '', 0, None
+            return
+        if self._item_start is not None:
+            keep = self._item_start
+        elif self._in_string and self._array_depth is None:
+            keep = self._string_start
+        else:
+            keep = self._pos
+        if keep:
+            self._text = self._text[keep:]
+            self._pos -= keep
+            self._string_start -= keep
+            if self._item_start is not None:
+                self._item_start -= keep
+
+
+def iter_array_items(chunks: Iterable[str], key: str) -> Iterator[Any]:
+    """Yield elements of the array under key from a stream of text chunks"""
+    stream = JSONArrayStream(key)
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+
+
+def _loads_lenient(text: str) -> Any:
+    """json.loads, retried once with trailing commas removed"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(_TRAILING_COMMA_RE.sub(r'\1', text))
+
+
+def salvage_json(text: str) -> Tuple[Any, bool]:
+    """
+    Parse JSON that may be truncated or slightly malformed.
+
+    Returns (value, complete). When the text is cut off, array elements that
+    were not finished are dropped and open objects keep only their finished
+    key/value pairs, so every element that is returned arrived whole.
+
+    Raises:
+        ValueError: no JSON object or array could be recovered
+    """
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    if not starts:
+        raise ValueError("no JSON object or array in text")
+    start = min(starts)
+
+    # Frames: [opening char, cut position after the last finished member, expecting a key]
+    stack: List[list] = []
+    in_string = escape = False
+    string_is_key = False
+    token_start: Optional[int] = None
+    i = start
+    while i < len(text):
+        c = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif c == '\\':
+                escape = True
+            elif c == '"':
+                in_string = False
+                if string_is_key:
+                    stack[-1][2] = False
+                else:
+                    stack[-1][1] = i + 1
+            i += 1
+            continue
+        if token_start is not None and (c in ',}]' or c.isspace()):
+            stack[-1][1] = i
+            token_start = None
+        if c == '"':
+            in_string = True
+            string_is_key = stack[-1][0] == '{' and stack[-1][2]
+        elif c in '{[':
+            stack.append([c, i + 1, c == '{'])
+        elif c in '}]':
+            stack.pop()
+            if not stack:
+                return _loads_lenient(text[start:i + 1]), True
+            stack[-1][1] = i + 1
+        elif c == ',':
+            if stack[-1][0] == '{':
+                stack[-1][2] = True
+        elif c != ':' and not c.isspace() and token_start is None:
+            token_start = i
+        i += 1
+
+    # Truncated: cut back to before the outermost unfinished array element,
+    # or else to the last finished member of the innermost container
+    keep = len(stack)
+    cut = stack[-1][1]
+    for depth in range(1, len(stack)):
+        if stack[depth - 1][0] == '[':
+            keep, cut = depth, stack[depth - 1][1]
+            break
+    body = text[start:cut].rstrip().rstrip(',')
+    closers = ''.join('}' if frame[0] == '{' else ']' for frame in reversed(stack[:keep]))
+    return _loads_lenient(body + closers), False
+
+
+def drop_partial_tail(value: Any) -> Any:
+    """
+    Drop the array element that was being written when an already-parsed
+    value was cut off: the last element of the array at the end of the
+    value's last-key chain. Returns the value (modified in place).
+    """
+    node = value
+    while isinstance(node, (dict, list)) and node:
+        if isinstance(node, list):
+            node.pop()
+            break
+        node = node[next(reversed(node))]
+    return value
+
+
+def array_names(value: Any, path: str = '') -> Dict[str, List[str]]:
+    """Map of path -> names of the {"name": ...} objects in each array within value"""
+    names: Dict[str, List[str]] = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            names.update(array_names(item, f"{path}.{key}" if path else key))
+    elif isinstance(value, list):
+        found = [item['name'] for item in value if isinstance(item, dict) and isinstance(item.get('name'), str)]
+        if found:
+            names[path] = found
+    return names
+
+
+def merge_continuation(partial: Any, rest: Any) -> Any:
+    """
+    Combine a salvaged partial answer with the continuation that supplies
+    the rest: arrays are concatenated (skipping names already present),
+    objects are merged key by key, and other values come from the
+    continuation when it has them.
+    """
+    if isinstance(partial, dict) and isinstance(rest, dict):
+        merged = dict(partial)
+        for key, item in rest.items():
+            merged[key] = merge_continuation(partial[key], item) if key in partial else item
+        return merged
+    if isinstance(partial, list) and isinstance(rest, list):
+        seen = {item.get('name') for item in partial if isinstance(item, dict)}
+        return partial + [item for item in rest if not (isinstance(item, dict) and item.get('name') in seen)]
+    return rest if rest is not None else partial
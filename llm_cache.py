@@ -0,0 +1,236 @@
+"""
+LLM Response Cache
+Persistent SQLite cache for Claude responses.
+
+Keyed on (model, max_tokens, normalized prompt hash) so reprocessing the
+same recipe returns the stored response instead of paying for another
+call. Entries expire after a TTL and the store is bounded by size with
+least-recently-used eviction. SQLite in WAL mode makes it safe to share
+between several CLI processes at once.
+
+Usage:
+    python llm_cache.py            # Show hit rate, bytes and tokens saved
+    python llm_cache.py --clear    # Delete every entry and reset stats
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'thought_to_table', 'llm_cache.sqlite3')
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so cosmetic prompt differences share an entry"""
+    return '\n'.join(' '.join(line.split()) for line in prompt.strip().splitlines() if line.strip())
+
+
+def cache_key(model: str, max_tokens: int, prompt: str, extra: Optional[Dict] = None) -> str:
+    """
+    Hash of the request parameters that determine the response.
+
+    Args:
+        extra: Any other request fields that change the output (system prompt, tools)
+    """
+    payload = json.dumps([model, max_tokens, normalize_prompt(prompt), extra or {}], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+class LLMCache:
+    """TTL + size-bounded LRU response cache backed by SQLite"""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file
+            ttl: Seconds before an entry expires
+            max_bytes: Upper bound on stored response bytes before eviction
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> Optional['LLMCache']:
+        """
+        Build a cache from LLM_CACHE_* environment variables.
+
+        Returns None when LLM_CACHE_DISABLE is set.
+        """
+        if os.getenv('LLM_CACHE_DISABLE', '').lower() in ('1', 'true', 'yes'):
+            return None
+        return cls(
+            path=os.getenv('LLM_CACHE_PATH', DEFAULT_CACHE_PATH),
+            ttl=float(os.getenv('LLM_CACHE_TTL', DEFAULT_TTL)),
+            max_bytes=int(float(os.getenv('LLM_CACHE_MAX_MB', DEFAULT_MAX_BYTES / 1024 / 1024)) * 1024 * 1024),
+        )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A short-lived connection per operation keeps this safe across threads
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, **counters: int):
+        for name, value in counters.items():
+            conn.execute(
+                "INSERT INTO stats (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, value),
+            )
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return a live entry and count the hit, or count a miss"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT response, size, input_tokens, output_tokens FROM responses "
+                "WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None:
+                self._bump(conn, misses=1)
+                conn.execute('COMMIT')
+                return None
+
+            text, size, input_tokens, output_tokens = row
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._bump(conn, hits=1, bytes_saved=size, tokens_saved=input_tokens + output_tokens)
+            conn.execute('COMMIT')
+            return CachedResponse(text, input_tokens, output_tokens)
+
+    def put(self, key: str, model: str, text: str, input_tokens: int = 0, output_tokens: int = 0):
+        """Store a response, then drop expired and least-recently-used entries"""
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, response, size, input_tokens, output_tokens, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, text, size, input_tokens, output_tokens, now, now),
+            )
+            self._evict(conn, now)
+            conn.execute('COMMIT')
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        expired = conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            for key, size in conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        if expired or evicted:
+            self._bump(conn, expired=expired, evictions=evicted)
+
+    def stats(self) -> Dict:
+        """Hit rate, bytes/tokens saved and current size, across all processes"""
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        hits = counters.get('hits', 0)
+        misses = counters.get('misses', 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "bytes_saved": counters.get('bytes_saved', 0),
+            "tokens_saved": counters.get('tokens_saved', 0),
+            "evictions": counters.get('evictions', 0),
+            "expired": counters.get('expired', 0),
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def clear(self):
+        """Delete every entry and reset counters"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+            conn.execute("DELETE FROM stats")
+
+
+_default_cache: Optional[LLMCache] = None
+_default_loaded = False
+
+
+def get_default_cache() -> Optional[LLMCache]:
+    """Process-wide cache from the environment (None when disabled)"""
+    global _default_cache, _default_loaded
+    if not _default_loaded:
+        _default_cache = LLMCache.from_env()
+        _default_loaded = True
+    return _default_cache
+
+
+def main():
+    cache = LLMCache.from_env() or LLMCache()
+
+    if '--clear' in sys.argv:
+        cache.clear()
+        print(f"🗑️  Cleared {cache.path}")
+        return
+
+    stats = cache.stats()
+    print(f"🧠 LLM response cache: {cache.path}")
+    print(f"   Entries: {stats['entries']} ({stats['size_bytes'] / 1024:.1f} KB / {cache.max_bytes / 1024 / 1024:.0f} MB)")
+    print(f"   Hits: {stats['hits']} | Misses: {stats['misses']} | Hit rate: {stats['hit_rate']:.1%}")
+    print(f"   Saved: {stats['bytes_saved'] / 1024:.1f} KB of responses, {stats['tokens_saved']} tokens")
+
+
+if __name__ == "__main__":
+    main()
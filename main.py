@@ -5,189 +5,439 @@ Powered by Claude AI
 Usage:
     python main.py                          # Interactive mode
     python main.py <recipe_url> [servings]  # Direct mode
+    python main.py ... --no-cache           # Don't reuse stored Claude responses
+    python main.py ... --fused              # Parse and scale in one Claude call
+    python main.py ... --llm-scale          # Scale with Claude instead of locally
+    python main.py ... --llm-fallback       # Local scaling, Claude for ingredients it can't handle
+    python main.py ... --shop               # Go straight to Walmart, searching items as they stream in
+    python main.py ... --hedge              # Duplicate Claude requests that run past p90
+    python main.py ... --no-tiering         # Parse with the large model instead of trying the fast one first
+    python main.py ... --base-url URL       # Send Claude requests to URL (e.g. anthropic_stub.py)
 """
 import os
 import sys
 import json
-from typing import Dict, Optional
-from bs4 import BeautifulSoup
-import requests
+import asyncio
+from typing import Dict, Generator, Iterator, List, Optional
 import anthropic
 from dotenv import load_dotenv
 
+from claude_client import (
+    stream_tool, prompt_cache_stats, structured_output_stats, truncation_stats,
+)
+from json_stream import JSONArrayStream
+from html_parsing import make_soup, page_text
+from rate_limiter import RateLimiter, get_default_limiter
+from claude_accounting import recipe_scope, run_summary
+from claude_resilience import get_default_resilience
+from model_tiers import Check, ModelRouter, get_default_router
+from recipe_fetcher import fetch_html
+from recipe_locator import locate_recipe, fit_token_budget
+from recipe_jsonld import extract_structured_recipe
+from recipe_pipeline import (
+    ClaudeStep, RecipeOutcome, RecipePrompts, Steps,
+    parse_steps, scale_steps, recipe_steps, run_steps, arun_steps, stream_steps,
+)
 from walmart_cart import WalmartCart, interactive_shopping
 
 load_dotenv()
 
-MODELID = "claude-sonnet-4-20250514"
+# Token budget for the recipe text in the parse prompt (~8000 characters)
+PARSE_TOKEN_BUDGET = 2000
 
+# Static instruction prefixes. They are sent ahead of the per-recipe content
+# with a prompt-cache breakpoint, so keep anything that varies out of them.
+PARSE_INSTRUCTIONS = """Analyze the recipe in the user message and extract structured information.
+
+For each ingredient provide:
+- name: Standard grocery term (e.g., "chicken breast" not "boneless skinless chicken breast halves")
+- amount: Numerical quantity
+- unit: Common unit (lb, oz, cup, tbsp, tsp, whole, bunch, head, clove, can)
+- category: One of: produce, dairy, meat, seafood, pantry, spices, frozen, bakery
+- notes: Any specifics (organic, fresh, canned, etc.)
+
+Also extract:
+- Recipe name
+- Original servings
+- Meal type (breakfast, lunch, dinner, snack, dessert)
+- Estimated calories per serving
+- Prep time and cook time if available
+
+Record the result by calling the record_recipe tool."""
+
+SCALE_INSTRUCTIONS = """Scale the recipe data in the user message from its original servings to the requested servings.
+
+Provide:
+1. Scaled ingredients with adjusted amounts (rounded to practical quantities)
+2. Shopping list optimized for grocery store (combine similar items, use common package sizes)
+3. Storage tips for bulk ingredients
+4. Estimated total cost (USD)
+
+Round amounts to practical values (e.g., 1.75 lbs → 2 lbs, 0.33 cups → 1/3 cup).
+Use common package sizes (1 lb, 16 oz, 1 gallon, etc.).
+
+Record the result by calling the record_scaled_recipe tool."""
+
+FUSED_INSTRUCTIONS = """Analyze the recipe in the user message, then scale it to the requested servings.
+
+For each ingredient provide:
+- name: Standard grocery term (e.g., "chicken breast" not "boneless skinless chicken breast halves")
+- amount: Numerical quantity
+- unit: Common unit (lb, oz, cup, tbsp, tsp, whole, bunch, head, clove, can)
+- category: One of: produce, dairy, meat, seafood, pantry, spices, frozen, bakery
+- notes: Any specifics (organic, fresh, canned, etc.)
+
+Also extract the recipe name, original servings, meal type (breakfast, lunch, dinner,
+snack, dessert), estimated calories per serving, and prep/cook time if available.
+
+Then scale from the original servings to the requested servings and provide:
+1. Scaled ingredients with adjusted amounts (rounded to practical quantities)
+2. Shopping list optimized for grocery store (combine similar items, use common package sizes)
+3. Storage tips for bulk ingredients
+4. Estimated total cost (USD)
+
+Round amounts to practical values (e.g., 1.75 lbs → 2 lbs, 0.33 cups → 1/3 cup).
+Use common package sizes (1 lb, 16 oz, 1 gallon, etc.).
+
+Record the result by calling the record_recipe_and_scaled tool."""
+
+
+
+def build_parse_prompt(recipe_text: str) -> str:
+    return f"""Recipe text:
+{fit_token_budget(recipe_text, PARSE_TOKEN_BUDGET)}"""
+
+
+def build_fused_prompt(recipe_text: str, servings: int) -> str:
+    return f"""Requested servings: {servings}
+
+Recipe text:
+{fit_token_budget(recipe_text, PARSE_TOKEN_BUDGET)}"""
+
+
+def build_scale_prompt(recipe_data: dict, servings: int) -> str:
+    return f"""Scale from {recipe_data.get('original_servings', 4)} servings to {servings} servings.
+
+Recipe data:
+{json.dumps(recipe_data, indent=2)}"""
+
+
+RECIPE_PROMPTS = RecipePrompts(
+    PARSE_INSTRUCTIONS, SCALE_INSTRUCTIONS, FUSED_INSTRUCTIONS,
+    parse=build_parse_prompt, fused=build_fused_prompt, scale=build_scale_prompt,
+)
 
 class RecipeAssistant:
     """
     Recipe Assistant that uses Claude to parse recipes and scale ingredients.
     """
     
-    def __init__(self, num_meals: int = 7):
+    def __init__(
+        self,
+        num_meals: int = 7,
+        use_cache: bool = True,
+        fused: bool = False,
+        scaling: str = 'local',
+        llm_fallback: bool = False,
+        async_client: Optional[anthropic.AsyncAnthropic] = None,
+        limiter: Optional[RateLimiter] = None,
+        router: Optional[ModelRouter] = None,
+        base_url: Optional[str] = None,
+    ):
         """
         Initialize the Recipe Assistant.
         
         Args:
             num_meals: Number of servings to scale recipe for (default: 7)
+            use_cache: Reuse stored Claude responses for identical prompts (default: True)
+            fused: Parse and scale in a single Claude call (default: False)
+            scaling: 'local' for the deterministic scaler or 'llm' for Claude (default: 'local')
+            llm_fallback: Send ingredients the local scaler can't handle to Claude (default: False)
+            async_client: Client for process_recipe_async; share one across assistants (default: own client)
+            limiter: Rate limiter for process_recipe_async (default: the process-wide limiter)
+            router: Picks the model per call; parses try its fast model first (default: the process-wide router)
+            base_url: Where to send Claude requests, e.g. a local anthropic_stub.py (default: ANTHROPIC_BASE_URL or the API)
         """
         api_key = os.getenv('ANTHROPIC_API_KEY')
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment. Create a .env file with your key.")
             
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
+        # 429s on the async path are retried by the shared limiter, not per request by the SDK
+        self.async_client = async_client or anthropic.AsyncAnthropic(api_key=api_key, base_url=base_url, max_retries=0)
+        self.limiter = limiter or get_default_limiter()
+        self.router = router or get_default_router()
         self.servings_needed = num_meals
+        self.use_cache = use_cache
+        self.fused = fused
+        self.scaling = scaling
+        self.llm_fallback = llm_fallback
         self.recipe_data = None
         self.scaled_data = None
+        self.structured_data = None
+        self.parse_path = None
         
-    def _call_claude(self, prompt: str) -> dict:
-        """Make a Claude API call and return parsed JSON response"""
-        response = self.client.messages.create(
-            model=MODELID,
-            max_tokens=4096,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt + "\n\nRespond with valid JSON only, no markdown formatting or code blocks."
-                }
-            ]
-        )
-        
-        text = response.content[0].text.strip()
-        
-        # Clean up potential markdown code blocks
-        if text.startswith("```"):
-            lines = text.split("\n")
-            text = "\n".join(lines[1:])  # Remove first line
-            if text.rstrip().endswith("```"):
-                text = text.rstrip()[:-3]
+    def _call_claude(
+        self, prompt: str, tool: Dict, max_tokens: int = 4096, prefix: Optional[str] = None,
+        check: Optional[Check] = None,
+    ) -> dict:
+        """
+        Make a Claude API call answered through tool and return the validated tool input.
         
-        return json.loads(text.strip())
+        prefix holds the static instructions, which go first with a prompt-cache
+        breakpoint; prompt is the per-recipe part and goes last. With a check,
+        the router's fast model answers first and the strong model only if
+        check finds problems.
+        """
+        return self.router.complete_tool(
+            self.client,
+            prompt,
+            tool,
+            check=check,
+            max_tokens=max_tokens,
+            use_cache=self.use_cache,
+            prefix=prefix,
+        )
+
+    async def _call_claude_async(
+        self, prompt: str, tool: Dict, max_tokens: int = 4096, prefix: Optional[str] = None,
+        check: Optional[Check] = None,
+    ) -> dict:
+        """Async _call_claude; waits for room under self.limiter"""
+        return await self.router.acomplete_tool(
+            self.async_client,
+            prompt,
+            tool,
+            check=check,
+            limiter=self.limiter,
+            max_tokens=max_tokens,
+            use_cache=self.use_cache,
+            prefix=prefix,
+        )
+
+    def _stream_claude(
+        self, prompt: str, tool: Dict, max_tokens: int = 4096, prefix: Optional[str] = None
+    ) -> Generator[dict, None, dict]:
+        """
+        Streaming _call_claude: yield each shopping_list item as soon as it is
+        complete in the tool input, then return the whole validated input.
+        """
+        items = JSONArrayStream('shopping_list')
+        return (yield from self._feed(items, stream_tool(
+            self.client,
+            prompt,
+            model=self.router.strong_model,
+            tool=tool,
+            max_tokens=max_tokens,
+            use_cache=self.use_cache,
+            prefix=prefix,
+        )))
+
+    @staticmethod
+    def _feed(items: JSONArrayStream, chunks: Generator[str, None, dict]) -> Generator[dict, None, dict]:
+        """Yield completed array items from chunks and pass through the generator's return value"""
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration as done:
+                return done.value
+            yield from items.feed(chunk)
 
     def extract_recipe_text(self, recipe_url: str) -> str:
-        """Extract text content from recipe URL"""
+        """
+        Extract text content from recipe URL.
+        
+        Also stores any usable schema.org JSON-LD recipe in self.structured_data,
+        which has to be read before the <script> tags are stripped. The text is
+        narrowed to the title, yield, ingredients and instructions when they
+        can be located, and fit to PARSE_TOKEN_BUDGET.
+        """
         print(f"📖 Fetching recipe from: {recipe_url}")
         
-        response = requests.get(recipe_url, headers={
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
-        response.raise_for_status()
+        html = fetch_html(recipe_url)
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(html)
+        self.structured_data = extract_structured_recipe(soup)
         
         # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.decompose()
-            
-        return soup.get_text(separator='\n', strip=True)
-
-    def parse_recipe(self, recipe_text: str) -> dict:
-        """Use Claude to parse recipe ingredients"""
-        print("🤖 Analyzing recipe with Claude...")
+        full_text = page_text(soup, ["script", "style", "nav", "footer", "header"])
         
-        prompt = f"""Analyze this recipe and extract structured information.
+        located = locate_recipe(soup, full_text, max_tokens=PARSE_TOKEN_BUDGET,
+                                baseline_chars=PARSE_TOKEN_BUDGET * 4)
+        if located.found:
+            print(f"✂️  Recipe text: ~{located.tokens} tokens (saved ~{located.tokens_saved})")
+        return located.text
 
-For each ingredient provide:
-- name: Standard grocery term (e.g., "chicken breast" not "boneless skinless chicken breast halves")
-- amount: Numerical quantity
-- unit: Common unit (lb, oz, cup, tbsp, tsp, whole, bunch, head, clove, can)
-- category: One of: produce, dairy, meat, seafood, pantry, spices, frozen, bakery
-- notes: Any specifics (organic, fresh, canned, etc.)
+    def _answer(self, step: ClaudeStep) -> dict:
+        """Answer a pipeline step with a Claude call"""
+        print(f"🤖 {step.description} with Claude...")
+        return self._call_claude(step.prompt, step.tool, step.max_tokens, step.prefix, step.check)
 
-Also extract:
-- Recipe name
-- Original servings
-- Meal type (breakfast, lunch, dinner, snack, dessert)
-- Estimated calories per serving
-- Prep time and cook time if available
+    async def _answer_async(self, step: ClaudeStep) -> dict:
+        """Async _answer"""
+        print(f"🤖 {step.description} with Claude...")
+        return await self._call_claude_async(step.prompt, step.tool, step.max_tokens, step.prefix, step.check)
 
-Recipe text:
-{recipe_text[:8000]}
-
-Return JSON with:
-{{
-    "recipe_name": "string",
-    "original_servings": number,
-    "meal_type": "string",
-    "calories_per_serving": number,
-    "prep_time_minutes": number or null,
-    "cook_time_minutes": number or null,
-    "ingredients": [
-        {{"name": "string", "amount": number, "unit": "string", "category": "string", "notes": "string"}}
-    ]
-}}"""
+    def _stream_answer(self, step: ClaudeStep) -> Generator[dict, None, dict]:
+        """Streaming _answer: yield shopping-list items as Claude writes them"""
+        print(f"🤖 {step.description} with Claude (streaming)...")
+        return (yield from self._stream_claude(step.prompt, step.tool, step.max_tokens, step.prefix))
+
+    def _stream(self, steps: Steps) -> Generator[dict, None, RecipeOutcome]:
+        """
+        Drive steps, streaming the shopping list if a step writes one, then
+        yielding the items of the final list that were not streamed: all of
+        a locally scaled list, and whatever a truncation continuation or
+        correction retry added.
+        """
+        yielded = set()
         
-        self.recipe_data = self._call_claude(prompt)
-        return self.recipe_data
+        def stream(step: ClaudeStep) -> Generator[dict, None, dict]:
+            answer = self._stream_answer(step)
+            while True:
+                try:
+                    item = next(answer)
+                except StopIteration as done:
+                    return done.value
+                yielded.add(item.get('name'))
+                yield item
+        
+        outcome = yield from stream_steps(steps, self._answer, stream)
+        for item in self.get_shopping_list():
+            if item.get('name') not in yielded:
+                yield item
+        return outcome
 
-    def scale_recipe(self, recipe_data: Optional[dict] = None) -> dict:
-        """Scale recipe ingredients for desired number of servings"""
+    def _pipeline(self, recipe_text: str) -> Steps:
+        """
+        recipe_pipeline.recipe_steps for recipe_text with this assistant's
+        settings, keeping the results on self once they are done.
+        
+        The Claude parse call is skipped when the page embeds complete
+        schema.org recipe data; in fused mode parse and scale share one call.
+        """
+        if self.structured_data:
+            print("⚡ Using the page's structured recipe data (skipping Claude parse)")
+        outcome = yield from recipe_steps(recipe_text, self.structured_data, self.servings_needed, RECIPE_PROMPTS,
+                                          self.fused, self.scaling, self.llm_fallback)
+        self.recipe_data = outcome.recipe_data
+        self.scaled_data = outcome.scaled_data
+        self.parse_path = outcome.parse_path
+        
+        print(f"\n✅ Found: {self.recipe_data.get('recipe_name', 'Recipe')}")
+        print(f"   Original servings: {self.recipe_data.get('original_servings', 'Unknown')}")
+        print(f"   Ingredients: {len(self.recipe_data.get('ingredients', []))}")
+        if outcome.unhandled:
+            print(f"⚠️  Scaled {len(outcome.unhandled)} ingredient(s) linearly (use --llm-fallback to ask Claude)")
+        return outcome
+
+    def _parse_steps(self, recipe_text: str, structured: Optional[dict] = None, fused: bool = False) -> Steps:
+        """parse_steps, setting recipe_data (and scaled_data when fused)"""
+        if structured:
+            print("⚡ Using the page's structured recipe data (skipping Claude parse)")
+        outcome = yield from parse_steps(recipe_text, structured, self.servings_needed, RECIPE_PROMPTS, fused)
+        self.recipe_data = outcome.recipe_data
+        if outcome.scaled_data is not None:
+            self.scaled_data = outcome.scaled_data
+        return outcome
+
+    def _scale_steps(self, recipe_data: Optional[dict] = None) -> Steps:
+        """scale_steps for recipe_data (default: self.recipe_data), setting scaled_data"""
         recipe_data = recipe_data or self.recipe_data
         if not recipe_data:
             raise ValueError("No recipe data. Call parse_recipe first.")
             
         print(f"📊 Scaling recipe for {self.servings_needed} servings...")
         
-        prompt = f"""Scale this recipe from {recipe_data.get('original_servings', 4)} servings to {self.servings_needed} servings.
+        outcome = yield from scale_steps(recipe_data, self.servings_needed, RECIPE_PROMPTS, self.scaling, self.llm_fallback)
+        if outcome.unhandled:
+            print(f"⚠️  Scaled {len(outcome.unhandled)} ingredient(s) linearly (use --llm-fallback to ask Claude)")
+        self.scaled_data = outcome.scaled_data
+        return outcome
 
-Recipe data:
-{json.dumps(recipe_data, indent=2)}
+    def parse_recipe(self, recipe_text: str) -> dict:
+        """Use Claude to parse recipe ingredients"""
+        run_steps(self._parse_steps(recipe_text), self._answer)
+        return self.recipe_data
 
-Provide:
-1. Scaled ingredients with adjusted amounts (rounded to practical quantities)
-2. Shopping list optimized for grocery store (combine similar items, use common package sizes)
-3. Storage tips for bulk ingredients
-4. Estimated total cost (USD)
+    def scale_recipe(self, recipe_data: Optional[dict] = None) -> dict:
+        """Scale recipe ingredients for desired number of servings"""
+        run_steps(self._scale_steps(recipe_data), self._answer)
+        return self.scaled_data
 
-Return JSON with:
-{{
-    "recipe_name": "string",
-    "scaled_servings": {self.servings_needed},
-    "scaled_ingredients": [
-        {{"name": "string", "amount": number, "unit": "string", "category": "string", "notes": "string"}}
-    ],
-    "shopping_list": [
-        {{"name": "string", "amount": number, "unit": "string", "category": "string", "notes": "string", "estimated_price": number}}
-    ],
-    "storage_tips": {{"ingredient_name": "tip"}},
-    "estimated_total_cost": number
-}}
+    def stream_shopping_list(self, recipe_data: Optional[dict] = None) -> Iterator[dict]:
+        """
+        Scale the recipe, yielding shopping-list items as they become available.
+        
+        With scaling='llm' each item is yielded as soon as Claude finishes
+        generating it, so a consumer such as WalmartCart.search_and_preview can
+        start on the first item while the rest are still being written. Local
+        scaling yields the whole list at once. scaled_data is set when the
+        iterator is exhausted.
+        """
+        yield from self._stream(self._scale_steps(recipe_data))
 
-Round amounts to practical values (e.g., 1.75 lbs → 2 lbs, 0.33 cups → 1/3 cup).
-Use common package sizes (1 lb, 16 oz, 1 gallon, etc.)."""
+    def parse_and_scale(self, recipe_text: str) -> dict:
+        """
+        Parse and scale in a single Claude call (fused mode).
+        
+        Produces the same recipe_data and scaled_data as parse_recipe followed
+        by scale_recipe, without sending the parsed JSON back in a second prompt.
+        """
+        run_steps(self._parse_steps(recipe_text, fused=True), self._answer)
+        return {"recipe_data": self.recipe_data, "scaled_data": self.scaled_data}
 
-        self.scaled_data = self._call_claude(prompt)
-        return self.scaled_data
+    def _result(self, recipe_url: str) -> dict:
+        return {
+            "recipe_url": recipe_url,
+            "parse_path": self.parse_path,
+            "recipe_data": self.recipe_data,
+            "scaled_data": self.scaled_data
+        }
 
     def process_recipe(self, recipe_url: str) -> dict:
         """
         Full pipeline: fetch → parse → scale.
         
+        The Claude parse call is skipped when the page embeds complete
+        schema.org recipe data; in fused mode parse and scale share one call.
+        
         Args:
             recipe_url: URL of the recipe
             
         Returns:
-            Dict with recipe_data and scaled_data
+            Dict with recipe_data, scaled_data and parse_path ("jsonld" or "llm")
         """
-        # Fetch and parse
-        recipe_text = self.extract_recipe_text(recipe_url)
-        self.parse_recipe(recipe_text)
-        
-        print(f"\n✅ Found: {self.recipe_data.get('recipe_name', 'Recipe')}")
-        print(f"   Original servings: {self.recipe_data.get('original_servings', 'Unknown')}")
-        print(f"   Ingredients: {len(self.recipe_data.get('ingredients', []))}")
+        with recipe_scope(recipe_url):
+            recipe_text = self.extract_recipe_text(recipe_url)
+            run_steps(self._pipeline(recipe_text), self._answer)
+            return self._result(recipe_url)
+    
+    async def process_recipe_async(self, recipe_url: str) -> dict:
+        """
+        Async process_recipe, so Claude calls for several recipes can overlap.
         
-        # Scale
-        self.scale_recipe()
+        Use one assistant per recipe (each keeps its own recipe_data and
+        scaled_data); the process_recipes helper does this with a shared
+        client and limiter.
+        """
+        with recipe_scope(recipe_url):
+            recipe_text = await asyncio.to_thread(self.extract_recipe_text, recipe_url)
+            await arun_steps(self._pipeline(recipe_text), self._answer_async)
+            return self._result(recipe_url)
+    
+    def process_recipe_streaming(self, recipe_url: str) -> Iterator[dict]:
+        """
+        process_recipe, yielding shopping-list items as they are generated.
         
-        return {
-            "recipe_url": recipe_url,
-            "recipe_data": self.recipe_data,
-            "scaled_data": self.scaled_data
-        }
+        Pass the iterator straight to WalmartCart.search_and_preview (or
+        interactive_shopping) to search for early items while Claude is still
+        writing later ones. recipe_data, scaled_data and parse_path are set
+        once the iterator is exhausted.
+        """
+        with recipe_scope(recipe_url):
+            recipe_text = self.extract_recipe_text(recipe_url)
+            yield from self._stream(self._pipeline(recipe_text))
     
     def get_shopping_list(self) -> list:
         """Get the shopping list from scaled data"""
@@ -242,12 +492,46 @@ Use common package sizes (1 lb, 16 oz, 1 gallon, etc.)."""
         print(f"\n💾 Results saved to {filename}")
 
 
+async def process_recipes(recipe_urls: List[str], num_meals: int = 7, **options) -> List[dict]:
+    """
+    Run process_recipe_async for several URLs at once, one RecipeAssistant
+    each, sharing an async client and the process-wide rate limiter.
+    Results are in input order; options are RecipeAssistant arguments.
+    """
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    base_url = options.get('base_url')
+    async_client = anthropic.AsyncAnthropic(api_key=api_key, base_url=base_url, max_retries=0) if api_key else None
+    try:
+        assistants = [RecipeAssistant(num_meals, async_client=async_client, **options) for _ in recipe_urls]
+        return await asyncio.gather(*(
+            assistant.process_recipe_async(url) for assistant, url in zip(assistants, recipe_urls)
+        ))
+    finally:
+        if async_client is not None:
+            await async_client.close()
+
+
 def main():
     """Main entry point"""
     # Parse arguments
-    if len(sys.argv) >= 2:
-        recipe_url = sys.argv[1]
-        servings = int(sys.argv[2]) if len(sys.argv) >= 3 else 7
+    base_url = None
+    if '--base-url' in sys.argv[:-1]:
+        i = sys.argv.index('--base-url')
+        base_url = sys.argv[i + 1]
+        del sys.argv[i:i + 2]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    use_cache = '--no-cache' not in sys.argv
+    fused = '--fused' in sys.argv
+    scaling = 'llm' if '--llm-scale' in sys.argv else 'local'
+    llm_fallback = '--llm-fallback' in sys.argv
+    shop = '--shop' in sys.argv
+    if '--hedge' in sys.argv:
+        get_default_resilience().policy.hedge = True
+    if '--no-tiering' in sys.argv:
+        get_default_router().tiering = False
+    if len(args) >= 1:
+        recipe_url = args[0]
+        servings = int(args[1]) if len(args) >= 2 else 7
     else:
         print("🍽️  THOUGHT TO TABLE")
         print("="*50)
@@ -260,11 +544,45 @@ def main():
         sys.exit(1)
         
     # Process recipe
-    assistant = RecipeAssistant(num_meals=servings)
+    assistant = RecipeAssistant(
+        num_meals=servings, use_cache=use_cache, fused=fused, scaling=scaling, llm_fallback=llm_fallback,
+        base_url=base_url,
+    )
     
     try:
+        if shop:
+            # Search Walmart for each item as soon as it is generated
+            result = interactive_shopping(assistant.process_recipe_streaming(recipe_url))
+            assistant.print_summary()
+            assistant.save_results()
+            if result:
+                with open("walmart_cart_results.json", 'w') as f:
+                    json.dump(result, f, indent=2)
+                print("\n💾 Cart results saved to walmart_cart_results.json")
+            return
+        
         assistant.process_recipe(recipe_url)
         assistant.print_summary()
+        if prompt_cache_stats.requests:
+            print(f"🧊 Prompt cache: {prompt_cache_stats.cache_read_input_tokens} tokens read, "
+                  f"{prompt_cache_stats.cache_creation_input_tokens} written, "
+                  f"{prompt_cache_stats.input_tokens} uncached")
+        if structured_output_stats.validation_failures:
+            print(f"🧩 Schema: {structured_output_stats.validation_failures} invalid answer(s), "
+                  f"{structured_output_stats.retries} correction retries, {structured_output_stats.failed} failed")
+        if truncation_stats.truncated:
+            print(f"✂️  Truncated answers: {truncation_stats.truncated}, {truncation_stats.salvaged_items} items salvaged, "
+                  f"~{truncation_stats.tokens_saved} tokens saved vs. {truncation_stats.full_retries} full retries "
+                  f"({truncation_stats.full_retry_tokens} tokens)")
+        if run_summary():
+            print(run_summary())
+        for model, tier in get_default_router().summary().items():
+            print(f"🪜 {model}: {tier['calls']} calls, {tier['avg_seconds']}s avg, ${tier['cost']:.4f}, "
+                  f"{tier['escalated']} escalated ({tier['escalation_rate']:.0%})")
+        for kind, latency in get_default_resilience().summary().items():
+            if latency['calls']:
+                print(f"⏱️  Claude {kind}: p50 {latency['p50']}s, p95 {latency['p95']}s, timeout {latency['timeout']}s, "
+                      f"{latency['retries']} retries, {latency['hedges']} hedges ({latency['hedge_wins']} won)")
         assistant.save_results()
         
         # Ask about Walmart shopping
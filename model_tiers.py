@@ -0,0 +1,195 @@
+"""
+Claude Model Tiers
+Sends a call to a small, fast model first and escalates to the larger model
+only when the answer isn't good enough.
+
+A call made with a check (for example recipe_schemas.parse_quality_errors
+for ingredient extraction) goes to the fast model. Its answer is accepted if
+it passes the tool schema and the check returns no errors; otherwise the
+same request is made again on the strong model, whose answer is used as-is.
+Calls without a check go straight to the strong model.
+
+Per model, ModelRouter.stats counts calls, accepted answers, escalations,
+wall time, tokens and the estimated cost (claude_accounting.MODEL_PRICES).
+
+Models come from CLAUDE_FAST_MODEL and CLAUDE_MODEL; set CLAUDE_TIERING=0
+(or pass --no-tiering) to send everything to the strong model.
+"""
+import os
+import sys
+import time
+import threading
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+
+import anthropic
+
+from claude_accounting import usage_cost
+from claude_client import StructuredOutputError, UsageMeter, acomplete_tool, complete_tool, metered
+from rate_limiter import RateLimiter
+
+DEFAULT_FAST_MODEL = "claude-haiku-4-5-20251001"
+DEFAULT_STRONG_MODEL = "claude-sonnet-4-20250514"
+
+Check = Callable[[Dict], List[str]]
+
+
+@dataclass
+class TierStats:
+    """What one model tier was asked, what it answered acceptably, and what it cost"""
+    calls: int = 0
+    accepted: int = 0
+    escalated: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        result['seconds'] = round(self.seconds, 3)
+        result['cost'] = round(self.cost, 6)
+        result['avg_seconds'] = round(self.seconds / self.calls, 3) if self.calls else 0.0
+        result['escalation_rate'] = round(self.escalated / self.calls, 4) if self.calls else 0.0
+        return result
+
+
+class ModelRouter:
+    """Fast-model-first routing with escalation to the strong model"""
+
+    def __init__(
+        self,
+        fast_model: str = DEFAULT_FAST_MODEL,
+        strong_model: str = DEFAULT_STRONG_MODEL,
+        tiering: bool = True,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            fast_model: Model tried first for calls with a check
+            strong_model: Model for escalations and calls without a check
+            tiering: Set False to send every call to strong_model
+        """
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.tiering = tiering
+        self.stats: Dict[str, TierStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'ModelRouter':
+        """Build a router from CLAUDE_FAST_MODEL, CLAUDE_MODEL and CLAUDE_TIERING"""
+        return cls(
+            fast_model=os.getenv('CLAUDE_FAST_MODEL', DEFAULT_FAST_MODEL),
+            strong_model=os.getenv('CLAUDE_MODEL', DEFAULT_STRONG_MODEL),
+            tiering=os.getenv('CLAUDE_TIERING', '1').lower() not in ('0', 'false', 'no'),
+        )
+
+    def models(self, check: Optional[Check]) -> List[str]:
+        """Models to try in order for a call with or without a check"""
+        if check is None or not self.tiering or self.fast_model == self.strong_model:
+            return [self.strong_model]
+        return [self.fast_model, self.strong_model]
+
+    def _settle(self, model: str, meter: UsageMeter, seconds: float, data: Optional[Dict],
+                error: Optional[StructuredOutputError], check: Optional[Check], last: bool) -> List[str]:
+        """Record a tier's attempt; return why its answer can't be used ([] to use it), or raise on the last tier"""
+        if error is not None:
+            errors = error.errors
+        else:
+            errors = [] if last else check(data)
+        with self._lock:
+            stats = self.stats.setdefault(model, TierStats())
+            stats.calls += 1
+            if not errors:
+                stats.accepted += 1
+            elif last:
+                stats.failed += 1
+            else:
+                stats.escalated += 1
+            stats.seconds += seconds
+            stats.requests += meter.requests
+            stats.input_tokens += meter.input_tokens + meter.cache_creation_input_tokens + meter.cache_read_input_tokens
+            stats.output_tokens += meter.output_tokens
+            stats.cost += usage_cost(model, meter)
+        if error is not None and last:
+            raise error
+        return errors
+
+    def _escalate(self, tool: Dict, model: str, errors: List[str], next_model: str):
+        print(f"⬆️  {model} {tool['name']} answer rejected ({'; '.join(errors[:2])}); "
+              f"retrying with {next_model}", file=sys.stderr)
+
+    def complete_tool(
+        self,
+        client: anthropic.Anthropic,
+        prompt: str,
+        tool: Dict,
+        check: Optional[Check] = None,
+        **options,
+    ) -> Dict:
+        """
+        claude_client.complete_tool on the first model whose answer passes check.
+
+        options are passed through (max_tokens, use_cache, prefix, max_retries).
+        """
+        models = self.models(check)
+        for i, model in enumerate(models):
+            last = i == len(models) - 1
+            start = time.monotonic()
+            data, error = None, None
+            with metered() as meter:
+                try:
+                    data = complete_tool(client, prompt, model, tool, **options)
+                except StructuredOutputError as e:
+                    error = e
+            errors = self._settle(model, meter, time.monotonic() - start, data, error, check, last)
+            if not errors:
+                return data
+            self._escalate(tool, model, errors, models[i + 1])
+
+    async def acomplete_tool(
+        self,
+        client: anthropic.AsyncAnthropic,
+        prompt: str,
+        tool: Dict,
+        check: Optional[Check] = None,
+        limiter: Optional[RateLimiter] = None,
+        **options,
+    ) -> Dict:
+        """Async complete_tool; every tier's requests wait for room under limiter"""
+        models = self.models(check)
+        for i, model in enumerate(models):
+            last = i == len(models) - 1
+            start = time.monotonic()
+            data, error = None, None
+            with metered() as meter:
+                try:
+                    data = await acomplete_tool(client, prompt, model, tool, limiter=limiter, **options)
+                except StructuredOutputError as e:
+                    error = e
+            errors = self._settle(model, meter, time.monotonic() - start, data, error, check, last)
+            if not errors:
+                return data
+            self._escalate(tool, model, errors, models[i + 1])
+
+    def summary(self) -> Dict[str, Dict]:
+        """TierStats.to_dict per model"""
+        with self._lock:
+            return {model: stats.to_dict() for model, stats in self.stats.items()}
+
+
+_default_router: Optional[ModelRouter] = None
+_default_lock = threading.Lock()
+
+
+def get_default_router() -> ModelRouter:
+    """Process-wide router from the environment"""
+    global _default_router
+    with _default_lock:
+        if _default_router is None:
+            _default_router = ModelRouter.from_env()
+        return _default_router
@@ -0,0 +1,175 @@
+"""
+Page Readiness
+Waits for the signals that a Walmart page is usable instead of sleeping a
+fixed time after every navigation and click.
+
+Three kinds of signal:
+  - DOM conditions: the new document has replaced the old one and parsed,
+    or a results grid has its first product title
+  - network idle: no more than a few requests in flight for a short quiet
+    period, from the DevTools Protocol Network events chromedriver writes to
+    its performance log (enable_network_events must be applied to the
+    browser's options)
+  - the cart badge changing after an Add to cart click
+
+Every wait has a timeout and returns False (or None) when it runs out, so a
+page that never shows a signal slows a run down rather than failing it.
+"""
+import json
+import time
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+DEFAULT_IDLE_SECONDS = 0.5
+DEFAULT_IDLE_TIMEOUT = 10.0
+# Requests that may stay open (analytics beacons, long polls) while the page counts as idle
+DEFAULT_MAX_INFLIGHT = 2
+DEFAULT_CART_TIMEOUT = 10.0
+POLL_INTERVAL = 0.05
+
+# Start a navigation without waiting for it, marking the old document so it isn't mistaken for the new one
+NAVIGATE_JS = "document.documentElement.dataset.pending = '1'; window.location.href = arguments[0];"
+PAGE_STATE_JS = "return document.documentElement.dataset.pending ? 'pending' : document.readyState;"
+
+# A results grid is ready when its first tile has a title, or the page has finished loading without one
+RESULTS_READY_JS = """
+if (document.documentElement.dataset.pending) return false;
+const tile = document.querySelector("div[data-item-id]");
+if (!tile) return false;
+const title = tile.querySelector("[data-automation-id='product-title'], span.normal");
+return Boolean(title && title.textContent.trim()) || document.readyState === 'complete';
+"""
+
+CART_COUNT_SELECTORS = [
+    "[data-automation-id='cart-count']",
+    "a[link-identifier='cartNavButton'] span",
+    "[data-testid='cart-count']",
+    ".cart-count",
+]
+
+T = TypeVar('T')
+
+
+def enable_network_events(options):
+    """Have chromedriver log CDP Network events for NetworkMonitor"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def wait_for(driver, condition: Callable[..., T], timeout: float) -> Optional[T]:
+    """condition(driver) once it is truthy, or None after timeout seconds"""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        return None
+
+
+def dom_ready(driver) -> bool:
+    """The navigated-to document has replaced the old one and finished parsing"""
+    return driver.execute_script(PAGE_STATE_JS) in ('interactive', 'complete')
+
+
+def results_ready(driver) -> bool:
+    return bool(driver.execute_script(RESULTS_READY_JS))
+
+
+def cart_count(driver, selectors: Sequence[str] = CART_COUNT_SELECTORS) -> Optional[str]:
+    """The cart badge's text, or None if the page has no badge"""
+    for selector in selectors:
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        if elements:
+            return elements[0].text.strip()
+    return None
+
+
+class NetworkMonitor:
+    """Requests in flight in a driver's tabs, from the CDP Network events in its performance log"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.available = True
+        # requestId -> when it was sent
+        self.inflight: Dict[str, float] = {}
+        self.last_activity = time.monotonic()
+        # Totals since launch: requests sent, bytes received over the wire, requests blocked
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = 0
+
+    def poll(self) -> int:
+        """Apply the events logged since the last poll; returns how many there were"""
+        if not self.available:
+            return 0
+        try:
+            entries = self.driver.get_log('performance')
+        except WebDriverException:
+            # Browser launched without enable_network_events
+            self.available = False
+            return 0
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            self._apply(message.get('method', ''), message.get('params') or {})
+        return len(entries)
+
+    def _apply(self, method: str, params: Dict):
+        request_id = params.get('requestId')
+        if method == 'Network.requestWillBeSent':
+            self.inflight[request_id] = time.monotonic()
+            self.requests += 1
+        elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+            self.inflight.pop(request_id, None)
+            self.bytes += int(params.get('encodedDataLength') or 0)
+            if params.get('blockedReason'):
+                self.blocked += 1
+        else:
+            return
+        self.last_activity = time.monotonic()
+
+    def wait_idle(
+        self,
+        idle: float = DEFAULT_IDLE_SECONDS,
+        timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_inflight: int = DEFAULT_MAX_INFLIGHT,
+    ) -> bool:
+        """
+        Wait until at most max_inflight requests have been open, with no
+        request starting or ending, for idle seconds (at least idle seconds
+        from now, so requests an action is about to make are seen). False on
+        timeout, or at once if network events aren't logged.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            self.poll()
+            if not self.available:
+                return False
+            now = time.monotonic()
+            quiet = now - max(self.last_activity, started)
+            if len(self.inflight) <= max_inflight and quiet >= idle:
+                return True
+            if now >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+
+
+def wait_for_cart_update(
+    driver,
+    before: Optional[str],
+    monitor: Optional[NetworkMonitor] = None,
+    timeout: float = DEFAULT_CART_TIMEOUT,
+    selectors: List[str] = CART_COUNT_SELECTORS,
+) -> bool:
+    """
+    After an Add to cart click: wait for the cart badge to change from
+    before, or without a badge for the add request to settle.
+    """
+    if before is not None:
+        return wait_for(driver, lambda d: cart_count(d, selectors) not in (before, None), timeout) is not None
+    if monitor is not None:
+        return monitor.wait_idle(timeout=timeout, max_inflight=0)
+    return False
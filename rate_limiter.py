@@ -0,0 +1,255 @@
+"""
+Claude Rate Limiter
+Client-side budget for Anthropic's per-minute limits, shared by the async
+Claude calls in a process so concurrent recipes don't trip them.
+
+Requests/min and input+output tokens/min are each a token bucket that
+refills continuously, the same model the API uses. A request reserves its
+estimated tokens before it is sent, and the bucket is corrected with the
+actual usage afterwards. A 429 (or 529 overloaded) pauses every caller for
+the Retry-After time, not just the one that got it, then the request is
+retried. A semaphore caps how many requests are in flight.
+
+Limits come from CLAUDE_REQUESTS_PER_MINUTE, CLAUDE_TOKENS_PER_MINUTE and
+CLAUDE_MAX_CONCURRENCY; the defaults fit a low usage tier.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import threading
+from dataclasses import dataclass, asdict
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import anthropic
+
+from recipe_locator import estimate_tokens
+
+DEFAULT_REQUESTS_PER_MINUTE = 50
+DEFAULT_TOKENS_PER_MINUTE = 40000
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_RATE_LIMIT_RETRIES = 4
+
+# Seconds of budget a bucket can bank; larger values allow bigger bursts
+DEFAULT_BURST_SECONDS = 10.0
+
+# Output tokens reserved per request before the real count is known
+DEFAULT_OUTPUT_ESTIMATE = 1024
+
+# Status codes retried after a pause: rate limited, overloaded
+RETRY_STATUSES = (429, 529)
+
+T = TypeVar('T')
+
+
+class TokenBucket:
+    """
+    Budget of per_minute units, refilled continuously.
+
+    Holds at most burst_seconds worth of budget. A request bigger than that
+    waits for a full bucket and leaves it in debt, which later requests
+    wait out.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = DEFAULT_BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1e-9)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount (capped at capacity) can be taken"""
+        self._refill()
+        need = min(amount, self.capacity)
+        return 0.0 if self.level >= need else (need - self.level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def adjust(self, delta: float):
+        """Charge delta more units (or refund, if negative) after the fact"""
+        self._refill()
+        self.level = min(self.capacity, self.level - delta)
+
+
+@dataclass
+class RateLimitStats:
+    """What the limiter did: requests sent, time spent waiting, 429s absorbed"""
+    requests: int = 0
+    throttled: int = 0
+    wait_seconds: float = 0.0
+    rate_limited: int = 0
+    retry_after_seconds: float = 0.0
+    max_in_flight: int = 0
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        result['wait_seconds'] = round(self.wait_seconds, 3)
+        result['retry_after_seconds'] = round(self.retry_after_seconds, 3)
+        return result
+
+
+def estimate_request_tokens(params: Dict, output_estimate: int = DEFAULT_OUTPUT_ESTIMATE) -> int:
+    """Rough input+output tokens a messages.create request will use"""
+    text = str(params.get('system') or '') + str(params.get('messages') or '') + str(params.get('tools') or '')
+    return estimate_tokens(text) + min(output_estimate, params.get('max_tokens', output_estimate))
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a rate-limit response's retry-after-ms or Retry-After header"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    for name, scale in (('retry-after-ms', 0.001), ('retry-after', 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return max(0.0, float(value) * scale)
+            except ValueError:
+                pass
+    return None
+
+
+class RateLimiter:
+    """Shared requests/min, tokens/min and concurrency budget for async Claude calls"""
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_RATE_LIMIT_RETRIES,
+        burst_seconds: float = DEFAULT_BURST_SECONDS,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request budget
+            tokens_per_minute: Input plus output token budget
+            max_concurrency: Most requests in flight at once
+            max_retries: Retries of a request rejected with 429/529 before giving up
+            burst_seconds: Seconds of budget that can be spent at once
+        """
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.stats = RateLimitStats()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._refunded: Optional[asyncio.Event] = None
+
+    @classmethod
+    def from_env(cls) -> 'RateLimiter':
+        """Build a limiter from CLAUDE_* environment variables"""
+        return cls(
+            requests_per_minute=float(os.getenv('CLAUDE_REQUESTS_PER_MINUTE', DEFAULT_REQUESTS_PER_MINUTE)),
+            tokens_per_minute=float(os.getenv('CLAUDE_TOKENS_PER_MINUTE', DEFAULT_TOKENS_PER_MINUTE)),
+            max_concurrency=int(os.getenv('CLAUDE_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)),
+        )
+
+    def _primitives(self):
+        # asyncio primitives belong to one event loop; make new ones when
+        # the limiter is reused from a later asyncio.run
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._lock = asyncio.Lock()
+            self._refunded = asyncio.Event()
+        return self._semaphore, self._lock
+
+    async def _acquire(self, tokens: int, lock: asyncio.Lock):
+        # One caller at a time works out its wait, so requests go out in arrival order
+        async with lock:
+            waited = 0.0
+            while True:
+                wait = max(
+                    self._paused_until - time.monotonic(),
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(tokens),
+                )
+                if wait <= 0:
+                    break
+                # Sleep out the wait, but re-check early if a finished request
+                # hands back tokens it reserved and didn't use
+                self._refunded.clear()
+                started = time.monotonic()
+                try:
+                    await asyncio.wait_for(self._refunded.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                waited += time.monotonic() - started
+            self.requests.take(1)
+            self.tokens.take(tokens)
+        if waited:
+            self.stats.throttled += 1
+            self.stats.wait_seconds += waited
+
+    async def call(self, send: Callable[[], Awaitable[T]], estimated_tokens: int) -> T:
+        """
+        Run send() once the budget allows, retrying after 429/529 responses.
+
+        estimated_tokens is reserved up front and reconciled with the
+        response's usage once it arrives.
+        """
+        semaphore, lock = self._primitives()
+        attempt = 0
+        async with semaphore:
+            while True:
+                await self._acquire(estimated_tokens, lock)
+                self._in_flight += 1
+                self.stats.requests += 1
+                self.stats.max_in_flight = max(self.stats.max_in_flight, self._in_flight)
+                try:
+                    response = await send()
+                except anthropic.APIStatusError as e:
+                    if e.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                        raise
+                    attempt += 1
+                    self._back_off(e, attempt, estimated_tokens)
+                    continue
+                finally:
+                    self._in_flight -= 1
+                usage = getattr(response, 'usage', None)
+                if usage is not None:
+                    actual = sum(getattr(usage, field, 0) or 0 for field in
+                                 ('input_tokens', 'cache_creation_input_tokens', 'output_tokens'))
+                    self.tokens.adjust(actual - estimated_tokens)
+                    if actual < estimated_tokens:
+                        self._refunded.set()
+                return response
+
+    def _back_off(self, error: anthropic.APIStatusError, attempt: int, estimated_tokens: int):
+        """Pause every caller for the server's Retry-After, or an exponential backoff with jitter"""
+        delay = retry_after(error)
+        if delay is None:
+            delay = min(2 ** attempt, 60) * random.uniform(0.8, 1.2)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        # A rejected request isn't counted against the token limit
+        self.tokens.adjust(-estimated_tokens)
+        self.stats.rate_limited += 1
+        self.stats.retry_after_seconds += delay
+        print(f"⏳ Claude returned {error.status_code}; pausing requests for {delay:.1f}s", file=sys.stderr)
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_default_limiter() -> RateLimiter:
+    """Process-wide limiter from the environment"""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter.from_env()
+        return _default_limiter
@@ -0,0 +1,226 @@
+"""
+Message Batches Runner
+Sends many Claude requests through the Message Batches API instead of one
+messages.create call each. Batches trade latency (minutes to hours) for
+throughput and half-price tokens, which suits nightly re-ingestion.
+
+Submitted batch IDs are written to a state file before polling starts, so
+an interrupted run picks up the same batches when rerun instead of paying
+for them twice. Requests already in the LLM response cache are answered
+locally and never submitted, and batch results are stored back into it.
+
+Requests carrying a tool get the tool input back as BatchOutcome.data. An
+answer that fails the tool's schema is corrected with a regular (non-batch)
+follow-up call rather than failing the recipe.
+
+Each result is logged to claude_accounting at the batch discount, tagged
+with its request's recipe.
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import anthropic
+
+from claude_accounting import record_response, recipe_scope
+from claude_client import (
+    DEFAULT_TOOL_RETRIES, StructuredOutputError, message_params, request_cache_key, validated_tool_input,
+)
+from recipe_schemas import prompt_type, validator_for
+from llm_cache import get_default_cache
+
+DEFAULT_POLL_INITIAL = 5.0
+DEFAULT_POLL_MAX = 300.0
+
+
+@dataclass
+class BatchRequest:
+    """One prompt to send in a batch"""
+    custom_id: str
+    prompt: str
+    model: str
+    max_tokens: int = 4096
+    prefix: Optional[str] = None
+    tool: Optional[Dict] = None
+    recipe: Optional[str] = None
+
+    def params(self) -> Dict:
+        return message_params(self.prompt, self.model, self.max_tokens, self.prefix, self.tool)
+
+    def cache_key(self) -> str:
+        return request_cache_key(self.prompt, self.model, self.max_tokens, self.prefix, self.tool)
+
+
+@dataclass
+class BatchOutcome:
+    """Result for one custom_id: the response text (tool input as data, for tool requests) or an error"""
+    custom_id: str
+    text: Optional[str] = None
+    data: Any = None
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchState:
+    """Batch IDs per stage, persisted so an interrupted run can resume"""
+    path: str
+    fingerprint: str = ''
+    batches: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> 'BatchState':
+        """Load the state for this job, or start fresh if the job changed"""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, fingerprint)
+        if data.get('fingerprint') != fingerprint:
+            print(f"⚠️  {path} belongs to a different URL list or options; starting new batches", file=sys.stderr)
+            return cls(path, fingerprint)
+        return cls(path, fingerprint, dict(data.get('batches') or {}))
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({"fingerprint": self.fingerprint, "batches": self.batches}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def job_fingerprint(*parts) -> str:
+    """Stable ID for a job's inputs, used to tell whether a state file still applies"""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class BatchRunner:
+    """Submits, polls and collects Message Batches for named pipeline stages"""
+
+    def __init__(
+        self,
+        client: anthropic.Anthropic,
+        state: BatchState,
+        use_cache: bool = True,
+        poll_initial: float = DEFAULT_POLL_INITIAL,
+        poll_max: float = DEFAULT_POLL_MAX,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            client: Anthropic client (honors ANTHROPIC_BASE_URL, e.g. a local stub)
+            state: Where batch IDs are recorded for resuming
+            use_cache: Answer requests from the LLM response cache when possible
+            poll_initial: First delay between status checks, in seconds
+            poll_max: Upper bound on the delay as it backs off
+        """
+        self.client = client
+        self.state = state
+        self.cache = get_default_cache() if use_cache else None
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+
+    def run(self, stage: str, requests: Iterable[BatchRequest]) -> Dict[str, BatchOutcome]:
+        """
+        Get a response for every request, submitting one batch for the stage.
+
+        If the state already has a batch for this stage it is resumed rather
+        than resubmitted.
+        """
+        requests = list(requests)
+        outcomes: Dict[str, BatchOutcome] = {}
+        pending: List[BatchRequest] = []
+        for request in requests:
+            cached = self.cache.get(request.cache_key()) if self.cache is not None else None
+            if cached is not None and request.tool and validator_for(request.tool)(json.loads(cached.text)):
+                cached = None
+            if cached is not None:
+                data = json.loads(cached.text) if request.tool else None
+                outcomes[request.custom_id] = BatchOutcome(request.custom_id, text=cached.text, data=data, cached=True)
+            else:
+                pending.append(request)
+
+        if not pending:
+            return outcomes
+
+        batch_id = self.state.batches.get(stage)
+        if batch_id:
+            print(f"🔁 Resuming {stage} batch {batch_id}", file=sys.stderr)
+        else:
+            batch = self.client.messages.batches.create(
+                requests=[{"custom_id": r.custom_id, "params": r.params()} for r in pending]
+            )
+            batch_id = batch.id
+            self.state.batches[stage] = batch_id
+            self.state.save()
+            print(f"📦 Submitted {stage} batch {batch_id} ({len(pending)} requests)", file=sys.stderr)
+
+        self.wait(batch_id)
+        by_id = {r.custom_id: r for r in pending}
+        for entry in self.client.messages.batches.results(batch_id):
+            request = by_id.get(entry.custom_id)
+            if request is None:
+                continue
+            with recipe_scope(request.recipe):
+                outcomes[entry.custom_id] = self._outcome(request, entry.result)
+
+        for request in pending:
+            outcomes.setdefault(request.custom_id, BatchOutcome(request.custom_id, error="missing from batch results"))
+        return outcomes
+
+    def _outcome(self, request: BatchRequest, result) -> BatchOutcome:
+        if result.type != 'succeeded':
+            error = getattr(getattr(result, 'error', None), 'error', None)
+            message = getattr(error, 'message', None) or result.type
+            return BatchOutcome(request.custom_id, error=f"Batch request {result.type}: {message}")
+
+        message = result.message
+        record_response(message, request.params(), prompt_type(request.params()), batch=True)
+        data = None
+        if request.tool:
+            try:
+                data = validated_tool_input(self.client, request.prompt, request.tool, request.params(), message,
+                                            DEFAULT_TOOL_RETRIES)
+            except StructuredOutputError as e:
+                return BatchOutcome(request.custom_id, error=f"Claude response did not match the schema: {e}")
+            text = json.dumps(data)
+        else:
+            text = message.content[0].text
+        if self.cache is not None and (request.tool or message.stop_reason != 'max_tokens'):
+            usage = getattr(message, 'usage', None)
+            self.cache.put(
+                request.cache_key(),
+                request.model,
+                text,
+                input_tokens=getattr(usage, 'input_tokens', 0) or 0,
+                output_tokens=getattr(usage, 'output_tokens', 0) or 0,
+            )
+        return BatchOutcome(request.custom_id, text=text, data=data)
+
+    def wait(self, batch_id: str):
+        """Poll until the batch has ended, backing off exponentially with jitter"""
+        delay = self.poll_initial
+        while True:
+            batch = self.client.messages.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            if batch.processing_status == 'ended':
+                print(f"✅ Batch {batch_id} ended: {counts.succeeded} succeeded, {counts.errored} errored, "
+                      f"{counts.expired} expired, {counts.canceled} canceled", file=sys.stderr)
+                return batch
+            print(f"⏳ Batch {batch_id}: {counts.processing} processing, {counts.succeeded} done; "
+                  f"checking again in {delay:.0f}s", file=sys.stderr)
+            time.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, self.poll_max)
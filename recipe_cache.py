@@ -0,0 +1,356 @@
+"""
+Recipe Page Cache
+On-disk cache for fetched recipe HTML.
+
+Entries are keyed on the canonical URL and point at gzip-compressed bodies
+stored by content hash, so identical pages share one blob. Entries younger
+than max_age are served without touching the network; older ones are
+revalidated with ETag / If-Modified-Since so an unchanged page costs a 304.
+Total blob size is bounded with least-recently-used eviction; a blob no
+entry points at any more (the page changed) is deleted first.
+
+Usage:
+    python recipe_cache.py            # Show cache size and entries
+    python recipe_cache.py --clear    # Delete everything
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'thought_to_table', 'pages')
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_AGE = 24 * 60 * 60
+# Unreferenced blobs younger than this may belong to another process's store() in progress
+ORPHAN_GRACE_SECONDS = 60
+
+# Query parameters that never change the page content
+TRACKING_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid'}
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different spellings share a cache entry.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, and sorts the remaining query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not (k.lower().startswith(TRACKING_PREFIXES) or k.lower() in TRACKING_PARAMS)
+    ]
+    path = parts.path or '/'
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ''))
+
+
+@dataclass
+class CacheEntry:
+    """Metadata for one cached URL"""
+    url: str
+    digest: str
+    size: int
+    encoding: Optional[str]
+    fetched_at: float
+    last_access: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.fetched_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers for a conditional GET revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for monitoring"""
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    bytes_served: int = 0
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.revalidated + self.misses
+        return (self.hits + self.revalidated) / total if total else 0.0
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        result['hit_rate'] = round(self.hit_rate(), 4)
+        return result
+
+
+class RecipeCache:
+    """Size-bounded LRU disk cache for recipe HTML"""
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding entries/ and blobs/
+            max_bytes: Upper bound on compressed blob bytes before eviction
+            max_age: Seconds an entry is served without revalidation
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stats = CacheStats()
+
+        self._entries_dir = os.path.join(cache_dir, 'entries')
+        self._blobs_dir = os.path.join(cache_dir, 'blobs')
+        os.makedirs(self._entries_dir, exist_ok=True)
+        os.makedirs(self._blobs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # Held while a blob has no entry yet, so evict() doesn't take it for an orphan
+        self._store_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['RecipeCache']:
+        """
+        Build a cache from RECIPE_CACHE_* environment variables.
+
+        Returns None when RECIPE_CACHE_DISABLE is set.
+        """
+        if os.getenv('RECIPE_CACHE_DISABLE', '').lower() in ('1', 'true', 'yes'):
+            return None
+        return cls(
+            cache_dir=os.getenv('RECIPE_CACHE_DIR', DEFAULT_CACHE_DIR),
+            max_bytes=int(float(os.getenv('RECIPE_CACHE_MAX_MB', DEFAULT_MAX_BYTES / 1024 / 1024)) * 1024 * 1024),
+            max_age=float(os.getenv('RECIPE_CACHE_MAX_AGE', DEFAULT_MAX_AGE)),
+        )
+
+    # ── paths ──────────────────────────────────────────────
+
+    def _entry_path(self, url: str) -> str:
+        key = hashlib.sha256(canonical_url(url).encode()).hexdigest()
+        return os.path.join(self._entries_dir, f"{key}.json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._blobs_dir, f"{digest}.html.gz")
+
+    def _atomic_write(self, path: str, data: bytes):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _write_entry(self, entry: CacheEntry):
+        self._atomic_write(self._entry_path(entry.url), json.dumps(asdict(entry)).encode())
+
+    # ── lookup ─────────────────────────────────────────────
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Return the entry for a URL if it and its blob exist"""
+        try:
+            with open(self._entry_path(url)) as f:
+                entry = CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        if not os.path.exists(self._blob_path(entry.digest)):
+            return None
+        return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age() < self.max_age
+
+    def read(self, entry: CacheEntry) -> bytes:
+        """Read an entry's body and bump its LRU position"""
+        with gzip.open(self._blob_path(entry.digest), 'rb') as f:
+            body = f.read()
+        entry.last_access = time.time()
+        self._write_entry(entry)
+        return body
+
+    def record_hit(self, body: bytes):
+        with self._lock:
+            self.stats.hits += 1
+            self.stats.bytes_served += len(body)
+
+    def record_miss(self):
+        with self._lock:
+            self.stats.misses += 1
+
+    # ── store ──────────────────────────────────────────────
+
+    def store(
+        self,
+        url: str,
+        body: bytes,
+        encoding: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> CacheEntry:
+        """Store a freshly downloaded body and evict if over budget"""
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        previous = self.lookup(url)
+        with self._store_lock:
+            if not os.path.exists(blob_path):
+                self._atomic_write(blob_path, gzip.compress(body, compresslevel=6))
+
+            now = time.time()
+            entry = CacheEntry(
+                url=canonical_url(url),
+                digest=digest,
+                size=os.path.getsize(blob_path),
+                encoding=encoding,
+                fetched_at=now,
+                last_access=now,
+                etag=etag,
+                last_modified=last_modified,
+            )
+            self._write_entry(entry)
+        if previous and previous.digest != digest:
+            # The page changed; drop its old body unless another URL has the same one
+            if not any(other.digest == previous.digest for other in self.entries()):
+                self._unlink_blob(previous.digest)
+        with self._lock:
+            self.stats.stores += 1
+        self.evict()
+        return entry
+
+    def revalidated(self, entry: CacheEntry, etag: Optional[str] = None,
+                    last_modified: Optional[str] = None) -> bytes:
+        """Mark an entry fresh after a 304 and return its body"""
+        entry.fetched_at = time.time()
+        entry.etag = etag or entry.etag
+        entry.last_modified = last_modified or entry.last_modified
+        body = self.read(entry)
+        with self._lock:
+            self.stats.revalidated += 1
+            self.stats.bytes_served += len(body)
+        return body
+
+    # ── eviction ───────────────────────────────────────────
+
+    def entries(self) -> List[CacheEntry]:
+        result = []
+        for name in os.listdir(self._entries_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self._entries_dir, name)) as f:
+                    result.append(CacheEntry(**json.load(f)))
+            except (OSError, ValueError, TypeError):
+                continue
+        return result
+
+    def _unlink_blob(self, digest: str) -> int:
+        """Delete a blob; returns the bytes freed"""
+        path = self._blob_path(digest)
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+            return size
+        except OSError:
+            return 0
+
+    def total_bytes(self) -> int:
+        total = 0
+        for name in os.listdir(self._blobs_dir):
+            try:
+                total += os.path.getsize(os.path.join(self._blobs_dir, name))
+            except OSError:
+                continue
+        return total
+
+    def evict(self):
+        """Drop unreferenced blobs, then least-recently-used entries, until blobs fit in max_bytes"""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        with self._store_lock:
+            entries = sorted(self.entries(), key=lambda e: e.last_access)
+            refs: Dict[str, int] = {}
+            for entry in entries:
+                refs[entry.digest] = refs.get(entry.digest, 0) + 1
+
+            now = time.time()
+            for name in os.listdir(self._blobs_dir):
+                digest = name.split('.', 1)[0]
+                if not name.endswith('.html.gz') or digest in refs:
+                    continue
+                try:
+                    if now - os.path.getmtime(self._blob_path(digest)) < ORPHAN_GRACE_SECONDS:
+                        continue
+                except OSError:
+                    continue
+                total -= self._unlink_blob(digest)
+
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(self._entry_path(entry.url))
+            except OSError:
+                continue
+            with self._lock:
+                self.stats.evictions += 1
+            refs[entry.digest] -= 1
+            if refs[entry.digest] == 0:
+                total -= self._unlink_blob(entry.digest)
+
+    def clear(self):
+        """Delete every entry and blob"""
+        for directory in (self._entries_dir, self._blobs_dir):
+            for name in os.listdir(directory):
+                try:
+                    os.unlink(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+
+def main():
+    cache = RecipeCache.from_env() or RecipeCache()
+
+    if '--clear' in sys.argv:
+        cache.clear()
+        print(f"🗑️  Cleared {cache.cache_dir}")
+        return
+
+    entries = sorted(cache.entries(), key=lambda e: e.last_access, reverse=True)
+    print(f"📦 Recipe cache: {cache.cache_dir}")
+    print(f"   Entries: {len(entries)}")
+    print(f"   Size: {cache.total_bytes() / 1024:.1f} KB / {cache.max_bytes / 1024 / 1024:.0f} MB")
+    print("-"*40)
+    for entry in entries:
+        print(f"  • {entry.url} ({entry.size / 1024:.1f} KB, {entry.age() / 3600:.1f}h old)")
+
+
+if __name__ == "__main__":
+    main()
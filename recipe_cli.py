@@ -5,13 +5,23 @@ Returns JSON output for easy parsing.
 
 Usage:
     python recipe_cli.py <url> [servings]
+    python recipe_cli.py --urls <file> [servings]   # many URLs, NDJSON as they finish
+    python recipe_cli.py --batch <file> [servings]  # many URLs via Message Batches, NDJSON at the end
+    python recipe_cli.py ... --no-cache             # don't reuse stored Claude responses
+    python recipe_cli.py ... --fused                # parse and scale in one Claude call
+    python recipe_cli.py ... --llm-scale            # scale with Claude instead of locally
+    python recipe_cli.py ... --llm-fallback         # local scaling, Claude for what it can't handle
+    python recipe_cli.py ... --hedge                # duplicate Claude requests that run past p90
+    python recipe_cli.py ... --no-tiering           # parse with the large model, not the fast one first
+    python recipe_cli.py ... --base-url URL         # send Claude requests to URL (e.g. anthropic_stub.py)
     python recipe_cli.py --help
 """
 import os
 import sys
 import json
+import asyncio
 import urllib.parse
-from typing import Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
 # Add repo to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -20,47 +30,189 @@ from dotenv import load_dotenv
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 
 import anthropic
-from bs4 import BeautifulSoup
 import requests
 
-MODELID = "claude-sonnet-4-20250514"
+from claude_client import (
+    prompt_cache_stats, structured_output_stats, truncation_stats, StructuredOutputError,
+)
+from batch_fetcher import BatchFetcher, FetchResult, read_url_list, DEFAULT_MAX_CONCURRENCY, DEFAULT_PER_HOST
+from html_parsing import make_soup, page_text
+from recipe_fetcher import fetch_html
+from recipe_locator import LocatedRecipe, locate_recipe, fit_token_budget
+from recipe_jsonld import extract_structured_recipe
+from recipe_pipeline import (
+    ClaudeStep, RecipePrompts, Steps, recipe_steps, run_steps, arun_steps,
+    STEP_PARSE, STEP_FUSED, STEP_SCALE, STEP_FALLBACK,
+)
+from recipe_batches import BatchRequest, BatchRunner, BatchState, job_fingerprint
+from rate_limiter import RateLimiter, get_default_limiter
+from claude_accounting import recipe_scope, run_summary
+from claude_resilience import get_default_resilience
+from model_tiers import Check, get_default_router
 
+# Token budget for the recipe text in the parse prompt (~6000 characters)
+PARSE_TOKEN_BUDGET = 1500
 
-def extract_recipe_text(url: str) -> str:
-    """Fetch and extract text from recipe URL"""
-    response = requests.get(url, headers={
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-    }, timeout=30)
-    response.raise_for_status()
+# Static instruction prefixes, sent ahead of the per-recipe content with a
+# prompt-cache breakpoint; anything that varies belongs in the user message
+PARSE_INSTRUCTIONS = """Analyze the recipe in the user message and extract:
+- recipe_name
+- original_servings (number)
+- ingredients: array of {name, amount, unit, category, notes}
+
+Categories: produce, dairy, meat, seafood, pantry, spices, frozen, bakery
+
+Record the result with the record_recipe tool."""
+
+SCALE_INSTRUCTIONS = """Scale the recipe in the user message from its original servings to the requested servings.
+
+Provide:
+- recipe_name
+- scaled_servings: the requested servings
+- shopping_list: array of {name, amount, unit, category, estimated_price}
+- estimated_total_cost: number
+- storage_tips: {ingredient: tip}
+
+Round to practical amounts. Use common package sizes.
+
+Record the result with the record_scaled_recipe tool."""
+
+FUSED_INSTRUCTIONS = """Analyze the recipe in the user message, then scale it to the requested servings.
+
+Provide two objects:
+- recipe_data: {recipe_name, original_servings (number), ingredients: array of {name, amount, unit, category, notes}}
+- scaled_data: {recipe_name, scaled_servings: the requested servings, shopping_list: array of {name, amount, unit, category, estimated_price}, estimated_total_cost: number, storage_tips: {ingredient: tip}}
+
+Categories: produce, dairy, meat, seafood, pantry, spices, frozen, bakery
+Scale from original_servings. Round to practical amounts. Use common package sizes.
+
+Record the result with the record_recipe_and_scaled tool."""
+
+
+def parse_page(html: str) -> Tuple[LocatedRecipe, Optional[dict]]:
+    """
+    Return (located recipe text, structured recipe or None) for a page.
     
-    soup = BeautifulSoup(response.text, 'html.parser')
-    for el in soup(["script", "style", "nav", "footer", "header", "aside"]):
-        el.decompose()
+    The JSON-LD recipe is read before <script> tags are stripped. The text is
+    narrowed to the located recipe blocks and fit to PARSE_TOKEN_BUDGET.
+    """
+    soup = make_soup(html)
+    structured = extract_structured_recipe(soup)
+    full_text = page_text(soup, ["script", "style", "nav", "footer", "header", "aside"])
+    located = locate_recipe(soup, full_text, max_tokens=PARSE_TOKEN_BUDGET,
+                            baseline_chars=PARSE_TOKEN_BUDGET * 4)
     
-    return soup.get_text(separator='\n', strip=True)
+    return located, structured
+
 
+def extract_recipe(url: str) -> Tuple[LocatedRecipe, Optional[dict]]:
+    """Fetch a recipe URL and run parse_page on it"""
+    return parse_page(fetch_html(url))
 
-def call_claude(client: anthropic.Anthropic, prompt: str) -> dict:
-    """Make Claude API call and parse JSON response"""
-    response = client.messages.create(
-        model=MODELID,
-        max_tokens=4096,
-        messages=[{"role": "user", "content": prompt + "\n\nRespond with valid JSON only."}]
+
+def extract_recipe_text(url: str) -> str:
+    """Fetch and extract text from recipe URL"""
+    return extract_recipe(url)[0].text
+
+
+def call_claude(
+    client: anthropic.Anthropic,
+    prompt: str,
+    tool: Dict,
+    use_cache: bool = True,
+    max_tokens: int = 4096,
+    prefix: Optional[str] = None,
+    check: Optional[Check] = None,
+) -> dict:
+    """
+    Make Claude API call answered through tool and return the validated input; prefix is the cacheable instruction block.
+    With a check, the fast model answers first and the strong model only if check finds problems.
+    """
+    return get_default_router().complete_tool(
+        client,
+        prompt,
+        tool,
+        check=check,
+        max_tokens=max_tokens,
+        use_cache=use_cache,
+        prefix=prefix,
     )
-    
-    text = response.content[0].text.strip()
-    if text.startswith("```"):
-        text = "\n".join(text.split("\n")[1:])
-        if "```" in text:
-            text = text.rsplit("```", 1)[0]
-    
-    return json.loads(text.strip())
 
 
-def process_recipe(url: str, servings: int = 7) -> dict:
+async def acall_claude(
+    client: anthropic.AsyncAnthropic,
+    prompt: str,
+    tool: Dict,
+    use_cache: bool = True,
+    max_tokens: int = 4096,
+    prefix: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+    check: Optional[Check] = None,
+) -> dict:
+    """Async call_claude; the request waits for room under limiter"""
+    return await get_default_router().acomplete_tool(
+        client,
+        prompt,
+        tool,
+        check=check,
+        max_tokens=max_tokens,
+        use_cache=use_cache,
+        prefix=prefix,
+        limiter=limiter,
+    )
+
+
+def build_parse_prompt(recipe_text: str) -> str:
+    """Per-recipe part of the parse prompt; goes after PARSE_INSTRUCTIONS"""
+    return f"""Recipe:
+{fit_token_budget(recipe_text, PARSE_TOKEN_BUDGET)}"""
+
+
+def build_fused_prompt(recipe_text: str, servings: int) -> str:
+    """Per-recipe part of the fused prompt; goes after FUSED_INSTRUCTIONS"""
+    return f"""Requested servings: {servings}
+
+Recipe:
+{fit_token_budget(recipe_text, PARSE_TOKEN_BUDGET)}"""
+
+
+def build_scale_prompt(parsed: dict, servings: int) -> str:
+    """Per-recipe part of the scale prompt (--llm-scale, or the unhandled ingredients with --llm-fallback)"""
+    return f"""Scale from {parsed.get('original_servings', 4)} to {servings} servings.
+
+Recipe: {json.dumps(parsed, indent=2)}"""
+
+
+RECIPE_PROMPTS = RecipePrompts(
+    PARSE_INSTRUCTIONS, SCALE_INSTRUCTIONS, FUSED_INSTRUCTIONS,
+    parse=build_parse_prompt, fused=build_fused_prompt, scale=build_scale_prompt,
+)
+
+# run_batch stages, in order, and the pipeline steps each one sends
+BATCH_STAGES = [('parse', (STEP_PARSE, STEP_FUSED)), ('scale', (STEP_SCALE, STEP_FALLBACK))]
+
+
+def process_recipe(
+    url: str,
+    servings: int = 7,
+    html: Optional[str] = None,
+    use_cache: bool = True,
+    fused: bool = False,
+    scaling: str = 'local',
+    llm_fallback: bool = False,
+    base_url: Optional[str] = None,
+) -> dict:
     """
     Process a recipe URL and return scaled shopping list.
     
+    Pass html to skip the download when the page was already fetched, and
+    use_cache=False to bypass the Claude response cache. With fused=True the
+    parse and scale steps share one Claude round trip. Scaling runs locally
+    unless scaling='llm'; llm_fallback=True sends only the ingredients the
+    local scaler can't handle to Claude. base_url points the Claude client
+    somewhere other than the API (ANTHROPIC_BASE_URL by default), such as
+    anthropic_stub.py.
+    
     Returns dict with:
     - success: bool
     - recipe_name: str
@@ -69,73 +221,292 @@ def process_recipe(url: str, servings: int = 7) -> dict:
     - shopping_list: list of items
     - estimated_cost: float
     - storage_tips: dict
+    - parse_path: "jsonld" if the page's structured data replaced the parse call, else "llm"
+    - input_tokens_saved: estimated prompt tokens trimmed from the page text
+    - llm_calls: number of Claude round trips made
+    - unscaled_ingredients: ingredients the local scaler could only scale linearly
     - error: str (if failed)
     """
-    api_key = os.getenv('ANTHROPIC_API_KEY')
-    if not api_key:
-        return {"success": False, "error": "ANTHROPIC_API_KEY not set"}
+    with recipe_scope(url):
+        api_key = os.getenv('ANTHROPIC_API_KEY')
+        if not api_key:
+            return {"success": False, "error": "ANTHROPIC_API_KEY not set"}
     
-    client = anthropic.Anthropic(api_key=api_key)
+        client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
     
-    try:
-        # Extract recipe
-        recipe_text = extract_recipe_text(url)
+        try:
+            # Extract recipe
+            located, structured = parse_page(html) if html is not None else extract_recipe(url)
+            recipe_text = located.text
         
-        # Parse with Claude
-        parse_prompt = f"""Analyze this recipe and extract:
-- recipe_name
-- original_servings (number)
-- ingredients: array of {{name, amount, unit, category, notes}}
+            def answer(step: ClaudeStep) -> dict:
+                return call_claude(client, step.prompt, step.tool, use_cache=use_cache, max_tokens=step.max_tokens,
+                                   prefix=step.prefix, check=step.check)
+        
+            outcome = run_steps(recipe_steps(recipe_text, structured, servings, RECIPE_PROMPTS, fused, scaling,
+                                             llm_fallback), answer)
+        
+            return build_result(url, servings, outcome.recipe_data, outcome.scaled_data, outcome.parse_path, located,
+                                outcome.llm_calls, outcome.unhandled)
+        
+        except requests.RequestException as e:
+            return {"success": False, "error": f"Failed to fetch recipe: {e}"}
+        except StructuredOutputError as e:
+            return {"success": False, "error": f"Claude response did not match the schema: {e}"}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
 
-Categories: produce, dairy, meat, seafood, pantry, spices, frozen, bakery
 
-Recipe:
-{recipe_text[:6000]}
+def build_result(
+    url: str,
+    servings: int,
+    parsed: dict,
+    scaled: dict,
+    parse_path: str,
+    located: LocatedRecipe,
+    llm_calls: int,
+    unhandled: List[dict],
+) -> dict:
+    """Assemble the process_recipe result dict, adding Walmart search links"""
+    shopping_list = scaled.get('shopping_list', [])
+    for item in shopping_list:
+        name = item.get('name', '')
+        query = urllib.parse.quote_plus(name)
+        item['walmart_url'] = f"https://www.walmart.com/search?q={query}"
 
-Return JSON only."""
+    return {
+        "success": True,
+        "url": url,
+        "recipe_name": scaled.get('recipe_name', parsed.get('recipe_name', 'Recipe')),
+        "original_servings": parsed.get('original_servings', 4),
+        "scaled_servings": servings,
+        "shopping_list": shopping_list,
+        "estimated_cost": scaled.get('estimated_total_cost', 0),
+        "storage_tips": scaled.get('storage_tips', {}),
+        "parse_path": parse_path,
+        "input_tokens_saved": located.tokens_saved,
+        "llm_calls": llm_calls,
+        "unscaled_ingredients": [ing.get('name') for ing in unhandled]
+    }
 
-        parsed = call_claude(client, parse_prompt)
+
+async def process_recipe_async(
+    url: str,
+    servings: int = 7,
+    html: Optional[str] = None,
+    use_cache: bool = True,
+    fused: bool = False,
+    scaling: str = 'local',
+    llm_fallback: bool = False,
+    client: Optional[anthropic.AsyncAnthropic] = None,
+    limiter: Optional[RateLimiter] = None,
+    base_url: Optional[str] = None,
+) -> dict:
+    """
+    Async process_recipe, returning the same dict.
+    
+    Claude calls from many of these overlap, sharing client and limiter
+    (the process-wide limiter by default) so that together they stay under
+    the per-minute request and token limits.
+    """
+    with recipe_scope(url):
+        api_key = os.getenv('ANTHROPIC_API_KEY')
+        if not api_key:
+            return {"success": False, "error": "ANTHROPIC_API_KEY not set"}
+    
+        client = client or anthropic.AsyncAnthropic(api_key=api_key, base_url=base_url, max_retries=0)
+        limiter = limiter or get_default_limiter()
+    
+        try:
+            if html is None:
+                html = await asyncio.to_thread(fetch_html, url)
+            located, structured = await asyncio.to_thread(parse_page, html)
+            recipe_text = located.text
         
-        # Scale recipe
-        scale_prompt = f"""Scale this recipe from {parsed.get('original_servings', 4)} to {servings} servings.
+            async def answer(step: ClaudeStep) -> dict:
+                return await acall_claude(client, step.prompt, step.tool, use_cache=use_cache,
+                                          max_tokens=step.max_tokens, prefix=step.prefix, limiter=limiter,
+                                          check=step.check)
+        
+            outcome = await arun_steps(recipe_steps(recipe_text, structured, servings, RECIPE_PROMPTS, fused,
+                                                    scaling, llm_fallback), answer)
+        
+            return build_result(url, servings, outcome.recipe_data, outcome.scaled_data, outcome.parse_path, located,
+                                outcome.llm_calls, outcome.unhandled)
+        
+        except requests.RequestException as e:
+            return {"success": False, "error": f"Failed to fetch recipe: {e}"}
+        except StructuredOutputError as e:
+            return {"success": False, "error": f"Claude response did not match the schema: {e}"}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
 
-Recipe: {json.dumps(parsed, indent=2)}
 
-Return JSON with:
-- recipe_name
-- scaled_servings: {servings}
-- shopping_list: array of {{name, amount, unit, category, estimated_price}}
-- estimated_total_cost: number
-- storage_tips: {{ingredient: tip}}
+async def process_recipes(
+    urls: List[str],
+    servings: int = 7,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    use_cache: bool = True,
+    fused: bool = False,
+    scaling: str = 'local',
+    llm_fallback: bool = False,
+    limiter: Optional[RateLimiter] = None,
+    base_url: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """
+    Fetch many recipe URLs concurrently and run each through process_recipe_async.
+    
+    Pages are fetched with global and per-host in-flight limits; each page
+    starts its parse/scale steps as soon as it arrives. All Claude calls
+    share one async client and limiter, which sets how many are in flight
+    and keeps them under the per-minute limits. Results are yielded in
+    completion order.
+    """
+    batch = BatchFetcher(max_concurrency=max_concurrency, per_host=per_host)
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    client = anthropic.AsyncAnthropic(api_key=api_key, base_url=base_url, max_retries=0) if api_key else None
+    limiter = limiter or get_default_limiter()
+    
+    async def fetch_and_process(url: str) -> dict:
+        fetched = await batch.fetch_one(url)
+        if not fetched.ok:
+            return {"success": False, "url": url, "error": fetched.error}
+        result = await process_recipe_async(url, servings, fetched.html, use_cache, fused, scaling, llm_fallback,
+                                            client=client, limiter=limiter)
+        result.setdefault("url", url)
+        return result
+    
+    tasks = [asyncio.ensure_future(fetch_and_process(url)) for url in urls]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+        batch.close()
+        if client is not None:
+            await client.close()
 
-Round to practical amounts. Use common package sizes."""
 
-        scaled = call_claude(client, scale_prompt)
-        
-        # Add Walmart search links to each shopping list item
-        shopping_list = scaled.get('shopping_list', [])
-        for item in shopping_list:
-            name = item.get('name', '')
-            query = urllib.parse.quote_plus(name)
-            item['walmart_url'] = f"https://www.walmart.com/search?q={query}"
-
-        return {
-            "success": True,
-            "url": url,
-            "recipe_name": scaled.get('recipe_name', parsed.get('recipe_name', 'Recipe')),
-            "original_servings": parsed.get('original_servings', 4),
-            "scaled_servings": servings,
-            "shopping_list": shopping_list,
-            "estimated_cost": scaled.get('estimated_total_cost', 0),
-            "storage_tips": scaled.get('storage_tips', {})
-        }
-        
-    except requests.RequestException as e:
-        return {"success": False, "error": f"Failed to fetch recipe: {e}"}
-    except json.JSONDecodeError as e:
-        return {"success": False, "error": f"Failed to parse Claude response: {e}"}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+async def _print_batch(urls: List[str], servings: int, output_format: str, **options):
+    async for result in process_recipes(urls, servings, **options):
+        if output_format == "chat":
+            print(format_for_chat(result) + "\n")
+        else:
+            print(json.dumps(result), flush=True)
+    if prompt_cache_stats.requests:
+        print(f"🧊 Prompt cache: {json.dumps(prompt_cache_stats.to_dict())}", file=sys.stderr)
+    if structured_output_stats.calls:
+        print(f"🧩 Structured output: {json.dumps(structured_output_stats.to_dict())}", file=sys.stderr)
+    if truncation_stats.truncated:
+        print(f"✂️  Truncation recovery: {json.dumps(truncation_stats.to_dict())}", file=sys.stderr)
+    limiter_stats = get_default_limiter().stats
+    if limiter_stats.requests:
+        print(f"🚦 Rate limiter: {json.dumps(limiter_stats.to_dict())}", file=sys.stderr)
+    if run_summary():
+        print(run_summary(), file=sys.stderr)
+    tiers = get_default_router().summary()
+    if tiers:
+        print(f"🪜 Model tiers: {json.dumps(tiers)}", file=sys.stderr)
+    latency = get_default_resilience().summary()
+    if latency:
+        print(f"⏱️  Claude latency: {json.dumps(latency)}", file=sys.stderr)
+
+
+async def _fetch_pages(urls: List[str]) -> List[FetchResult]:
+    batch = BatchFetcher()
+    try:
+        results = [result async for result in batch.fetch_all(urls)]
+    finally:
+        batch.close()
+    return sorted(results, key=lambda r: r.index)
+
+
+def run_batch(
+    urls: List[str],
+    servings: int = 7,
+    state_path: str = 'recipe_batch_state.json',
+    use_cache: bool = True,
+    fused: bool = False,
+    scaling: str = 'local',
+    llm_fallback: bool = False,
+    base_url: Optional[str] = None,
+) -> Iterator[dict]:
+    """
+    Process many recipe URLs through the Message Batches API.
+    
+    Pages are fetched concurrently, then every page's recipe_steps advance
+    together: all Claude parse (or fused) prompts go out in one batch, and
+    any Claude scale prompts (scaling='llm', or the unhandled ingredients
+    with llm_fallback) in a second one. Batch IDs are kept in state_path
+    until the run finishes, so rerunning after an interruption resumes the
+    same batches. Yields process_recipe-style results in input order once
+    everything has completed.
+    """
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    if not api_key:
+        yield {"success": False, "error": "ANTHROPIC_API_KEY not set"}
+        return
+    
+    # Batches are already half price, and an escalation would cost another batch round; use the strong model
+    model = get_default_router().strong_model
+    state = BatchState.load(state_path, job_fingerprint(urls, servings, fused, scaling, llm_fallback, model))
+    runner = BatchRunner(anthropic.Anthropic(api_key=api_key, base_url=base_url), state, use_cache=use_cache)
+    
+    results: Dict[int, dict] = {}
+    pages: Dict[int, LocatedRecipe] = {}
+    steps: Dict[int, Steps] = {}
+    waiting: Dict[int, ClaudeStep] = {}
+    
+    def advance(i: int, answer: Optional[dict] = None):
+        """
+        Send page i's steps their answer; build its result once they are
+        done, or record the error if they fail, without stopping the others.
+        """
+        try:
+            waiting[i] = steps[i].send(answer)
+        except StopIteration as done:
+            outcome = done.value
+            results[i] = build_result(urls[i], servings, outcome.recipe_data, outcome.scaled_data, outcome.parse_path,
+                                      pages[i], outcome.llm_calls, outcome.unhandled)
+        except Exception as e:
+            results[i] = {"success": False, "url": urls[i], "error": str(e)}
+    
+    # Fetch and locate; JSON-LD pages with local scaling finish here
+    for fetched in asyncio.run(_fetch_pages(urls)):
+        if not fetched.ok:
+            results[fetched.index] = {"success": False, "url": fetched.url, "error": fetched.error}
+            continue
+        i = fetched.index
+        try:
+            pages[i], structured = parse_page(fetched.html)
+        except Exception as e:
+            results[i] = {"success": False, "url": fetched.url, "error": f"Failed to parse page: {e}"}
+            continue
+        steps[i] = recipe_steps(pages[i].text, structured, servings, RECIPE_PROMPTS, fused, scaling, llm_fallback)
+        advance(i)
+    
+    # One batch per stage for every page whose next step belongs to it
+    for stage, kinds in BATCH_STAGES:
+        custom_ids = {f"{stage}-{i}": i for i, step in waiting.items() if step.kind in kinds}
+        outcomes = runner.run(stage, [
+            BatchRequest(custom_id, waiting[i].prompt, model, max_tokens=waiting[i].max_tokens,
+                         prefix=waiting[i].prefix, tool=waiting[i].tool, recipe=urls[i])
+            for custom_id, i in custom_ids.items()
+        ])
+        for custom_id, i in custom_ids.items():
+            del waiting[i]
+            outcome = outcomes[custom_id]
+            if not outcome.ok:
+                error = outcome.error if stage == 'parse' else f"Scaling failed: {outcome.error}"
+                results[i] = {"success": False, "url": urls[i], "error": error}
+                continue
+            advance(i, outcome.data)
+    
+    state.clear()
+    for i in range(len(urls)):
+        yield results[i]
 
 
 def format_for_chat(result: dict) -> str:
@@ -174,22 +545,66 @@ def format_for_chat(result: dict) -> str:
 
 
 def main():
+    base_url = None
+    if "--base-url" in sys.argv[:-1]:
+        i = sys.argv.index("--base-url")
+        base_url = sys.argv[i + 1]
+        del sys.argv[i:i + 2]
     if len(sys.argv) < 2 or sys.argv[1] in ['-h', '--help']:
         print("Usage: python recipe_cli.py <url> [servings]")
         print("       python recipe_cli.py <url> [servings] --json")
         print("       python recipe_cli.py <url> [servings] --chat")
+        print("       python recipe_cli.py --urls <file> [servings]   # one JSON line per recipe")
+        print("       python recipe_cli.py --batch <file> [servings]  # same, via the Message Batches API")
+        print("       add --no-cache to bypass the Claude response cache")
+        print("       add --fused to parse and scale in a single Claude call")
+        print("       add --llm-scale to scale with Claude, or --llm-fallback to use it only when needed")
+        print("       add --hedge to send a duplicate of any Claude request still running past its p90")
+        print("       add --no-tiering to parse with the large model instead of trying the fast one first")
+        print("       add --base-url URL to send Claude requests to URL, e.g. a local anthropic_stub.py")
         sys.exit(0 if '--help' in sys.argv else 1)
     
-    url = sys.argv[1]
-    servings = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else 7
-    
     output_format = "json"
     if "--chat" in sys.argv:
         output_format = "chat"
     elif "--json" in sys.argv:
         output_format = "json"
+    options = {
+        "use_cache": "--no-cache" not in sys.argv,
+        "fused": "--fused" in sys.argv,
+        "scaling": "llm" if "--llm-scale" in sys.argv else "local",
+        "llm_fallback": "--llm-fallback" in sys.argv,
+        "base_url": base_url,
+    }
+    if "--hedge" in sys.argv:
+        get_default_resilience().policy.hedge = True
+    if "--no-tiering" in sys.argv:
+        get_default_router().tiering = False
+    
+    if sys.argv[1] == '--urls':
+        if len(sys.argv) < 3:
+            print("Error: --urls requires a file of recipe URLs")
+            sys.exit(1)
+        servings = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3].isdigit() else 7
+        asyncio.run(_print_batch(read_url_list(sys.argv[2]), servings, output_format, **options))
+        return
+    
+    if sys.argv[1] == '--batch':
+        if len(sys.argv) < 3:
+            print("Error: --batch requires a file of recipe URLs")
+            sys.exit(1)
+        servings = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3].isdigit() else 7
+        for result in run_batch(read_url_list(sys.argv[2]), servings, f"{sys.argv[2]}.batch.json", **options):
+            if output_format == "chat":
+                print(format_for_chat(result) + "\n")
+            else:
+                print(json.dumps(result), flush=True)
+        return
+    
+    url = sys.argv[1]
+    servings = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else 7
     
-    result = process_recipe(url, servings)
+    result = process_recipe(url, servings, **options)
     
     if output_format == "chat":
         print(format_for_chat(result))
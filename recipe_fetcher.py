@@ -0,0 +1,448 @@
+"""
+Recipe Fetcher
+Shared HTTP layer for downloading recipe pages.
+
+Keeps one pooled, keep-alive requests.Session per host so that batches of
+URLs from the same few recipe sites reuse their TCP/TLS connections instead
+of paying a fresh DNS lookup and handshake for every page.
+
+Pages are streamed: decoding happens incrementally, reading stops at a byte
+cap or wall-clock deadline, and it stops early once both the JSON-LD recipe
+and the ingredient/instruction markup have gone by. The deadline is enforced
+on the socket, so a server dripping bytes can't hold a read open past it.
+A page cut short is cached without its ETag / Last-Modified, so it is
+downloaded again in full rather than revalidated once it goes stale.
+"""
+import re
+import time
+import codecs
+import socket
+import threading
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from recipe_cache import RecipeCache
+
+try:
+    import brotli  # noqa: F401  (urllib3 decodes br when this is importable)
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 8
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 20.0
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_MAX_PAGE_BYTES = 4 * 1024 * 1024
+DEFAULT_DEADLINE = 30.0
+
+CHUNK_SIZE = 16 * 1024
+# Bytes sniffed for a <meta charset> when the headers don't name one
+SNIFF_BYTES = 4096
+# Characters kept reading after the instructions marker before stopping early
+EARLY_STOP_TAIL = 32 * 1024
+
+_HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+
+class PageDeadlineExceeded(requests.exceptions.Timeout):
+    """The page did not finish streaming within the wall-clock deadline"""
+
+
+def _default_headers() -> Dict[str, str]:
+    """Browser-like headers; only advertise br when we can decode it"""
+    return {
+        'User-Agent': DEFAULT_USER_AGENT,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
+        'Connection': 'keep-alive',
+    }
+
+
+def _lookup_codec(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def detect_charset(content_type: Optional[str], head: bytes) -> str:
+    """
+    Pick a charset from the Content-Type header, a BOM or a <meta> tag.
+
+    Args:
+        content_type: Content-Type response header, if any
+        head: The first bytes of the body
+    """
+    match = _HEADER_CHARSET_RE.search(content_type or '')
+    charset = _lookup_codec(match.group(1)) if match else None
+    if charset:
+        return charset
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    match = _META_CHARSET_RE.search(head[:SNIFF_BYTES])
+    charset = _lookup_codec(match.group(1).decode('ascii', 'ignore')) if match else None
+    return charset or 'utf-8'
+
+
+def _response_socket(response: requests.Response) -> Optional[socket.socket]:
+    """The socket a streamed response is read from, if urllib3 exposes it"""
+    connection = getattr(response.raw, 'connection', None)
+    sock = getattr(connection, 'sock', None)
+    if sock is None:
+        # The connection lets go of the socket when the server will close it; the body reader still has it
+        sock = getattr(getattr(getattr(getattr(response.raw, '_fp', None), 'fp', None), 'raw', None), '_sock', None)
+    return sock if isinstance(sock, socket.socket) else None
+
+
+class RecipeRegionWatcher:
+    """
+    Accumulates decoded HTML and notices when the recipe has streamed past.
+
+    Done once a JSON-LD Recipe script has closed and the instructions
+    markup (after the ingredients markup) is EARLY_STOP_TAIL characters behind.
+    Each chunk is scanned once, together with the end of the previous one.
+    """
+
+    _JSONLD_OPEN = re.compile(r'<script[^>]+application/ld\+json[^>]*>', re.IGNORECASE)
+    _JSONLD_CLOSE = '</script>'
+    _RECIPE_TYPE = re.compile(r'"@type"\s*:\s*(?:\[[^\]]*?)?"Recipe"')
+    _INGREDIENTS = re.compile(r'(?:class|id)\s*=\s*["\'][^"\']*ingredient|>\s*Ingredients\s*<', re.IGNORECASE)
+    _INSTRUCTIONS = re.compile(
+        r'(?:class|id)\s*=\s*["\'][^"\']*(?:instruction|direction|preparation|method)'
+        r'|>\s*(?:Instructions|Directions|Preparation|Method)\s*<',
+        re.IGNORECASE,
+    )
+    # Re-scan this much of the previous text so markers split across chunks are found
+    _OVERLAP = 256
+
+    def __init__(self, tail: int = EARLY_STOP_TAIL):
+        self.tail = tail
+        self.length = 0
+        self.jsonld_seen = False
+        self.ingredients_at: Optional[int] = None
+        self.instructions_at: Optional[int] = None
+        self._chunks: List[str] = []
+        self._previous_tail = ''
+        # Where the JSON-LD scan resumes, and the body of a script still streaming in
+        self._jsonld_pos = 0
+        self._script: Optional[List[str]] = None
+
+    @property
+    def text(self) -> str:
+        return ''.join(self._chunks)
+
+    def feed(self, chunk: str):
+        if not chunk:
+            return
+        window_start = self.length - len(self._previous_tail)
+        window = self._previous_tail + chunk
+        self._chunks.append(chunk)
+        self.length += len(chunk)
+        self._previous_tail = window[-self._OVERLAP:]
+
+        if not self.jsonld_seen:
+            self._scan_jsonld(window, window_start)
+        if self.ingredients_at is None:
+            match = self._INGREDIENTS.search(window)
+            if match:
+                self.ingredients_at = window_start + match.start()
+        if self.ingredients_at is not None and self.instructions_at is None:
+            match = self._INSTRUCTIONS.search(window, max(0, self.ingredients_at - window_start))
+            if match:
+                self.instructions_at = window_start + match.start()
+
+    def _scan_jsonld(self, window: str, window_start: int):
+        pos = max(0, self._jsonld_pos - window_start)
+        while not self.jsonld_seen:
+            if self._script is None:
+                opening = self._JSONLD_OPEN.search(window, pos)
+                if not opening:
+                    # Look at the overlap again next time, in case a tag is split across chunks
+                    self._jsonld_pos = window_start + max(pos, len(window) - self._OVERLAP)
+                    return
+                self._script = []
+                pos = opening.end()
+            closing = window.find(self._JSONLD_CLOSE, pos)
+            if closing == -1:
+                keep = max(pos, len(window) - len(self._JSONLD_CLOSE) + 1)
+                self._script.append(window[pos:keep])
+                self._jsonld_pos = window_start + keep
+                return
+            self._script.append(window[pos:closing])
+            self.jsonld_seen = bool(self._RECIPE_TYPE.search(''.join(self._script)))
+            self._script = None
+            pos = closing + len(self._JSONLD_CLOSE)
+            self._jsonld_pos = window_start + pos
+
+    @property
+    def done(self) -> bool:
+        return (
+            self.jsonld_seen
+            and self.instructions_at is not None
+            and self.length - self.instructions_at >= self.tail
+        )
+
+
+class RecipeFetcher:
+    """Pooled, keep-alive page fetcher with one Session per host"""
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        cache: Optional[RecipeCache] = None,
+        max_page_bytes: int = DEFAULT_MAX_PAGE_BYTES,
+        deadline: float = DEFAULT_DEADLINE,
+    ):
+        """
+        Initialize the fetcher.
+
+        Args:
+            pool_connections: Number of connection pools cached per session
+            pool_maxsize: Maximum keep-alive connections kept per host
+            connect_timeout: Seconds to wait for the TCP/TLS connection
+            read_timeout: Seconds to wait between bytes from the server
+            max_retries: Retries for connection errors and 502/503/504
+            cache: Optional on-disk page cache consulted by fetch_html
+            max_page_bytes: Stop reading a page after this many decoded bytes
+            deadline: Wall-clock seconds allowed for streaming one page
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.cache = cache
+        self.max_page_bytes = max_page_bytes
+        self.deadline = deadline
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+    def _new_session(self) -> requests.Session:
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(_default_headers())
+        return session
+
+    def session_for(self, url: str) -> requests.Session:
+        """Return the pooled session for this URL's host, creating it on first use"""
+        key = self._host_key(url)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._new_session()
+                self._sessions[key] = session
+            return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET a URL through the host's pooled session.
+
+        Raises:
+            requests.RequestException: On connection errors or non-2xx status
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        response = self.session_for(url).get(url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def stream_html(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[requests.Response, str, bool]:
+        """
+        Stream a page, decoding incrementally, and return (response, html, complete).
+
+        Reading stops at max_page_bytes, or early once the recipe has been
+        seen, or at the deadline once the recipe markup has been seen;
+        complete is False when the page was cut short any of these ways. The
+        html is empty for a 304.
+
+        Raises:
+            PageDeadlineExceeded: The deadline passed before the recipe markup was seen
+            requests.RequestException: On connection errors or non-2xx status
+        """
+        started = time.monotonic()
+        response = self.session_for(url).get(url, headers=headers, timeout=self.timeout, stream=True)
+        # At the deadline, shut the socket down so a read blocked on a slow server returns at once
+        expired = threading.Event()
+        sock = _response_socket(response)
+
+        def expire():
+            expired.set()
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        watchdog = threading.Timer(max(0.0, self.deadline - (time.monotonic() - started)), expire)
+        watchdog.daemon = True
+        if sock is not None:
+            watchdog.start()
+        try:
+            if response.status_code == 304:
+                return response, '', True
+            response.raise_for_status()
+
+            watcher = RecipeRegionWatcher()
+            decoder = None
+            head = b''
+            received = 0
+            complete = True
+            chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+            while True:
+                try:
+                    chunk = next(chunks, None)
+                except requests.RequestException:
+                    if not expired.is_set():
+                        raise
+                    chunk = None
+                if expired.is_set() or time.monotonic() - started > self.deadline:
+                    # Keep a partial page if the recipe markup already went by
+                    if watcher.instructions_at is None:
+                        raise PageDeadlineExceeded(f"Page took longer than {self.deadline:g}s: {url}")
+                    complete = False
+                    break
+                if chunk is None:
+                    break
+                received += len(chunk)
+                if decoder is None:
+                    head += chunk
+                    if len(head) < SNIFF_BYTES and received < self.max_page_bytes:
+                        continue
+                    charset = detect_charset(response.headers.get('Content-Type'), head)
+                    response.encoding = charset
+                    decoder = codecs.getincrementaldecoder(charset)(errors='replace')
+                    chunk, head = head, b''
+                watcher.feed(decoder.decode(chunk))
+
+                if watcher.done or received >= self.max_page_bytes:
+                    complete = False
+                    break
+
+            if decoder is None:
+                charset = detect_charset(response.headers.get('Content-Type'), head)
+                response.encoding = charset
+                return response, head.decode(charset, errors='replace'), complete
+            watcher.feed(decoder.decode(b'', final=True))
+            return response, watcher.text, complete
+        finally:
+            watchdog.cancel()
+            response.close()
+
+    def fetch_html(self, url: str) -> str:
+        """
+        Fetch a page and return its decoded HTML.
+
+        With a cache attached, fresh entries are returned without a request
+        and stale ones are revalidated with a conditional GET.
+        """
+        if self.cache is None:
+            return self.stream_html(url)[1]
+
+        entry = self.cache.lookup(url)
+        if entry and self.cache.is_fresh(entry):
+            body = self.cache.read(entry)
+            self.cache.record_hit(body)
+            return self._decode(body, entry.encoding)
+
+        headers = entry.conditional_headers() if entry else {}
+        response, html, complete = self.stream_html(url, headers=headers)
+        if entry and response.status_code == 304:
+            body = self.cache.revalidated(
+                entry,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+            )
+            return self._decode(body, entry.encoding)
+
+        self.cache.record_miss()
+        # The validators describe the whole page; a 304 for them must not bring back a cut-off copy
+        self.cache.store(
+            url,
+            html.encode('utf-8'),
+            encoding='utf-8',
+            etag=response.headers.get('ETag') if complete else None,
+            last_modified=response.headers.get('Last-Modified') if complete else None,
+        )
+        return html
+
+    @staticmethod
+    def _decode(body: bytes, encoding: Optional[str]) -> str:
+        return body.decode(encoding or 'utf-8', errors='replace')
+
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters of the attached cache (empty without one)"""
+        return self.cache.stats.to_dict() if self.cache else {}
+
+    def close(self):
+        """Close every pooled session"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_fetcher: Optional[RecipeFetcher] = None
+_default_lock = threading.Lock()
+
+
+def get_default_fetcher() -> RecipeFetcher:
+    """Process-wide fetcher shared by main.py and recipe_cli.py"""
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = RecipeFetcher(cache=RecipeCache.from_env())
+        return _default_fetcher
+
+
+def fetch_html(url: str) -> str:
+    """Fetch a recipe page through the shared pooled fetcher"""
+    return get_default_fetcher().fetch_html(url)
@@ -0,0 +1,195 @@
+"""
+Structured Recipe Data
+Reads the schema.org Recipe object most recipe sites embed as
+application/ld+json and maps it to the dict shape RecipeAssistant.parse_recipe
+returns, so complete pages can skip the Claude parse call entirely.
+
+Must run on the soup *before* <script> tags are decomposed.
+"""
+import re
+import json
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional
+
+from ingredients import parse_ingredient_line, parse_number
+
+PARSE_PATH_JSONLD = 'jsonld'
+PARSE_PATH_LLM = 'llm'
+
+# Minimum share of ingredient lines that must yield a numeric amount
+MIN_PARSED_RATIO = 0.75
+
+_DURATION_RE = re.compile(
+    r'^P(?:(?P<days>\d+(?:\.\d+)?)D)?'
+    r'(?:T(?:(?P<hours>\d+(?:\.\d+)?)H)?(?:(?P<minutes>\d+(?:\.\d+)?)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$',
+    re.IGNORECASE,
+)
+
+MEAL_TYPE_KEYWORDS = [
+    ('breakfast', ['breakfast', 'brunch']),
+    ('dessert', ['dessert', 'cake', 'cookie', 'pie', 'sweet']),
+    ('snack', ['snack', 'appetizer', 'starter']),
+    ('lunch', ['lunch', 'sandwich', 'salad']),
+    ('dinner', ['dinner', 'main', 'entree', 'entrée', 'side']),
+]
+
+
+@dataclass
+class ParsePathStats:
+    """Counts which parse path each recipe took"""
+    jsonld: int = 0
+    llm: int = 0
+
+    def record(self, path: str):
+        with _stats_lock:
+            setattr(self, path, getattr(self, path) + 1)
+
+    def llm_avoidance_rate(self) -> float:
+        total = self.jsonld + self.llm
+        return self.jsonld / total if total else 0.0
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        result['llm_avoidance_rate'] = round(self.llm_avoidance_rate(), 4)
+        return result
+
+
+_stats_lock = threading.Lock()
+parse_path_stats = ParsePathStats()
+
+
+def _iter_nodes(data) -> Iterator[Dict]:
+    """Walk lists and @graph containers yielding every JSON-LD object"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if '@graph' in data:
+            yield from _iter_nodes(data['@graph'])
+
+
+def _is_recipe(node: Dict) -> bool:
+    types = node.get('@type', [])
+    if isinstance(types, str):
+        types = [types]
+    return any(t.split('/')[-1] == 'Recipe' for t in types if isinstance(t, str))
+
+
+def find_jsonld_recipe(soup) -> Optional[Dict]:
+    """Return the first schema.org Recipe object embedded in the page"""
+    for script in soup.find_all('script', type='application/ld+json'):
+        raw = script.string or script.get_text()
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw, strict=False)
+        except ValueError:
+            continue
+        for node in _iter_nodes(data):
+            if _is_recipe(node):
+                return node
+    return None
+
+
+def parse_duration_minutes(value) -> Optional[int]:
+    """ISO 8601 duration ('PT1H30M') to whole minutes"""
+    if not isinstance(value, str):
+        return None
+    match = _DURATION_RE.match(value.strip())
+    if not match or not any(match.groupdict().values()):
+        return None
+    parts = {k: float(v) if v else 0.0 for k, v in match.groupdict().items()}
+    return int(round(parts['days'] * 1440 + parts['hours'] * 60 + parts['minutes'] + parts['seconds'] / 60))
+
+
+def _first_number(value) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, list):
+        for item in value:
+            number = _first_number(item)
+            if number:
+                return number
+        return None
+    if isinstance(value, str):
+        match = re.search(r'\d+(?:\.\d+)?(?:\s*/\s*\d+)?', value)
+        if match:
+            return parse_number(match.group(0).replace(' ', ''))
+    return None
+
+
+def _text(value) -> str:
+    if isinstance(value, list):
+        value = value[0] if value else ''
+    if isinstance(value, dict):
+        value = value.get('name') or value.get('text') or ''
+    return str(value).strip() if value else ''
+
+
+def _meal_type(node: Dict) -> Optional[str]:
+    category = node.get('recipeCategory', '')
+    if isinstance(category, list):
+        category = ' '.join(str(c) for c in category)
+    lowered = str(category).lower()
+    for meal_type, keywords in MEAL_TYPE_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return meal_type
+    return None
+
+
+def jsonld_to_recipe_data(node: Dict) -> Dict:
+    """Map a schema.org Recipe object to the parse_recipe dict shape"""
+    nutrition = node.get('nutrition') or {}
+    calories = _first_number(nutrition.get('calories')) if isinstance(nutrition, dict) else None
+    servings = _first_number(node.get('recipeYield') or node.get('yield'))
+
+    raw_ingredients = node.get('recipeIngredient') or node.get('ingredients') or []
+    if isinstance(raw_ingredients, str):
+        raw_ingredients = [raw_ingredients]
+    ingredients: List[Dict] = [
+        parse_ingredient_line(_text(line)) for line in raw_ingredients if _text(line)
+    ]
+
+    return {
+        "recipe_name": _text(node.get('name')),
+        "original_servings": int(servings) if servings else None,
+        "meal_type": _meal_type(node),
+        "calories_per_serving": int(calories) if calories else None,
+        "prep_time_minutes": parse_duration_minutes(node.get('prepTime')),
+        "cook_time_minutes": parse_duration_minutes(node.get('cookTime')),
+        "ingredients": [ing for ing in ingredients if ing['name']],
+    }
+
+
+def is_complete(recipe_data: Optional[Dict]) -> bool:
+    """
+    Decide whether structured data is good enough to skip the LLM parse.
+
+    Requires a name, servings, at least two ingredients and a numeric amount
+    on most of them ("salt to taste" lines are allowed to have none).
+    """
+    if not recipe_data:
+        return False
+    ingredients = recipe_data.get('ingredients') or []
+    if not recipe_data.get('recipe_name') or not recipe_data.get('original_servings'):
+        return False
+    if len(ingredients) < 2:
+        return False
+    parsed = sum(1 for ing in ingredients if ing.get('amount') is not None)
+    return parsed / len(ingredients) >= MIN_PARSED_RATIO
+
+
+def extract_structured_recipe(soup) -> Optional[Dict]:
+    """
+    Extract a parse_recipe-shaped dict from the page's JSON-LD, if usable.
+
+    Returns:
+        The mapped recipe dict when is_complete() passes, otherwise None
+    """
+    node = find_jsonld_recipe(soup)
+    if node is None:
+        return None
+    recipe_data = jsonld_to_recipe_data(node)
+    return recipe_data if is_complete(recipe_data) else None
@@ -0,0 +1,208 @@
+"""
+Recipe Pipeline
+The parse → scale flow once a page has been fetched and located, written
+once and shared by main.py and recipe_cli.py.
+
+Like claude_client.tool_exchange, the flow is a generator: it yields a
+ClaudeStep for each Claude call it needs, is sent back the validated tool
+input, and returns the RecipeOutcome. run_steps drives it with a sync
+call, arun_steps with an async one, and stream_steps streams the steps
+whose answer is a shopping list, so every caller makes the same calls in
+the same order:
+
+    page with JSON-LD   no parse call; local scaling (or a scale call)
+    fused               one call for parse and scale
+    otherwise           a parse call, then local scaling, a scale call
+                        (scaling='llm') or a fallback call for what the
+                        local scaler couldn't handle (llm_fallback)
+
+Usage:
+    outcome = run_steps(recipe_steps(text, structured, 6, PROMPTS), answer)
+"""
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Generator, List, Optional, TypeVar
+
+from model_tiers import Check
+from recipe_jsonld import parse_path_stats, PARSE_PATH_JSONLD, PARSE_PATH_LLM
+from recipe_scaler import scale_locally, merge_scaled
+from recipe_schemas import PARSE_TOOL, SCALE_TOOL, FUSED_TOOL, parse_quality_errors
+
+T = TypeVar('T')
+
+FUSED_MAX_TOKENS = 8192
+
+# Step kinds; fused and scale answers carry a shopping list
+STEP_PARSE = 'parse'
+STEP_FUSED = 'fused'
+STEP_SCALE = 'scale'
+STEP_FALLBACK = 'fallback'
+
+
+@dataclass
+class RecipePrompts:
+    """A caller's instruction prefixes and per-recipe prompt builders"""
+    parse_instructions: str
+    scale_instructions: str
+    fused_instructions: str
+    # parse(recipe_text), fused(recipe_text, servings), scale(recipe_data, servings)
+    parse: Callable[[str], str]
+    fused: Callable[[str, int], str]
+    scale: Callable[[Dict, int], str]
+
+
+@dataclass
+class ClaudeStep:
+    """One Claude tool call the pipeline needs answered"""
+    kind: str
+    description: str
+    prompt: str
+    tool: Dict
+    prefix: str
+    max_tokens: int = 4096
+    check: Optional[Check] = None
+
+    @property
+    def streamable(self) -> bool:
+        """The answer is a shopping list worth streaming item by item"""
+        return self.kind in (STEP_FUSED, STEP_SCALE)
+
+
+@dataclass
+class RecipeOutcome:
+    """What the pipeline produced for one recipe"""
+    recipe_data: Dict
+    scaled_data: Optional[Dict]
+    parse_path: str
+    llm_calls: int = 0
+    # Ingredients the local scaler could only scale linearly
+    unhandled: List[Dict] = field(default_factory=list)
+
+
+Steps = Generator[ClaudeStep, Dict, T]
+
+
+def parse_steps(
+    recipe_text: str,
+    structured: Optional[Dict],
+    servings: int,
+    prompts: RecipePrompts,
+    fused: bool = False,
+) -> Steps[RecipeOutcome]:
+    """
+    Parse a located recipe: structured (JSON-LD) data when the page had it,
+    else a parse call, or with fused a parse-and-scale call that also fills
+    in scaled_data.
+    """
+    if structured:
+        outcome = RecipeOutcome(structured, None, PARSE_PATH_JSONLD)
+    elif fused:
+        result = yield ClaudeStep(
+            STEP_FUSED, f"Analyzing and scaling recipe for {servings} servings",
+            prompts.fused(recipe_text, servings), FUSED_TOOL, prompts.fused_instructions,
+            max_tokens=FUSED_MAX_TOKENS,
+        )
+        outcome = RecipeOutcome(result.get('recipe_data') or {}, result.get('scaled_data') or {}, PARSE_PATH_LLM, 1)
+    else:
+        parsed = yield ClaudeStep(
+            STEP_PARSE, "Analyzing recipe", prompts.parse(recipe_text), PARSE_TOOL, prompts.parse_instructions,
+            check=parse_quality_errors,
+        )
+        outcome = RecipeOutcome(parsed, None, PARSE_PATH_LLM, 1)
+    parse_path_stats.record(outcome.parse_path)
+    return outcome
+
+
+def scale_steps(
+    recipe_data: Dict,
+    servings: int,
+    prompts: RecipePrompts,
+    scaling: str = 'local',
+    llm_fallback: bool = False,
+) -> Steps[RecipeOutcome]:
+    """
+    Scale parsed recipe data: with a scale call when scaling='llm', else
+    locally, sending only the ingredients the local scaler can't handle to
+    Claude when llm_fallback is set. Returns an outcome holding just
+    scaled_data, llm_calls and unhandled.
+    """
+    outcome = RecipeOutcome(recipe_data, None, '')
+    if scaling == 'llm':
+        outcome.scaled_data = yield ClaudeStep(
+            STEP_SCALE, f"Scaling recipe for {servings} servings",
+            prompts.scale(recipe_data, servings), SCALE_TOOL, prompts.scale_instructions,
+        )
+        outcome.llm_calls = 1
+        return outcome
+
+    outcome.scaled_data, outcome.unhandled = scale_locally(recipe_data, servings)
+    if outcome.unhandled and llm_fallback:
+        fallback = yield ClaudeStep(
+            STEP_FALLBACK, f"Scaling {len(outcome.unhandled)} ingredient(s) the local scaler couldn't handle",
+            prompts.scale({**recipe_data, "ingredients": outcome.unhandled}, servings), SCALE_TOOL,
+            prompts.scale_instructions,
+        )
+        merge_scaled(outcome.scaled_data, fallback)
+        outcome.llm_calls = 1
+        outcome.unhandled = []
+    return outcome
+
+
+def recipe_steps(
+    recipe_text: str,
+    structured: Optional[Dict],
+    servings: int,
+    prompts: RecipePrompts,
+    fused: bool = False,
+    scaling: str = 'local',
+    llm_fallback: bool = False,
+) -> Steps[RecipeOutcome]:
+    """parse_steps, then scale_steps unless the parse call already scaled"""
+    outcome = yield from parse_steps(recipe_text, structured, servings, prompts, fused)
+    if outcome.scaled_data is None:
+        scaled = yield from scale_steps(outcome.recipe_data, servings, prompts, scaling, llm_fallback)
+        outcome.scaled_data = scaled.scaled_data
+        outcome.unhandled = scaled.unhandled
+        outcome.llm_calls += scaled.llm_calls
+    return outcome
+
+
+def run_steps(steps: Steps[T], answer: Callable[[ClaudeStep], Dict]) -> T:
+    """Answer every step with answer(step) and return the pipeline's result"""
+    try:
+        step = next(steps)
+        while True:
+            step = steps.send(answer(step))
+    except StopIteration as done:
+        return done.value
+
+
+async def arun_steps(steps: Steps[T], answer: Callable[[ClaudeStep], Awaitable[Dict]]) -> T:
+    """run_steps with an async answer"""
+    try:
+        step = next(steps)
+        while True:
+            step = steps.send(await answer(step))
+    except StopIteration as done:
+        return done.value
+
+
+def stream_steps(
+    steps: Steps[T],
+    answer: Callable[[ClaudeStep], Dict],
+    stream: Callable[[ClaudeStep], Generator[Dict, None, Dict]],
+) -> Generator[Dict, None, T]:
+    """
+    run_steps, answering streamable steps with stream(step), which yields
+    shopping-list items as they arrive and returns the whole tool input;
+    those items are yielded on.
+    """
+    try:
+        step = next(steps)
+    except StopIteration as done:
+        return done.value
+    while True:
+        result = (yield from stream(step)) if step.streamable else answer(step)
+        try:
+            step = steps.send(result)
+        except StopIteration as done:
+            return done.value
@@ -0,0 +1,369 @@
+"""
+Local Recipe Scaling
+Deterministic replacement for the scale_recipe Claude call.
+
+Multiplies ingredient amounts by servings_needed / original_servings,
+converts between compatible units, rounds to practical kitchen fractions,
+snaps the shopping list to common package sizes and estimates prices.
+The result has the same scaled_data shape the LLM prompt asks for.
+
+Ingredients it cannot reason about (unknown units, non-numeric amounts on
+anything but seasonings) are returned separately so callers can hand just
+those to Claude as an opt-in fallback.
+"""
+import re
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from ingredients import VOLUME_TSP, WEIGHT_OZ, guess_category, normalize_unit
+
+DEFAULT_ORIGINAL_SERVINGS = 4
+
+METRIC_UNITS = ('ml', 'l', 'g', 'kg')
+COUNT_UNITS = (
+    'whole', 'clove', 'can', 'bunch', 'head', 'stalk', 'sprig', 'slice', 'stick',
+    'package', 'jar', 'bottle', 'pinch', 'dash', 'dozen',
+)
+
+# Fractions a cook can actually measure
+CUP_FRACTIONS = (0, 1 / 4, 1 / 3, 1 / 2, 2 / 3, 3 / 4, 1)
+SPOON_FRACTIONS = (0, 1 / 4, 1 / 2, 3 / 4, 1)
+
+# Fallback prices by category: per lb, per quart, per item, per package
+CATEGORY_PRICES = {
+    'produce': (1.50, 3.00, 0.75, 2.50),
+    'dairy': (5.00, 3.00, 0.40, 3.50),
+    'meat': (6.00, 6.00, 1.50, 7.00),
+    'seafood': (10.00, 10.00, 2.50, 9.00),
+    'pantry': (2.50, 4.00, 1.50, 3.00),
+    'spices': (8.00, 8.00, 3.00, 3.50),
+    'frozen': (3.00, 4.00, 1.00, 3.50),
+    'bakery': (4.00, 4.00, 1.00, 3.50),
+}
+
+# Shown for shopping-list items that leave a meaningful amount over
+STORAGE_TIPS = {
+    'meat': "Refrigerate and use within 2 days, or freeze in meal-sized portions",
+    'seafood': "Use within 1-2 days or freeze",
+    'dairy': "Keep refrigerated; use within a week of opening",
+    'produce': "Store in the crisper drawer and use the most perishable items first",
+    'bakery': "Freeze extras and thaw as needed",
+    'frozen': "Keep frozen until the day you cook",
+    'pantry': "Store sealed in a cool, dry cupboard",
+}
+
+
+@dataclass
+class Package:
+    """One purchasable size; size is in the rule's base unit"""
+    size: float
+    amount: float
+    unit: str
+    price: float
+
+
+def _word_pattern(phrases: Tuple[str, ...]) -> re.Pattern:
+    """Any of phrases as whole words, allowing a plural ending"""
+    return re.compile(r'\b(?:' + '|'.join(re.escape(p) for p in phrases) + r')(?:s|es)?\b')
+
+
+@dataclass
+class PackageRule:
+    """
+    Store package sizes for ingredients matching one of the keywords but
+    none of the exclude phrases (a different product that contains a
+    keyword, like "peanut butter" for butter).
+
+    per maps a recipe unit ('clove', 'stick', ...) or a whole family
+    ('volume' in tsp, 'weight' in oz) to the rule's base unit.
+    """
+    keywords: Tuple[str, ...]
+    packages: List[Package]
+    per: Dict[str, float]
+    exclude: Tuple[str, ...] = ()
+    pattern: re.Pattern = field(init=False, repr=False)
+    excluded: Optional[re.Pattern] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.pattern = _word_pattern(self.keywords)
+        self.excluded = _word_pattern(self.exclude) if self.exclude else None
+
+    def matches(self, name: str) -> bool:
+        """Whether the lowercased ingredient name is one of this rule's products"""
+        return bool(self.pattern.search(name)) and not (self.excluded and self.excluded.search(name))
+
+    def need(self, base: float, dimension: Optional[str], unit: str) -> Optional[float]:
+        """Recipe quantity in the rule's base unit, or None if it can't be converted"""
+        if unit in self.per:
+            return base * self.per[unit]
+        if dimension in ('volume', 'weight') and dimension in self.per:
+            return base * self.per[dimension]
+        return None
+
+
+# First match wins, so specific names come before the generic ones they contain
+PACKAGE_RULES = [
+    PackageRule(('garlic',), [Package(10, 1, 'head', 0.60)], {'clove': 1, 'head': 10, 'whole': 1}),
+    PackageRule(('egg',), [Package(12, 1, 'dozen', 3.50), Package(18, 18, 'count', 5.00)],
+                {'whole': 1, 'dozen': 12}),
+    PackageRule(('bacon',), [Package(12, 12, 'oz', 6.00), Package(16, 1, 'lb', 7.50)],
+                {'weight': 1, 'slice': 1, 'whole': 1}),
+    PackageRule(('butter',), [Package(24, 1, 'stick', 1.50), Package(96, 1, 'lb', 5.00)],
+                {'volume': 1, 'weight': 6, 'stick': 24},
+                exclude=('peanut butter', 'nut butter', 'almond butter', 'cashew butter', 'apple butter',
+                         'cocoa butter')),
+    PackageRule(('sour cream',), [Package(48, 8, 'oz', 2.00), Package(96, 16, 'oz', 3.00)],
+                {'volume': 1, 'weight': 6}),
+    PackageRule(('cream cheese',), [Package(8, 8, 'oz', 2.50), Package(16, 16, 'oz', 4.50)],
+                {'weight': 1, 'volume': 8 / 48}),
+    PackageRule(('cream', 'half-and-half'),
+                [Package(48, 1, 'cup', 2.50), Package(96, 1, 'pint', 4.00), Package(192, 1, 'quart', 6.50)],
+                {'volume': 1},
+                exclude=('ice cream', 'cream of tartar', 'cream of mushroom', 'cream of chicken', 'coconut cream')),
+    PackageRule(('milk', 'broth', 'stock'),
+                [Package(192, 1, 'quart', 3.00), Package(384, 0.5, 'gallon', 3.50), Package(768, 1, 'gallon', 4.50)],
+                {'volume': 1},
+                exclude=('coconut milk', 'condensed milk', 'evaporated milk')),
+    PackageRule(('cheese', 'gruyère', 'gruyere', 'cheddar', 'parmesan', 'mozzarella'),
+                [Package(8, 8, 'oz', 4.50), Package(16, 16, 'oz', 8.00), Package(32, 2, 'lb', 14.00)],
+                {'weight': 1, 'volume': 4 / 48}),
+    PackageRule(('scallion', 'green onion'), [Package(8, 1, 'bunch', 1.00)],
+                {'whole': 1, 'stalk': 1, 'bunch': 8, 'volume': 8 / 48}),
+    PackageRule(('chive', 'parsley', 'cilantro', 'basil', 'mint', 'dill'), [Package(1, 1, 'bunch', 1.50)],
+                {'bunch': 1, 'whole': 1, 'sprig': 0.1, 'volume': 1 / 48}),
+    PackageRule(('potato',), [Package(48, 3, 'lb', 3.50), Package(80, 5, 'lb', 4.50), Package(160, 10, 'lb', 7.00)],
+                {'weight': 1, 'whole': 8}),
+    PackageRule(('oil', 'vinegar'), [Package(96, 16, 'fl oz', 4.00), Package(288, 48, 'fl oz', 9.00)],
+                {'volume': 1}),
+    PackageRule(('flour',), [Package(32, 2, 'lb', 2.50), Package(80, 5, 'lb', 4.00)],
+                {'weight': 1, 'volume': 4.25 / 48}),
+    PackageRule(('sugar',), [Package(32, 2, 'lb', 2.50), Package(64, 4, 'lb', 4.00)],
+                {'weight': 1, 'volume': 7 / 48}),
+]
+
+# Generic sizes by family (base size, amount, unit) when no rule matches
+GENERIC_PACKAGES = {
+    'weight': [(8, 8, 'oz'), (16, 1, 'lb'), (32, 2, 'lb'), (48, 3, 'lb'), (80, 5, 'lb')],
+    'volume': [(48, 1, 'cup'), (96, 1, 'pint'), (192, 1, 'quart'), (384, 0.5, 'gallon'), (768, 1, 'gallon')],
+}
+
+
+def round_to_fraction(value: float, fractions=CUP_FRACTIONS) -> float:
+    """Round to a whole number plus a measurable fraction (1.3 → 1.333)"""
+    whole = math.floor(value)
+    frac = min(fractions, key=lambda f: abs((value - whole) - f))
+    return round(whole + frac, 3)
+
+
+def unit_dimension(unit: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Return (canonical unit, family) where family is volume, weight, count or None"""
+    canonical = (normalize_unit(unit) if unit else None) or (unit or 'whole')
+    if canonical in VOLUME_TSP:
+        return canonical, 'volume'
+    if canonical in WEIGHT_OZ:
+        return canonical, 'weight'
+    if canonical in COUNT_UNITS:
+        return canonical, 'count'
+    return canonical, None
+
+
+def to_base(amount: float, unit: str) -> float:
+    """Convert to teaspoons (volume) or ounces (weight); counts stay in their own unit"""
+    if unit in VOLUME_TSP:
+        return amount * VOLUME_TSP[unit]
+    if unit in WEIGHT_OZ:
+        return amount * WEIGHT_OZ[unit]
+    return amount
+
+
+def kitchen_amount(base: float, dimension: str, unit: str) -> Tuple[float, str]:
+    """Express a base quantity in the most natural unit of the recipe's own system"""
+    if dimension == 'volume':
+        if unit in METRIC_UNITS:
+            ml = base / VOLUME_TSP['ml']
+            return (round(ml / 1000, 2), 'l') if ml >= 1000 else (float(max(5, round(ml / 5) * 5)), 'ml')
+        if base < 3:
+            return max(0.25, round_to_fraction(base, SPOON_FRACTIONS)), 'tsp'
+        if base < 12:
+            return round_to_fraction(base / 3, SPOON_FRACTIONS), 'tbsp'
+        if base >= 768:
+            return round_to_fraction(base / 768, SPOON_FRACTIONS), 'gallon'
+        return round_to_fraction(base / 48), 'cup'
+    if dimension == 'weight':
+        if unit in METRIC_UNITS:
+            grams = base / WEIGHT_OZ['g']
+            return (round(grams / 1000, 2), 'kg') if grams >= 1000 else (float(max(5, round(grams / 5) * 5)), 'g')
+        if base >= 16:
+            return round_to_fraction(base / 16, SPOON_FRACTIONS), 'lb'
+        return (max(0.5, round(base * 2) / 2) if base < 4 else float(round(base))), 'oz'
+    if unit in ('pinch', 'dash'):
+        return float(max(1, round(base))), unit
+    # Counted items: nearest half for small counts, whole otherwise
+    return (max(0.5, round(base * 2) / 2) if base < 2 else float(round(base))), unit
+
+
+def find_package_rule(name: str) -> Optional[PackageRule]:
+    lowered = name.lower()
+    for rule in PACKAGE_RULES:
+        if rule.matches(lowered):
+            return rule
+    return None
+
+
+def _pick_package(need: float, packages: List[Package]) -> Tuple[int, Package]:
+    """Smallest single package covering the need, else enough of the largest"""
+    for package in packages:
+        if package.size >= need:
+            return 1, package
+    largest = packages[-1]
+    return math.ceil(need / largest.size), largest
+
+
+def shopping_entry(name: str, base: float, dimension: Optional[str], unit: str, category: str) -> Dict:
+    """
+    Snap one combined need to a purchasable quantity.
+
+    Returns:
+        Dict with amount, unit, estimated_price and leftover (True when the
+        package holds noticeably more than the recipe uses)
+    """
+    per_lb, per_quart, per_item, per_package = CATEGORY_PRICES.get(category, CATEGORY_PRICES['pantry'])
+
+    rule = find_package_rule(name)
+    need = rule.need(base, dimension, unit) if rule is not None else None
+    if need is not None:
+        count, package = _pick_package(need, rule.packages)
+        return {
+            "amount": package.amount * count,
+            "unit": package.unit,
+            "estimated_price": round(package.price * count, 2),
+            "leftover": package.size * count > need * 1.25,
+        }
+
+    if category == 'spices' or unit in ('pinch', 'dash'):
+        return {"amount": 1, "unit": 'jar', "estimated_price": per_package, "leftover": True}
+
+    if dimension in GENERIC_PACKAGES:
+        sizes = GENERIC_PACKAGES[dimension]
+        size, amount, pkg_unit = next((s for s in sizes if s[0] >= base), sizes[-1])
+        if size < base:
+            multiple = math.ceil(base / size)
+            size, amount = size * multiple, amount * multiple
+        price = per_lb * size / 16 if dimension == 'weight' else per_quart * size / 192
+        return {"amount": amount, "unit": pkg_unit, "estimated_price": round(price, 2),
+                "leftover": size > base * 1.25}
+
+    count = max(1, math.ceil(base - 0.05))
+    price = per_item if unit == 'whole' else per_package
+    return {"amount": count, "unit": unit, "estimated_price": round(price * count, 2), "leftover": False}
+
+
+def _needs_fallback(ing: Dict, amount: Optional[float], dimension: Optional[str]) -> bool:
+    if amount is None:
+        category = ing.get('category') or guess_category(ing.get('name', ''))
+        return category != 'spices'
+    return dimension is None
+
+
+def scale_locally(recipe_data: Dict, servings_needed: int) -> Tuple[Dict, List[Dict]]:
+    """
+    Scale a parsed recipe without calling Claude.
+
+    Args:
+        recipe_data: Dict shaped like RecipeAssistant.parse_recipe output
+        servings_needed: Target servings
+
+    Returns:
+        (scaled_data, unhandled) where unhandled lists the original ingredient
+        dicts the engine could only scale linearly in their own unit
+    """
+    try:
+        factor = servings_needed / float(recipe_data.get('original_servings') or DEFAULT_ORIGINAL_SERVINGS)
+    except (TypeError, ValueError, ZeroDivisionError):
+        factor = servings_needed / DEFAULT_ORIGINAL_SERVINGS
+
+    scaled_ingredients: List[Dict] = []
+    unhandled: List[Dict] = []
+    # Same ingredient in the same family is bought once: key → [name, base total, dimension, unit, category, notes]
+    combined: Dict[Tuple[str, str], List] = {}
+
+    for ing in recipe_data.get('ingredients', []):
+        name = (ing.get('name') or '').strip()
+        if not name:
+            continue
+        category = ing.get('category') or guess_category(name)
+        notes = ing.get('notes') or ''
+        unit, dimension = unit_dimension(ing.get('unit'))
+        try:
+            amount = float(ing.get('amount'))
+        except (TypeError, ValueError):
+            amount = None
+
+        if _needs_fallback(ing, amount, dimension):
+            unhandled.append(ing)
+
+        if amount is None:
+            scaled = {"name": name, "amount": None, "unit": ing.get('unit') or '',
+                      "category": category, "notes": notes or "to taste"}
+            base = 0.0
+        elif dimension is None:
+            scaled = {"name": name, "amount": round(amount * factor, 2), "unit": ing.get('unit') or '',
+                      "category": category, "notes": notes}
+            base = amount * factor
+        else:
+            base = to_base(amount, unit) * factor
+            kitchen, kitchen_unit = kitchen_amount(base, dimension, unit)
+            scaled = {"name": name, "amount": kitchen, "unit": kitchen_unit, "category": category, "notes": notes}
+        scaled_ingredients.append(scaled)
+
+        family = dimension if dimension in ('volume', 'weight') else unit
+        entry = combined.setdefault((name.lower(), family), [name, 0.0, dimension, unit, category, notes])
+        entry[1] += base
+
+    shopping_list: List[Dict] = []
+    storage_tips: Dict[str, str] = {}
+    for name, base, dimension, unit, category, notes in combined.values():
+        entry = shopping_entry(name, base, dimension, unit, category)
+        shopping_list.append({
+            "name": name,
+            "amount": entry['amount'],
+            "unit": entry['unit'],
+            "category": category,
+            "notes": notes,
+            "estimated_price": entry['estimated_price'],
+        })
+        if entry['leftover'] and category in STORAGE_TIPS:
+            storage_tips[name] = STORAGE_TIPS[category]
+
+    scaled_data = {
+        "recipe_name": recipe_data.get('recipe_name', 'Recipe'),
+        "scaled_servings": servings_needed,
+        "scaled_ingredients": scaled_ingredients,
+        "shopping_list": shopping_list,
+        "storage_tips": storage_tips,
+        "estimated_total_cost": round(sum(item['estimated_price'] for item in shopping_list), 2),
+    }
+    return scaled_data, unhandled
+
+
+def merge_scaled(local: Dict, fallback: Dict) -> Dict:
+    """
+    Replace local entries with the ones Claude scaled for the unhandled ingredients.
+
+    Args:
+        local: scaled_data from scale_locally
+        fallback: scaled_data Claude returned for the unhandled ingredients only
+    """
+    replaced = {item.get('name', '').lower() for key in ('scaled_ingredients', 'shopping_list')
+                for item in fallback.get(key, [])}
+
+    for key in ('scaled_ingredients', 'shopping_list'):
+        local[key] = [item for item in local.get(key, []) if item['name'].lower() not in replaced]
+        local[key].extend(fallback.get(key, []))
+
+    local.setdefault('storage_tips', {}).update(fallback.get('storage_tips') or {})
+    local['estimated_total_cost'] = round(
+        sum(item.get('estimated_price') or 0 for item in local['shopping_list']), 2
+    )
+    return local
@@ -0,0 +1,244 @@
+"""
+Recipe Output Schemas
+JSON schemas for the parse and scale responses, the Claude tool definitions
+built from them, and validators compiled from the schemas once at import.
+
+Claude is asked to answer by calling a tool whose input_schema is one of
+these, so the response arrives as structured tool input rather than text
+that has to be cleaned up and json.loads'ed. The validators catch what the
+schema constrains but the model can still get wrong (missing fields, string
+amounts, unknown categories) before the data reaches the pipeline.
+"""
+from typing import Any, Callable, Dict, List
+
+from ingredients import CATEGORIES
+
+Validator = Callable[[Any], List[str]]
+
+NUMBER_OR_NULL = {"type": ["number", "null"]}
+
+INGREDIENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "minLength": 1, "description": "Standard grocery term"},
+        "amount": {"type": ["number", "null"], "description": "Numeric quantity, null if unspecified"},
+        "unit": {"type": "string", "description": "lb, oz, cup, tbsp, tsp, whole, bunch, head, clove, can, ..."},
+        "category": {"type": "string", "enum": list(CATEGORIES)},
+        "notes": {"type": "string"},
+    },
+    "required": ["name", "amount", "unit", "category"],
+}
+
+RECIPE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "recipe_name": {"type": "string", "minLength": 1},
+        "original_servings": {"type": "number", "minimum": 1},
+        "meal_type": {"type": "string"},
+        "calories_per_serving": NUMBER_OR_NULL,
+        "prep_time_minutes": NUMBER_OR_NULL,
+        "cook_time_minutes": NUMBER_OR_NULL,
+        "ingredients": {"type": "array", "items": INGREDIENT_SCHEMA, "minItems": 1},
+    },
+    "required": ["recipe_name", "original_servings", "ingredients"],
+}
+
+SHOPPING_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "minLength": 1},
+        "amount": {"type": "number", "minimum": 0},
+        "unit": {"type": "string"},
+        "category": {"type": "string", "enum": list(CATEGORIES)},
+        "notes": {"type": "string"},
+        "estimated_price": {"type": "number", "minimum": 0},
+    },
+    "required": ["name", "amount", "unit", "estimated_price"],
+}
+
+SCALED_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "recipe_name": {"type": "string"},
+        "scaled_servings": {"type": "number", "minimum": 1},
+        "scaled_ingredients": {"type": "array", "items": INGREDIENT_SCHEMA},
+        "shopping_list": {"type": "array", "items": SHOPPING_ITEM_SCHEMA, "minItems": 1},
+        "storage_tips": {"type": "object", "additionalProperties": {"type": "string"}},
+        "estimated_total_cost": {"type": "number", "minimum": 0},
+    },
+    "required": ["recipe_name", "scaled_servings", "shopping_list", "estimated_total_cost"],
+}
+
+FUSED_SCHEMA = {
+    "type": "object",
+    "properties": {"recipe_data": RECIPE_SCHEMA, "scaled_data": SCALED_SCHEMA},
+    "required": ["recipe_data", "scaled_data"],
+}
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+def compile_validator(schema: Dict) -> Validator:
+    """
+    Turn a schema into a function returning a list of error strings (empty if valid).
+
+    Covers the subset of JSON Schema used here: type, properties, required,
+    additionalProperties (as a schema), items, enum, minimum, minLength and
+    minItems. The schema is walked once, up front, not on every call.
+    """
+    checks: List[Callable[[Any, str], List[str]]] = []
+
+    types = schema.get("type")
+    if types:
+        type_list = [types] if isinstance(types, str) else list(types)
+        type_fns = [_TYPE_CHECKS[t] for t in type_list]
+        expected = ' or '.join(type_list)
+
+        def check_type(value, path):
+            if any(fn(value) for fn in type_fns):
+                return []
+            return [f"{path}: expected {expected}, got {type(value).__name__}"]
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = set(schema["enum"])
+
+        def check_enum(value, path):
+            return [] if value in allowed else [f"{path}: {value!r} is not one of {sorted(allowed)}"]
+        checks.append(check_enum)
+
+    if "minimum" in schema:
+        minimum = schema["minimum"]
+
+        def check_minimum(value, path):
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value < minimum:
+                return [f"{path}: {value} is below {minimum}"]
+            return []
+        checks.append(check_minimum)
+
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+
+        def check_min_length(value, path):
+            return [f"{path}: shorter than {min_length}"] if isinstance(value, str) and len(value) < min_length else []
+        checks.append(check_min_length)
+
+    properties = {name: compile_validator(sub) for name, sub in schema.get("properties", {}).items()}
+    required = list(schema.get("required", []))
+    extra = schema.get("additionalProperties")
+    extra_validator = compile_validator(extra) if isinstance(extra, dict) else None
+    if properties or required or extra_validator:
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                return []
+            errors = [f"{path}: missing {name!r}" for name in required if name not in value]
+            for name, item in value.items():
+                validator = properties.get(name, extra_validator)
+                if validator is not None:
+                    errors.extend(validator(item, f"{path}.{name}"))
+            return errors
+        checks.append(check_object)
+
+    items = compile_validator(schema["items"]) if "items" in schema else None
+    min_items = schema.get("minItems")
+    if items or min_items:
+        def check_array(value, path):
+            if not isinstance(value, list):
+                return []
+            errors = [f"{path}: fewer than {min_items} items"] if min_items and len(value) < min_items else []
+            if items is not None:
+                for i, item in enumerate(value):
+                    errors.extend(items(item, f"{path}[{i}]"))
+            return errors
+        checks.append(check_array)
+
+    def validate(value, path: str = "$") -> List[str]:
+        errors: List[str] = []
+        for check in checks:
+            errors.extend(check(value, path))
+            if errors and check is checks[0] and types:
+                # Wrong type: the remaining checks would only add noise
+                break
+        return errors
+    return validate
+
+
+def make_tool(name: str, description: str, schema: Dict) -> Dict:
+    """A tool definition for messages.create"""
+    return {"name": name, "description": description, "input_schema": schema}
+
+
+PARSE_TOOL = make_tool(
+    "record_recipe",
+    "Record the recipe's name, servings and ingredient list extracted from the page text.",
+    RECIPE_SCHEMA,
+)
+SCALE_TOOL = make_tool(
+    "record_scaled_recipe",
+    "Record the recipe scaled to the requested servings, with a grocery shopping list.",
+    SCALED_SCHEMA,
+)
+FUSED_TOOL = make_tool(
+    "record_recipe_and_scaled",
+    "Record both the parsed recipe and the recipe scaled to the requested servings.",
+    FUSED_SCHEMA,
+)
+
+# Prompt type per tool, for per-type latency tracking
+PROMPT_TYPES: Dict[str, str] = {
+    PARSE_TOOL["name"]: "parse",
+    SCALE_TOOL["name"]: "scale",
+    FUSED_TOOL["name"]: "fused",
+}
+
+# Compiled once; looked up by tool name
+VALIDATORS: Dict[str, Validator] = {
+    tool["name"]: compile_validator(tool["input_schema"]) for tool in (PARSE_TOOL, SCALE_TOOL, FUSED_TOOL)
+}
+
+
+def validator_for(tool: Dict) -> Validator:
+    """Compiled validator for a tool, compiling and keeping it on first use"""
+    if tool["name"] not in VALIDATORS:
+        VALIDATORS[tool["name"]] = compile_validator(tool["input_schema"])
+    return VALIDATORS[tool["name"]]
+
+
+def parse_quality_errors(recipe: Dict) -> List[str]:
+    """
+    Problems with a parsed recipe that pass the schema but make it unusable:
+    no ingredients, blank names, mostly missing or negative amounts, unknown
+    categories. Used to decide whether a cheaper model's parse needs redoing.
+    """
+    ingredients = recipe.get("ingredients") or []
+    if not ingredients:
+        return ["no ingredients"]
+    errors = []
+    for i, ingredient in enumerate(ingredients):
+        if not str(ingredient.get("name") or "").strip():
+            errors.append(f"ingredients[{i}]: blank name")
+        amount = ingredient.get("amount")
+        if amount is not None and (not _TYPE_CHECKS["number"](amount) or amount < 0):
+            errors.append(f"ingredients[{i}]: amount {amount!r} is not a non-negative number")
+        if "category" in ingredient and ingredient["category"] not in CATEGORIES:
+            errors.append(f"ingredients[{i}]: unknown category {ingredient['category']!r}")
+    missing = sum(ingredient.get("amount") is None for ingredient in ingredients)
+    if missing * 2 > len(ingredients):
+        errors.append(f"{missing} of {len(ingredients)} ingredients have no amount")
+    return errors
+
+
+def prompt_type(params: Dict) -> str:
+    """Prompt type of a messages.create request: parse/scale/fused, another tool's name, or text"""
+    tools = params.get("tools")
+    if not tools:
+        return "text"
+    return PROMPT_TYPES.get(tools[0]["name"], tools[0]["name"])
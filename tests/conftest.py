@@ -0,0 +1,14 @@
+"""
+Shared setup for the test suite: keep runs off the network and out of the
+user's caches, call log and latency history.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('ANTHROPIC_API_KEY', 'stub')
+os.environ['RECIPE_CACHE_DISABLE'] = '1'
+os.environ['LLM_CACHE_DISABLE'] = '1'
+os.environ['CLAUDE_ACCOUNTING_DISABLE'] = '1'
+os.environ['CLAUDE_LATENCY_PATH'] = ''
@@ -0,0 +1,32 @@
+"""BatchFetcher error handling"""
+import asyncio
+
+from batch_fetcher import BatchFetcher
+
+
+class FlakyFetcher:
+    """Raises a different error for each bad URL"""
+
+    def fetch_html(self, url: str) -> str:
+        if url.endswith('/oserror'):
+            raise OSError(28, 'No space left on device')
+        if url.endswith('/valueerror'):
+            raise ValueError('bad page')
+        return f"<html>{url}</html>"
+
+
+def test_one_url_failing_does_not_abort_the_batch():
+    urls = [f"https://example.com/{name}" for name in ('a', 'oserror', 'b', 'valueerror', 'c')]
+    batch = BatchFetcher(FlakyFetcher(), max_concurrency=2)
+
+    async def run():
+        return [result async for result in batch.fetch_all(urls)]
+
+    try:
+        results = sorted(asyncio.run(run()), key=lambda r: r.index)
+    finally:
+        batch.close()
+    assert [r.ok for r in results] == [True, False, True, False, True]
+    assert 'No space left' in results[1].error
+    assert 'ValueError' in results[3].error
+    assert results[4].html == "<html>https://example.com/c</html>"
@@ -0,0 +1,24 @@
+"""Nearest-rank percentiles in claude_accounting"""
+import pytest
+
+from claude_accounting import percentile
+
+
+@pytest.mark.parametrize('values, pct, expected', [
+    (range(1, 101), 50, 50),
+    (range(1, 101), 95, 95),
+    (range(1, 101), 99, 99),
+    (range(1, 101), 100, 100),
+    (range(1, 11), 50, 5),
+    (range(1, 11), 90, 9),
+    (range(1, 21), 95, 19),
+    (range(1, 21), 0, 1),
+    ([3.0], 99, 3.0),
+    ([5, 1, 4, 2, 3], 50, 3),
+])
+def test_nearest_rank(values, pct, expected):
+    assert percentile(list(values), pct) == expected
+
+
+def test_no_values():
+    assert percentile([], 50) is None
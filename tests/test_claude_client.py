@@ -0,0 +1,163 @@
+"""claude_client's tool calls: streaming, schema correction and recovery from truncation"""
+import json
+from types import SimpleNamespace
+
+import anthropic
+import pytest
+
+from anthropic_stub import start_stub_server
+from claude_client import (
+    MAX_RETRY_TOKENS, StructuredOutputError, message_params, stream_tool, structured_output_stats, tool_exchange,
+    truncation_stats,
+)
+from json_stream import JSONArrayStream, salvage_json
+from recipe_schemas import PARSE_TOOL, SCALE_TOOL, validator_for
+
+RECIPE = {
+    "recipe_name": "Pancakes", "original_servings": 4, "ingredients": [
+        {"name": "flour", "amount": 2, "unit": "cup", "category": "pantry"},
+        {"name": "milk", "amount": 1.5, "unit": "cup", "category": "dairy"},
+        {"name": "eggs", "amount": 2, "unit": "whole", "category": "dairy"},
+        {"name": "butter", "amount": 3, "unit": "tbsp", "category": "dairy"},
+        {"name": "sugar", "amount": 2, "unit": "tbsp", "category": "pantry"},
+        {"name": "baking powder", "amount": 1, "unit": "tbsp", "category": "pantry"},
+    ],
+}
+SCALE_PROMPT = f"Scale this recipe to 8 servings.\nRecipe data:\n{json.dumps(RECIPE)}"
+PARSE_PROMPT = "Analyze this recipe.\nRecipe text:\nPancakes\nServes 4\n2 cups flour\n1 1/2 cups milk"
+INVALID_RECIPE = {"recipe_name": "Pancakes", "original_servings": "4", "ingredients": [
+    {"name": "flour", "amount": "2", "unit": "cup", "category": "grains"},
+]}
+
+
+def stub_client(**options):
+    server = start_stub_server(**options)
+    return server, anthropic.Anthropic(api_key='stub', base_url=f"http://127.0.0.1:{server.server_address[1]}")
+
+
+@pytest.fixture(scope='module')
+def client():
+    server, client = stub_client()
+    yield client
+    server.shutdown()
+
+
+def drain(generator):
+    """(everything generator yields, its return value)"""
+    yielded = []
+    while True:
+        try:
+            yielded.append(next(generator))
+        except StopIteration as done:
+            return yielded, done.value
+
+
+def test_stream_tool_yields_the_input_as_it_is_written(client):
+    chunks, data = drain(stream_tool(client, SCALE_PROMPT, 'model-a', SCALE_TOOL, use_cache=False))
+
+    assert len(chunks) > 1
+    assert json.loads(''.join(chunks)) == data
+    assert data['scaled_servings'] == 8
+    items = JSONArrayStream('shopping_list')
+    assert [item for chunk in chunks for item in items.feed(chunk)] == data['shopping_list']
+    assert items.done
+
+
+def run_exchange(exchange, responses):
+    """Answer an Exchange's requests with responses in turn: (its requests, its result)"""
+    sent = []
+    try:
+        sent.append(next(exchange))
+        for response in responses:
+            sent.append(exchange.send(response))
+    except StopIteration as done:
+        return sent, done.value
+    raise AssertionError(f"exchange made more than {len(responses)} requests")
+
+
+def tool_response(tool, data, stop_reason='tool_use'):
+    """A messages.create response calling tool with data"""
+    block = SimpleNamespace(type='tool_use', id='toolu_1', name=tool['name'], input=data)
+    return SimpleNamespace(content=[block], stop_reason=stop_reason,
+                           usage=SimpleNamespace(input_tokens=100, output_tokens=50))
+
+
+@pytest.mark.parametrize('data, errors', [
+    (RECIPE, []),
+    ({}, ["$: missing 'recipe_name'", "$: missing 'original_servings'", "$: missing 'ingredients'"]),
+    (INVALID_RECIPE, [
+        '$.original_servings: expected number, got str',
+        '$.ingredients[0].amount: expected number or null, got str',
+        "$.ingredients[0].category: 'grains' is not one of "
+        "['bakery', 'dairy', 'frozen', 'meat', 'pantry', 'produce', 'seafood', 'spices']",
+    ]),
+])
+def test_validator(data, errors):
+    assert validator_for(PARSE_TOOL)(data) == errors
+
+
+def test_invalid_input_is_sent_back_for_correction():
+    params = message_params(PARSE_PROMPT, 'model-a', tool=PARSE_TOOL)
+    retries = structured_output_stats.retries
+    exchange = tool_exchange(PARSE_PROMPT, PARSE_TOOL, params, tool_response(PARSE_TOOL, INVALID_RECIPE), 2)
+
+    sent, data = run_exchange(exchange, [tool_response(PARSE_TOOL, RECIPE)])
+    assert data == RECIPE
+    assert structured_output_stats.retries == retries + 1
+    user, assistant, result = sent[0]['messages']
+    assert user == {"role": "user", "content": PARSE_PROMPT}
+    assert assistant['content'][0]['input'] == INVALID_RECIPE
+    assert result['content'][0]['is_error']
+    assert 'original_servings: expected number' in result['content'][0]['content']
+    assert sent[0]['tool_choice'] == params['tool_choice']
+
+
+def test_still_invalid_after_retries_raises():
+    params = message_params(PARSE_PROMPT, 'model-a', tool=PARSE_TOOL)
+    exchange = tool_exchange(PARSE_PROMPT, PARSE_TOOL, params, tool_response(PARSE_TOOL, INVALID_RECIPE), 2)
+
+    with pytest.raises(StructuredOutputError) as raised:
+        run_exchange(exchange, [tool_response(PARSE_TOOL, INVALID_RECIPE)] * 2)
+    assert raised.value.errors == validator_for(PARSE_TOOL)(INVALID_RECIPE)
+
+
+def test_truncated_answer_requests_only_the_rest():
+    params = message_params(PARSE_PROMPT, 'model-a', tool=PARSE_TOOL)
+    # As parsed from the cut-off JSON: the last ingredient is unfinished
+    cut_off = {**RECIPE, "ingredients": RECIPE['ingredients'][:3]}
+    rest = {**RECIPE, "ingredients": RECIPE['ingredients'][2:]}
+    continuations = truncation_stats.continuations
+    exchange = tool_exchange(PARSE_PROMPT, PARSE_TOOL, params, tool_response(PARSE_TOOL, cut_off, 'max_tokens'), 2)
+
+    sent, data = run_exchange(exchange, [tool_response(PARSE_TOOL, rest)])
+    assert data == RECIPE
+    assert truncation_stats.continuations == continuations + 1
+    prompt = sent[0]['messages'][0]['content']
+    assert prompt.startswith(PARSE_PROMPT)
+    assert "after these items:\n- ingredients: flour, milk\n" in prompt
+
+
+def test_nothing_finished_is_retried_with_a_larger_limit():
+    params = message_params(PARSE_PROMPT, 'model-a', tool=PARSE_TOOL)
+    exchange = tool_exchange(PARSE_PROMPT, PARSE_TOOL, params, tool_response(PARSE_TOOL, {}, 'max_tokens'), 2)
+
+    sent, data = run_exchange(exchange, [tool_response(PARSE_TOOL, RECIPE)])
+    assert data == RECIPE
+    assert sent[0] == {**params, "max_tokens": min(2 * params['max_tokens'], MAX_RETRY_TOKENS)}
+
+
+def test_stream_tool_completes_a_truncated_answer(client):
+    _, whole = drain(stream_tool(client, SCALE_PROMPT, 'model-a', SCALE_TOOL, use_cache=False))
+    # The scale answer is ~400 output tokens; cut off at 250, the stub continues from the streamed items
+    server, truncating = stub_client(max_output_tokens=250)
+    salvaged = truncation_stats.salvaged_items
+    try:
+        chunks, data = drain(stream_tool(truncating, SCALE_PROMPT, 'model-a', SCALE_TOOL, use_cache=False))
+    finally:
+        server.shutdown()
+
+    assert data == whole
+    assert truncation_stats.salvaged_items > salvaged
+    assert server.stats.requests == 2
+    streamed, _ = salvage_json(''.join(chunks))
+    assert len(streamed['shopping_list']) < len(data['shopping_list'])
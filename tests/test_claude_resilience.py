@@ -0,0 +1,66 @@
+"""Hedge delays and hedge-loser accounting in claude_resilience"""
+import json
+import time
+
+import pytest
+
+from claude_resilience import ClaudeResilience, ResiliencePolicy
+
+FAST = 0.01
+SLOW = 0.4
+
+
+def slow_every(n: int):
+    """send() that takes SLOW on every nth request and FAST otherwise"""
+    sent = []
+
+    def send(timeout: float):
+        sent.append(timeout)
+        number = len(sent)
+        time.sleep(SLOW if number % n == 0 else FAST)
+        return number
+    return send, sent
+
+
+@pytest.mark.parametrize('every', [20, 10])
+def test_hedge_delay_stays_below_slow_tail(every):
+    resilience = ClaudeResilience(ResiliencePolicy(hedge=True, min_samples=20))
+    send, _ = slow_every(every)
+    for _ in range(20):
+        resilience.call('parse', send)
+
+    timings = []
+    for _ in range(60):
+        start = time.monotonic()
+        resilience.call('parse', send)
+        timings.append(time.monotonic() - start)
+
+    assert resilience.hedge_delay('parse') < SLOW / 2
+    assert max(timings) < SLOW
+    assert resilience.stats.of('parse').hedge_wins > 0
+
+
+def test_losing_response_is_discarded_not_dropped():
+    resilience = ClaudeResilience(ResiliencePolicy(hedge=True, min_samples=20))
+    for _ in range(20):
+        resilience.observe('parse', FAST)
+    discarded = []
+    send, sent = slow_every(1)  # every request slow: the primary wins and the hedge loses
+
+    result = resilience.call('parse', send, on_discard=discarded.append)
+    resilience._pool.shutdown(wait=True)
+
+    assert len(sent) == 2
+    assert (result, discarded) == (1, [2])
+    assert len(resilience.windows['parse']) == 22
+    assert len(resilience.answered['parse']) == 21
+
+
+def test_loads_single_window_files(tmp_path):
+    path = tmp_path / 'latency.json'
+    path.write_text(json.dumps({'parse': [FAST] * 20}))
+
+    resilience = ClaudeResilience(ResiliencePolicy(hedge=True), latency_path=str(path))
+    assert resilience.hedge_delay('parse') == FAST
+    resilience.save()
+    assert json.loads(path.read_text())['answered'] == {'parse': [FAST] * 20}
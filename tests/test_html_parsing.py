@@ -0,0 +1,90 @@
+"""lxml and html.parser give the pipeline the same text, JSON-LD and located recipe"""
+import os
+
+import pytest
+
+from benchmarks.corpus import load_corpus, synthetic_recipe_page
+from html_parsing import LXML_AVAILABLE, make_soup, page_text
+from recipe_jsonld import extract_structured_recipe
+from recipe_locator import locate_recipe
+
+pytestmark = pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml is not installed")
+
+STRIP_TAGS = ["script", "style", "nav", "footer", "header", "aside"]
+
+# Markup real recipe sites serve: entities, unclosed <li>/<p>, comments,
+# inline SVG, <br>, an @graph JSON-LD block and a second, unrelated one
+HANDWRITTEN = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Lemon Bars &amp; More</title>
+<script type="application/ld+json">{"@context": "https://schema.org", "@type": "WebSite", "name": "Site"}</script>
+<script type="application/ld+json">{"@context": "https://schema.org", "@graph": [
+  {"@type": "Organization", "name": "Site"},
+  {"@type": ["Recipe", "NewsArticle"], "name": "Lemon Bars", "recipeYield": ["16", "16 bars"],
+   "recipeIngredient": ["1 ½ cups flour", "½ cup powdered sugar", "3 lemons, zested"],
+   "recipeInstructions": [{"@type": "HowToStep", "text": "Bake at 350°F."}],
+   "prepTime": "PT20M", "cookTime": "PT45M", "recipeCategory": "Dessert"}
+]}</script>
+<style>.x{color:red}</style></head>
+<body>
+<header><nav><a href="/">Home</a><a href="/desserts">Desserts</a></nav></header>
+<!-- ad slot -->
+<aside class="sidebar"><p>Subscribe now!</aside>
+<main><article>
+<h1 class="recipe-title">Lemon Bars</h1>
+<p>Serves 16<br>Prep 20 min &middot; Cook 45 min
+<svg viewBox="0 0 10 10"><path d="M0 0h10v10z"/></svg>
+<div class="wprm-recipe-ingredients-container">
+<h3>Ingredients</h3>
+<ul class="ingredients">
+<li>1 &frac12; cups flour
+<li>&frac12; cup powdered sugar
+<li>3 lemons, zested &amp; juiced
+<li>4 eggs <em>(room temperature)</em>
+</ul></div>
+<div class="wprm-recipe-instructions-container">
+<h3>Instructions</h3>
+<ol class="instructions"><li>Heat the oven to 350&deg;F.<li>Press the crust into the pan.</li>
+<li>Whisk the filling<p>and pour it over.</ol></div>
+<table class="nutrition"><tr><td>Calories<td>180</table>
+</article></main>
+<footer><p>&copy; 2024 Site</footer>
+</body></html>
+"""
+
+
+def corpus():
+    pages = [('handwritten', HANDWRITTEN)]
+    pages += [(f"synthetic-{seed}-{'jsonld' if jsonld else 'plain'}",
+               synthetic_recipe_page(120, seed=seed, jsonld=jsonld))
+              for seed in range(3) for jsonld in (True, False)]
+    # Saved pages from real sites, e.g. RECIPE_CORPUS_DIR=pages/ python -m pytest tests
+    if os.getenv('RECIPE_CORPUS_DIR'):
+        pages += load_corpus(os.environ['RECIPE_CORPUS_DIR'])
+    return pages
+
+
+def extract(html: str, backend: str):
+    soup = make_soup(html, backend)
+    structured = extract_structured_recipe(soup)
+    text = page_text(soup, STRIP_TAGS)
+    located = locate_recipe(soup, text, max_tokens=1500, baseline_chars=6000)
+    return text, structured, located
+
+
+@pytest.mark.parametrize('name, html', corpus(), ids=[name for name, _ in corpus()])
+def test_backends_agree(name, html):
+    lxml_text, lxml_structured, lxml_located = extract(html, 'lxml')
+    text, structured, located = extract(html, 'html.parser')
+
+    assert lxml_text == text
+    assert lxml_structured == structured
+    assert lxml_located == located
+
+
+def test_handwritten_page_is_understood():
+    text, structured, located = extract(HANDWRITTEN, 'lxml')
+    assert structured['recipe_name'] == 'Lemon Bars'
+    assert located.found
+    assert 'powdered sugar' in located.text
+    assert 'Serves 16 Prep 20 min · Cook 45 min' in located.text
+    assert 'Subscribe now!' not in text
@@ -0,0 +1,31 @@
+"""parse_ingredient_line splits recipe lines into amount, unit, name and notes"""
+import pytest
+
+from ingredients import parse_ingredient_line
+
+
+@pytest.mark.parametrize('line, amount, unit, name, notes', [
+    ("2 tbsp peanut butter", 2.0, 'tbsp', 'peanut butter', ''),
+    ("1 1/2 cups all-purpose flour", 1.5, 'cup', 'all-purpose flour', ''),
+    ("½ cup sugar", 0.5, 'cup', 'sugar', ''),
+    ("3 cloves garlic, minced", 3.0, 'clove', 'garlic', 'minced'),
+    ("1 (14 oz) can diced tomatoes", 1.0, 'can', 'diced tomatoes', '14 oz'),
+    ("2-3 large eggs", 3.0, 'whole', 'eggs', 'large'),
+    ("1.5 lb chicken thighs", 1.5, 'lb', 'chicken thighs', ''),
+    ("250 g butter", 250.0, 'g', 'butter', ''),
+    ("1 pint vanilla ice cream", 1.0, 'pt', 'vanilla ice cream', ''),
+    ("salt to taste", None, 'whole', 'salt to taste', ''),
+])
+def test_parse_ingredient_line(line, amount, unit, name, notes):
+    parsed = parse_ingredient_line(line)
+    assert (parsed['amount'], parsed['unit'], parsed['name'], parsed['notes']) == (amount, unit, name, notes)
+
+
+@pytest.mark.parametrize('line, category', [
+    ("3 cloves garlic", 'produce'),
+    ("1.5 lb chicken thighs", 'meat'),
+    ("250 g butter", 'dairy'),
+    ("salt to taste", 'spices'),
+])
+def test_category(line, category):
+    assert parse_ingredient_line(line)['category'] == category
@@ -0,0 +1,102 @@
+"""JSONArrayStream yields whole items at any chunk size; salvage_json and merge_continuation rebuild cut-off answers"""
+import json
+import time
+
+import pytest
+
+from json_stream import JSONArrayStream, array_names, drop_partial_tail, merge_continuation, salvage_json
+
+ITEMS = [
+    {"name": f"item {i}", "note": 'a "quoted" [bracket] {brace} \\ slash', "amount": i, "tags": [i, [i]]}
+    for i in range(300)
+]
+DOCUMENT = "Here you go:\n```json\n" + json.dumps({
+    "recipe_name": "Test", "notes": ["x"], "shopping_list": ITEMS, "storage_tips": {"a": "b"},
+}, indent=2) + "\n```"
+
+
+def feed_all(text: str, size: int):
+    stream = JSONArrayStream('shopping_list')
+    items, buffered = [], 0
+    for start in range(0, len(text), size):
+        items += stream.feed(text[start:start + size])
+        buffered = max(buffered, len(stream._text))
+    return stream, items, buffered
+
+
+@pytest.mark.parametrize('size', [1, 3, 64, 4096, len(DOCUMENT)])
+def test_items_at_any_chunk_size(size):
+    stream, items, buffered = feed_all(DOCUMENT, size)
+    assert items == ITEMS
+    assert stream.done
+    if size < 64:
+        # Only the item being written is kept, not the whole response
+        assert buffered < 2 * max(len(json.dumps(item, indent=4)) for item in ITEMS)
+
+
+def test_key_split_across_chunks():
+    _, items, _ = feed_all('{"shopping_', 1)
+    assert items == []
+    stream = JSONArrayStream('shopping_list')
+    assert stream.feed('{"other": [1], "shopping_') == []
+    assert stream.feed('list": [{"name": "milk"}, {"na') == [{"name": "milk"}]
+    assert stream.feed('me": "eggs"}]}') == [{"name": "eggs"}]
+
+
+def test_feeding_small_chunks_is_linear():
+    big = json.dumps({"shopping_list": ITEMS * 20})
+
+    def seconds(text):
+        start = time.perf_counter()
+        feed_all(text, 8)
+        return time.perf_counter() - start
+
+    half = seconds(big[:len(big) // 2])
+    assert seconds(big) < half * 3
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('{"a": 1, "b": [1, 2]}', ({'a': 1, 'b': [1, 2]}, True)),
+    ('Sure:\n{"a": 1} and more', ({'a': 1}, True)),
+    ('{"a": 1, "b": [1, 2,],}', ({'a': 1, 'b': [1, 2]}, True)),
+    ('{"name": "P", "list": [{"name": "flour", "amount": 2}, {"name": "milk", "am',
+     ({'name': 'P', 'list': [{'name': 'flour', 'amount': 2}]}, False)),
+    ('{"a": [1, 2, {"b": "x', ({'a': [1, 2]}, False)),
+    ('{"a": 1, "b": "unfinish', ({'a': 1}, False)),
+    ('{"a": "unfinished', ({}, False)),
+])
+def test_salvage_json(text, expected):
+    assert salvage_json(text) == expected
+
+
+def test_salvage_needs_json():
+    with pytest.raises(ValueError):
+        salvage_json("no JSON here")
+
+
+def test_cut_off_document_keeps_whole_items():
+    for end in range(len(DOCUMENT) // 3, len(DOCUMENT) // 2, 97):
+        value, complete = salvage_json(DOCUMENT[:end])
+        assert not complete
+        items = value['shopping_list']
+        assert items == ITEMS[:len(items)]
+
+
+def test_drop_partial_tail():
+    assert drop_partial_tail({"x": 1, "list": [{"name": "a"}, {"name": "b"}]}) == {"x": 1, "list": [{"name": "a"}]}
+    assert drop_partial_tail({"list": [], "x": {"y": [1, 2]}}) == {"list": [], "x": {"y": [1]}}
+
+
+def test_array_names():
+    value = {"ingredients": [{"name": "a"}], "scaled": {"shopping_list": [{"name": "b"}, {"name": "c"}]}, "tips": [1]}
+    assert array_names(value) == {"ingredients": ["a"], "scaled.shopping_list": ["b", "c"]}
+
+
+def test_merge_continuation():
+    partial = {"recipe_name": "P", "shopping_list": [{"name": "a"}, {"name": "b"}]}
+    rest = {"recipe_name": "P", "shopping_list": [{"name": "b"}, {"name": "c"}], "storage_tips": {"c": "cool"}}
+    assert merge_continuation(partial, rest) == {
+        "recipe_name": "P",
+        "shopping_list": [{"name": "a"}, {"name": "b"}, {"name": "c"}],
+        "storage_tips": {"c": "cool"},
+    }
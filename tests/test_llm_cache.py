@@ -0,0 +1,74 @@
+"""LLMCache keys, hits and misses, expiry and eviction, and complete_tool's use of it"""
+import anthropic
+import pytest
+
+import claude_client
+from anthropic_stub import start_stub_server
+from claude_client import complete_tool, request_cache_key
+from llm_cache import LLMCache, cache_key
+from recipe_schemas import PARSE_TOOL, SCALE_TOOL
+
+PROMPT = "Analyze this recipe.\nRecipe text:\nPancakes\nServes 4\n2 cups flour\n1 cup milk\n2 eggs"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(str(tmp_path / 'cache.sqlite3'))
+
+
+def test_keys():
+    key = request_cache_key(PROMPT, 'model-a', 4096, 'prefix', PARSE_TOOL)
+    # Whitespace-only differences share an entry
+    assert request_cache_key(f"  {PROMPT.replace(' ', '   ')}\n\n", 'model-a', 4096, 'prefix', PARSE_TOOL) == key
+    # Anything that changes the response does not
+    assert request_cache_key(PROMPT, 'model-b', 4096, 'prefix', PARSE_TOOL) != key
+    assert request_cache_key(PROMPT, 'model-a', 2048, 'prefix', PARSE_TOOL) != key
+    assert request_cache_key(PROMPT, 'model-a', 4096, 'other prefix', PARSE_TOOL) != key
+    assert request_cache_key(PROMPT, 'model-a', 4096, 'prefix', SCALE_TOOL) != key
+    assert request_cache_key(PROMPT + " Please.", 'model-a', 4096, 'prefix', PARSE_TOOL) != key
+    assert request_cache_key(PROMPT, 'model-a') == cache_key('model-a', 4096, PROMPT)
+
+
+def test_hit_and_miss(cache):
+    assert cache.get('k') is None
+    cache.put('k', 'model-a', '{"a": 1}', input_tokens=100, output_tokens=20)
+    hit = cache.get('k')
+
+    assert (hit.text, hit.input_tokens, hit.output_tokens) == ('{"a": 1}', 100, 20)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+    assert stats['tokens_saved'] == 120
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = LLMCache(str(tmp_path / 'cache.sqlite3'), ttl=-1)
+    cache.put('k', 'model-a', 'text')
+    assert cache.get('k') is None
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = LLMCache(str(tmp_path / 'cache.sqlite3'), max_bytes=25)
+    cache.put('old', 'model-a', 'x' * 10)
+    cache.put('used', 'model-a', 'y' * 10)
+    cache.get('old')
+    cache.put('new', 'model-a', 'z' * 10)
+
+    assert cache.get('used') is None
+    assert cache.get('old') is not None and cache.get('new') is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_complete_tool_answers_repeats_from_cache(cache, monkeypatch):
+    monkeypatch.setattr(claude_client, 'get_default_cache', lambda: cache)
+    stub = start_stub_server()
+    client = anthropic.Anthropic(api_key='stub', base_url=f"http://127.0.0.1:{stub.server_address[1]}")
+    try:
+        first = complete_tool(client, PROMPT, 'model-a', PARSE_TOOL)
+        second = complete_tool(client, PROMPT, 'model-a', PARSE_TOOL)
+        complete_tool(client, PROMPT, 'model-b', PARSE_TOOL)
+    finally:
+        stub.shutdown()
+
+    assert second == first
+    assert stub.stats.requests == 2
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 2)
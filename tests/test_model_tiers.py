@@ -0,0 +1,106 @@
+"""ModelRouter tries the fast model first and escalates to the strong one when its answer is rejected"""
+import asyncio
+
+import anthropic
+import pytest
+
+import model_tiers
+from anthropic_stub import start_stub_server, stub_message
+from claude_client import StructuredOutputError, message_params
+from model_tiers import ModelRouter
+from recipe_schemas import PARSE_TOOL, parse_quality_errors
+
+FAST, STRONG = 'claude-haiku-test', 'claude-sonnet-test'
+PROMPT = "Analyze this recipe.\nRecipe text:\nPancakes\nServes 4\n2 cups flour\n1 1/2 cups milk\n2 eggs"
+GOOD = {"recipe_name": "Pancakes", "original_servings": 4, "ingredients": [
+    {"name": "flour", "amount": 2, "unit": "cup", "category": "pantry"},
+    {"name": "milk", "amount": 1.5, "unit": "cup", "category": "dairy"},
+]}
+# Passes the schema, fails the quality check
+NO_AMOUNTS = {**GOOD, "ingredients": [{**i, "amount": None} for i in GOOD['ingredients']]}
+INVALID = StructuredOutputError(PARSE_TOOL['name'], ["$.original_servings: expected number, got str"])
+
+
+def fake_complete_tool(answers, calls):
+    """complete_tool answering each model from answers (a dict, or an exception to raise)"""
+    def complete_tool(client, prompt, model, tool, **options):
+        calls.append(model)
+        if isinstance(answers[model], Exception):
+            raise answers[model]
+        return answers[model]
+    return complete_tool
+
+
+@pytest.mark.parametrize('fast_answer, calls, fast_stats', [
+    (GOOD, [FAST], {'accepted': 1, 'escalated': 0}),
+    (NO_AMOUNTS, [FAST, STRONG], {'accepted': 0, 'escalated': 1}),
+    (INVALID, [FAST, STRONG], {'accepted': 0, 'escalated': 1}),
+])
+def test_escalation(monkeypatch, fast_answer, calls, fast_stats):
+    made = []
+    monkeypatch.setattr(model_tiers, 'complete_tool', fake_complete_tool({FAST: fast_answer, STRONG: GOOD}, made))
+    router = ModelRouter(FAST, STRONG)
+
+    assert router.complete_tool(None, PROMPT, PARSE_TOOL, check=parse_quality_errors) == GOOD
+    assert made == calls
+    summary = router.summary()
+    assert {k: summary[FAST][k] for k in fast_stats} == fast_stats
+    assert (STRONG in summary) == (len(calls) == 2)
+
+
+def test_strong_answer_is_used_as_is(monkeypatch):
+    made = []
+    monkeypatch.setattr(model_tiers, 'complete_tool', fake_complete_tool({FAST: NO_AMOUNTS, STRONG: NO_AMOUNTS}, made))
+    assert ModelRouter(FAST, STRONG).complete_tool(None, PROMPT, PARSE_TOOL, check=parse_quality_errors) == NO_AMOUNTS
+
+
+def test_strong_failure_raises(monkeypatch):
+    made = []
+    monkeypatch.setattr(model_tiers, 'complete_tool', fake_complete_tool({FAST: INVALID, STRONG: INVALID}, made))
+    router = ModelRouter(FAST, STRONG)
+
+    with pytest.raises(StructuredOutputError):
+        router.complete_tool(None, PROMPT, PARSE_TOOL, check=parse_quality_errors)
+    assert (router.stats[FAST].escalated, router.stats[STRONG].failed) == (1, 1)
+
+
+@pytest.mark.parametrize('check, tiering, models', [
+    (parse_quality_errors, True, [FAST, STRONG]),
+    (None, True, [STRONG]),
+    (parse_quality_errors, False, [STRONG]),
+])
+def test_models(check, tiering, models):
+    assert ModelRouter(FAST, STRONG, tiering).models(check) == models
+
+
+def test_async_escalation(monkeypatch):
+    made = []
+    complete_tool = fake_complete_tool({FAST: INVALID, STRONG: GOOD}, made)
+
+    async def acomplete_tool(client, prompt, model, tool, limiter=None, **options):
+        return complete_tool(client, prompt, model, tool, **options)
+
+    monkeypatch.setattr(model_tiers, 'acomplete_tool', acomplete_tool)
+    router = ModelRouter(FAST, STRONG)
+    assert asyncio.run(router.acomplete_tool(None, PROMPT, PARSE_TOOL, check=parse_quality_errors)) == GOOD
+    assert made == [FAST, STRONG]
+
+
+def test_invalid_fast_answer_from_the_api_escalates(tmp_path):
+    # The fast model's recorded answer fails the schema; everything else is synthesized by the stub
+    server = start_stub_server(replay=str(tmp_path / 'calls.jsonl'))
+    params = message_params(PROMPT, FAST, tool=PARSE_TOOL)
+    bad = stub_message(params)
+    bad['content'][0]['input'] = {**GOOD, "original_servings": "4"}
+    server.replay.put(params, bad)
+    client = anthropic.Anthropic(api_key='stub', base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    router = ModelRouter(FAST, STRONG)
+    try:
+        data = router.complete_tool(client, PROMPT, PARSE_TOOL, check=parse_quality_errors, use_cache=False,
+                                    max_retries=0)
+    finally:
+        server.shutdown()
+
+    assert data['original_servings'] == 4
+    assert (router.stats[FAST].escalated, router.stats[STRONG].accepted) == (1, 1)
+    assert server.stats.replayed == 1
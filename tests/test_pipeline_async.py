@@ -0,0 +1,48 @@
+"""process_recipes (the async pipeline) against the local Anthropic stand-in"""
+import asyncio
+
+import pytest
+
+from anthropic_stub import start_stub_server
+from benchmarks.corpus import synthetic_recipe_page
+from benchmarks.local_server import start_page_server
+from claude_accounting import get_default_log
+from main import process_recipes
+from recipe_jsonld import PARSE_PATH_JSONLD, PARSE_PATH_LLM
+
+
+@pytest.fixture(scope='module')
+def stub():
+    server = start_stub_server()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def page_url(jsonld: bool):
+    server = start_page_server(synthetic_recipe_page(40, jsonld=jsonld).encode())
+    return server, f"http://127.0.0.1:{server.server_address[1]}/recipe/{'jsonld' if jsonld else 'plain'}"
+
+
+@pytest.mark.parametrize('jsonld, options, parse_path', [
+    (True, {}, PARSE_PATH_JSONLD),
+    (True, {'fused': True}, PARSE_PATH_JSONLD),
+    (False, {}, PARSE_PATH_LLM),
+    (False, {'fused': True}, PARSE_PATH_LLM),
+    (False, {'scaling': 'llm'}, PARSE_PATH_LLM),
+])
+def test_process_recipes(stub, jsonld, options, parse_path):
+    server, url = page_url(jsonld)
+    log = get_default_log()
+    before = len(log.records)
+    try:
+        [result] = asyncio.run(process_recipes([url], 6, use_cache=False, base_url=stub, **options))
+    finally:
+        server.shutdown()
+
+    assert result['parse_path'] == parse_path
+    assert result['recipe_data']['ingredients']
+    assert result['scaled_data']['shopping_list']
+    assert result['scaled_data']['scaled_servings'] == 6
+    calls = log.records[before:]
+    assert len(calls) == (0 if jsonld else 1) + (options.get('scaling') == 'llm')
+    assert all(call.recipe == url for call in calls)
@@ -0,0 +1,89 @@
+"""Token-bucket refill timing and the async RateLimiter's pacing and 429 handling"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import anthropic
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+
+    def advance(seconds: float):
+        now[0] += seconds
+    return advance
+
+
+def test_bucket_refills_at_its_rate(clock):
+    bucket = TokenBucket(60, burst_seconds=10)  # 1 per second, 10 banked
+    assert bucket.wait_time(10) == 0
+    bucket.take(10)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock(0.25)
+    assert bucket.wait_time(1) == pytest.approx(0.75)
+    clock(0.75)
+    assert bucket.wait_time(1) == 0
+    assert bucket.wait_time(3) == pytest.approx(2.0)
+
+
+def test_bucket_banks_at_most_its_capacity(clock):
+    bucket = TokenBucket(60, burst_seconds=10)
+    clock(600)
+    bucket.take(10)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+
+
+def test_oversized_request_leaves_debt(clock):
+    bucket = TokenBucket(60, burst_seconds=10)
+    # More than the bucket holds only needs a full bucket, then later requests wait out the debt
+    assert bucket.wait_time(30) == 0
+    bucket.take(30)
+    assert bucket.wait_time(1) == pytest.approx(21.0)
+
+
+def test_adjust_refunds_unused_reservation(clock):
+    bucket = TokenBucket(60, burst_seconds=10)
+    bucket.take(8)
+    bucket.adjust(-5)
+    assert bucket.level == pytest.approx(7)
+    bucket.adjust(-100)
+    assert bucket.level == pytest.approx(10)
+
+
+def test_limiter_paces_requests():
+    # 10 requests per second with room for one at a time
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=1e9, burst_seconds=0.1)
+
+    async def send():
+        return time.monotonic()
+
+    async def run():
+        return await asyncio.gather(*(limiter.call(send, 1) for _ in range(5)))
+
+    sent = asyncio.run(run())
+    assert sent[-1] - sent[0] >= 0.35
+    assert limiter.stats.requests == 5
+    assert limiter.stats.throttled >= 4
+
+
+def test_rate_limited_request_waits_retry_after_and_retries():
+    limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=1e9)
+    attempts = []
+
+    async def send():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            response = SimpleNamespace(status_code=429, headers={'retry-after-ms': '200'}, request=None)
+            raise anthropic.RateLimitError("rate limited", response=response, body=None)
+        return 'ok'
+
+    assert asyncio.run(limiter.call(send, 100)) == 'ok'
+    assert attempts[1] - attempts[0] >= 0.19
+    assert (limiter.stats.rate_limited, limiter.stats.requests) == (1, 2)
+    assert limiter.stats.retry_after_seconds == pytest.approx(0.2)
@@ -0,0 +1,79 @@
+"""BatchRunner submits, resumes and caches Message Batches; BatchState survives restarts"""
+import anthropic
+import pytest
+
+from anthropic_stub import start_stub_server
+from llm_cache import LLMCache
+from recipe_batches import BatchRequest, BatchRunner, BatchState, job_fingerprint
+from recipe_schemas import PARSE_TOOL
+
+PROMPTS = {
+    'parse-0': "Analyze this recipe.\nRecipe text:\nPancakes\nServes 4\n2 cups flour\n1 cup milk",
+    'parse-1': "Analyze this recipe.\nRecipe text:\nOmelette\nServes 2\n3 eggs\n1 tbsp butter",
+}
+
+
+@pytest.fixture(scope='module')
+def client():
+    server = start_stub_server(batch_delay=0)
+    yield anthropic.Anthropic(api_key='stub', base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    server.shutdown()
+
+
+def parse_requests():
+    return [BatchRequest(custom_id, prompt, 'model-a', tool=PARSE_TOOL) for custom_id, prompt in PROMPTS.items()]
+
+
+def no_submissions(runner, monkeypatch):
+    def create(**_):
+        raise AssertionError("batch submitted")
+    monkeypatch.setattr(runner.client.messages.batches, 'create', create)
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / 'state.json')
+    fingerprint = job_fingerprint(['https://a', 'https://b'], 6, False)
+    state = BatchState.load(path, fingerprint)
+    state.batches['parse'] = 'msgbatch_1'
+    state.save()
+
+    assert BatchState.load(path, fingerprint).batches == {'parse': 'msgbatch_1'}
+    assert BatchState.load(path, job_fingerprint(['https://a'], 6, False)).batches == {}
+    state.clear()
+    assert BatchState.load(path, fingerprint).batches == {}
+
+
+def test_fingerprint_follows_inputs():
+    assert job_fingerprint(['https://a'], 6) == job_fingerprint(['https://a'], 6)
+    assert job_fingerprint(['https://a'], 6) != job_fingerprint(['https://a'], 7)
+
+
+def test_run_submits_one_batch_and_resumes_it(client, tmp_path, monkeypatch):
+    state = BatchState.load(str(tmp_path / 'state.json'), 'job')
+    outcomes = BatchRunner(client, state, use_cache=False, poll_initial=0).run('parse', parse_requests())
+
+    assert sorted(outcomes) == sorted(PROMPTS)
+    assert all(outcome.ok and not outcome.cached for outcome in outcomes.values())
+    assert outcomes['parse-0'].data['recipe_name'] == 'Pancakes'
+    assert outcomes['parse-1'].data['original_servings'] == 2
+
+    # A rerun with the saved state collects the same batch instead of submitting another
+    resumed = BatchRunner(client, BatchState.load(state.path, 'job'), use_cache=False, poll_initial=0)
+    no_submissions(resumed, monkeypatch)
+    again = resumed.run('parse', parse_requests())
+    assert {k: o.data for k, o in again.items()} == {k: o.data for k, o in outcomes.items()}
+
+
+def test_cached_requests_are_not_submitted(client, tmp_path, monkeypatch):
+    cache = LLMCache(str(tmp_path / 'cache.sqlite3'))
+    first = BatchRunner(client, BatchState(str(tmp_path / 'a.json')), poll_initial=0)
+    first.cache = cache
+    outcomes = first.run('parse', parse_requests())
+
+    second = BatchRunner(client, BatchState(str(tmp_path / 'b.json')), poll_initial=0)
+    second.cache = cache
+    no_submissions(second, monkeypatch)
+    cached = second.run('parse', parse_requests())
+
+    assert all(outcome.cached for outcome in cached.values())
+    assert {k: o.data for k, o in cached.items()} == {k: o.data for k, o in outcomes.items()}
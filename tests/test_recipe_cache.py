@@ -0,0 +1,47 @@
+"""RecipeCache blob bookkeeping"""
+import os
+import time
+
+from recipe_cache import ORPHAN_GRACE_SECONDS, RecipeCache
+
+
+def page(version: int) -> bytes:
+    return os.urandom(600) + f"<p>version {version}</p>".encode()
+
+
+def blobs(cache: RecipeCache):
+    return [name for name in os.listdir(cache._blobs_dir) if name.endswith('.html.gz')]
+
+
+def test_restore_replaces_old_blob(tmp_path):
+    cache = RecipeCache(str(tmp_path), max_bytes=3000)
+    for version in range(6):
+        cache.store('https://example.com/recipe', page(version))
+    assert len(cache.entries()) == 1
+    assert len(blobs(cache)) == 1
+    assert cache.lookup('https://example.com/recipe') is not None
+
+
+def test_shared_blob_kept_while_referenced(tmp_path):
+    cache = RecipeCache(str(tmp_path))
+    body = page(0)
+    cache.store('https://example.com/a', body)
+    cache.store('https://example.com/b', body)
+    cache.store('https://example.com/a', page(1))
+    assert cache.lookup('https://example.com/b') is not None
+    assert len(blobs(cache)) == 2
+
+
+def test_evict_drops_orphans_before_entries(tmp_path):
+    cache = RecipeCache(str(tmp_path), max_bytes=3000)
+    live = cache.store('https://example.com/live', page(0))
+    orphan = cache._blob_path('0' * 64)
+    with open(orphan, 'wb') as f:
+        f.write(os.urandom(2800))
+    old = time.time() - ORPHAN_GRACE_SECONDS - 1
+    os.utime(orphan, (old, old))
+
+    cache.evict()
+    assert not os.path.exists(orphan)
+    assert cache.lookup(live.url) is not None
+    assert cache.stats.evictions == 0
@@ -0,0 +1,112 @@
+"""RecipeFetcher streaming: deadline, partial pages in the cache, RecipeRegionWatcher"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.corpus import synthetic_recipe_page
+from recipe_cache import RecipeCache
+from recipe_fetcher import PageDeadlineExceeded, RecipeFetcher, RecipeRegionWatcher
+
+
+def serve(body: bytes, drip: float = 0.0, drip_from: int = 0):
+    """A server sending body with an ETag, one byte every drip seconds after drip_from bytes"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.send_header('ETag', '"v1"')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+            self.wfile.write(body[:drip_from] if drip else body)
+            self.wfile.flush()
+            for i in range(drip_from, len(body) if drip else drip_from):
+                self.wfile.write(body[i:i + 1])
+                self.wfile.flush()
+                time.sleep(drip)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.handle_error = lambda *args: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/recipe"
+
+
+def test_deadline_bounds_a_dripping_server():
+    page = synthetic_recipe_page(100).encode()
+    server, url = serve(page, drip=0.05, drip_from=4096)
+    try:
+        with RecipeFetcher(deadline=1.0) as fetcher:
+            started = time.monotonic()
+            with pytest.raises(PageDeadlineExceeded):
+                fetcher.stream_html(url)
+            assert time.monotonic() - started < 1.5
+    finally:
+        server.shutdown()
+
+
+def test_partial_page_cached_without_validators(tmp_path):
+    page = synthetic_recipe_page(600).encode()
+    server, url = serve(page)
+    try:
+        with RecipeFetcher(cache=RecipeCache(str(tmp_path), max_age=0)) as fetcher:
+            html = fetcher.fetch_html(url)
+            assert len(html) < len(page)
+            entry = fetcher.cache.lookup(url)
+            assert entry.etag is None and entry.conditional_headers() == {}
+            # Stale, so fetched again in full rather than revalidated
+            fetcher.fetch_html(url)
+            assert fetcher.cache.stats.revalidated == 0
+    finally:
+        server.shutdown()
+
+
+def test_complete_page_cached_with_validators(tmp_path):
+    page = synthetic_recipe_page(20).encode()
+    server, url = serve(page)
+    try:
+        with RecipeFetcher(cache=RecipeCache(str(tmp_path), max_age=0)) as fetcher:
+            assert fetcher.fetch_html(url) == page.decode()
+            assert fetcher.cache.lookup(url).etag == '"v1"'
+            assert fetcher.fetch_html(url) == page.decode()
+            assert fetcher.cache.stats.revalidated == 1
+    finally:
+        server.shutdown()
+
+
+def feed_in_chunks(text: str, size: int) -> RecipeRegionWatcher:
+    watcher = RecipeRegionWatcher()
+    for i in range(0, len(text), size):
+        watcher.feed(text[i:i + size])
+    return watcher
+
+
+@pytest.mark.parametrize('size', [1, 7, 255, 4096, 10 ** 7])
+def test_watcher_finds_markers_at_any_chunk_size(size):
+    page = synthetic_recipe_page(120)
+    watcher = feed_in_chunks(page, size)
+    assert watcher.text == page
+    assert watcher.jsonld_seen
+    assert watcher.ingredients_at == page.index("class='ingredients'")
+    assert watcher.instructions_at == page.index("class='instructions'")
+    assert watcher.done
+
+
+def test_watcher_ignores_recipe_mentions_outside_type():
+    page = ('<script type="application/ld+json">{"@type": "BreadcrumbList", "name": "Recipes"}</script>'
+            '<ul class="ingredients"><li>1 cup flour</li></ul><ol class="instructions"></ol>')
+    watcher = feed_in_chunks(page, 5)
+    assert not watcher.jsonld_seen
+    watcher = feed_in_chunks(page.replace('"BreadcrumbList"', '["Recipe", "NewsArticle"]'), 5)
+    assert watcher.jsonld_seen
@@ -0,0 +1,147 @@
+"""The sync, async and streaming drivers of recipe_pipeline make the same Claude calls"""
+import asyncio
+
+import pytest
+
+import recipe_cli
+import recipe_pipeline
+from anthropic_stub import start_stub_server
+from benchmarks.corpus import synthetic_recipe_page
+from benchmarks.local_server import start_page_server
+from claude_accounting import get_default_log
+from claude_client import truncation_stats
+from main import RecipeAssistant
+from recipe_jsonld import PARSE_PATH_JSONLD, PARSE_PATH_LLM
+
+
+@pytest.fixture(scope='module')
+def stub():
+    server = start_stub_server()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def run_main(url, stub, options, mode):
+    assistant = RecipeAssistant(6, use_cache=False, base_url=stub, **options)
+    if mode == 'sync':
+        return assistant.process_recipe(url)
+    if mode == 'async':
+        return asyncio.run(assistant.process_recipe_async(url))
+    items = list(assistant.process_recipe_streaming(url))
+    assert items == assistant.get_shopping_list()
+    return {"parse_path": assistant.parse_path, "recipe_data": assistant.recipe_data,
+            "scaled_data": assistant.scaled_data}
+
+
+def run_cli(url, stub, options, mode):
+    if mode == 'sync':
+        result = recipe_cli.process_recipe(url, 6, use_cache=False, base_url=stub, **options)
+    else:
+        result = asyncio.run(recipe_cli.process_recipe_async(url, 6, use_cache=False, base_url=stub, **options))
+    assert result['success'], result.get('error')
+    return {"parse_path": result['parse_path'], "scaled_data": result}
+
+
+@pytest.mark.parametrize('jsonld, options, prompt_types', [
+    (True, {}, []),
+    (True, {'scaling': 'llm'}, ['scale']),
+    (False, {}, ['parse']),
+    (False, {'fused': True}, ['fused']),
+    (False, {'scaling': 'llm'}, ['parse', 'scale']),
+])
+@pytest.mark.parametrize('run, mode', [
+    (run_main, 'sync'), (run_main, 'async'), (run_main, 'streaming'),
+    (run_cli, 'sync'), (run_cli, 'async'),
+])
+def test_same_calls(stub, jsonld, options, prompt_types, run, mode):
+    server = start_page_server(synthetic_recipe_page(40, jsonld=jsonld).encode())
+    url = f"http://127.0.0.1:{server.server_address[1]}/recipe"
+    log = get_default_log()
+    before = len(log.records)
+    try:
+        result = run(url, stub, options, mode)
+    finally:
+        server.shutdown()
+
+    assert result['parse_path'] == (PARSE_PATH_JSONLD if jsonld else PARSE_PATH_LLM)
+    assert result['scaled_data']['shopping_list']
+    assert [call.prompt_type for call in log.records[before:]] == prompt_types
+
+
+@pytest.mark.parametrize('options, llm_calls, prompt_types', [
+    ({}, [0, 1], ['parse']),
+    ({'fused': True}, [0, 1], ['fused']),
+    ({'scaling': 'llm'}, [1, 2], ['parse', 'scale', 'scale']),
+])
+def test_run_batch(tmp_path, options, llm_calls, prompt_types):
+    stub = start_stub_server(batch_delay=0)
+    servers = [start_page_server(synthetic_recipe_page(40, jsonld=jsonld).encode()) for jsonld in (True, False)]
+    urls = [f"http://127.0.0.1:{server.server_address[1]}/recipe" for server in servers]
+    log = get_default_log()
+    before = len(log.records)
+    try:
+        results = list(recipe_cli.run_batch(urls, 6, str(tmp_path / 'state.json'), use_cache=False,
+                                            base_url=f"http://127.0.0.1:{stub.server_address[1]}", **options))
+    finally:
+        stub.shutdown()
+        for server in servers:
+            server.shutdown()
+
+    assert all(result['success'] for result in results), results
+    assert [result['parse_path'] for result in results] == [PARSE_PATH_JSONLD, PARSE_PATH_LLM]
+    assert [result['llm_calls'] for result in results] == llm_calls
+    assert all(result['shopping_list'] for result in results)
+    assert sorted(call.prompt_type for call in log.records[before:]) == prompt_types
+
+
+def test_streaming_yields_items_from_truncation_continuations():
+    # The scale answer for this page is ~700 output tokens: cut off, then completed by a continuation
+    stub = start_stub_server(max_output_tokens=400)
+    server = start_page_server(synthetic_recipe_page(40, jsonld=False).encode())
+    url = f"http://127.0.0.1:{server.server_address[1]}/recipe"
+    continuations = truncation_stats.continuations
+    try:
+        assistant = RecipeAssistant(6, use_cache=False, base_url=f"http://127.0.0.1:{stub.server_address[1]}",
+                                    scaling='llm')
+        items = list(assistant.process_recipe_streaming(url))
+    finally:
+        stub.shutdown()
+        server.shutdown()
+
+    assert truncation_stats.continuations > continuations
+    assert items == assistant.get_shopping_list()
+
+
+def test_run_batch_isolates_failing_pages(tmp_path, monkeypatch):
+    parse_page, scale_locally = recipe_cli.parse_page, recipe_pipeline.scale_locally
+
+    def broken_parse(html):
+        if 'broken page' in html:
+            raise ValueError("unreadable markup")
+        return parse_page(html)
+
+    def broken_scale(recipe_data, servings):
+        if recipe_data['recipe_name'].endswith(' 1'):
+            raise ValueError("cannot scale")
+        return scale_locally(recipe_data, servings)
+
+    monkeypatch.setattr(recipe_cli, 'parse_page', broken_parse)
+    monkeypatch.setattr(recipe_pipeline, 'scale_locally', broken_scale)
+    stub = start_stub_server(batch_delay=0)
+    pages = [synthetic_recipe_page(40, seed=0, jsonld=True), synthetic_recipe_page(40, seed=1, jsonld=True),
+             synthetic_recipe_page(40, seed=2, jsonld=False), synthetic_recipe_page(40) + '<!-- broken page -->']
+    servers = [start_page_server(page.encode()) for page in pages]
+    urls = [f"http://127.0.0.1:{server.server_address[1]}/recipe" for server in servers]
+    state_path = tmp_path / 'state.json'
+    try:
+        results = list(recipe_cli.run_batch(urls, 6, str(state_path), use_cache=False,
+                                            base_url=f"http://127.0.0.1:{stub.server_address[1]}"))
+    finally:
+        stub.shutdown()
+        for server in servers:
+            server.shutdown()
+
+    assert [result['success'] for result in results] == [True, False, True, False]
+    assert results[1] == {"success": False, "url": urls[1], "error": "cannot scale"}
+    assert results[3]['error'] == "Failed to parse page: unreadable markup"
+    assert not state_path.exists()
@@ -0,0 +1,114 @@
+"""Unit conversion, rounding and package selection in recipe_scaler"""
+import pytest
+
+from ingredients import VOLUME_TSP, WEIGHT_OZ
+from recipe_scaler import (
+    SPOON_FRACTIONS, find_package_rule, kitchen_amount, round_to_fraction, scale_locally, shopping_entry,
+    to_base, unit_dimension,
+)
+
+
+@pytest.mark.parametrize('unit, expected', [
+    ('cups', ('cup', 'volume')),
+    ('tablespoons', ('tbsp', 'volume')),
+    ('pound', ('lb', 'weight')),
+    ('grams', ('g', 'weight')),
+    ('clove', ('clove', 'count')),
+    (None, ('whole', 'count')),
+    ('glugs', ('glugs', None)),
+])
+def test_unit_dimension(unit, expected):
+    assert unit_dimension(unit) == expected
+
+
+@pytest.mark.parametrize('amount, unit, expected', [
+    (2, 'tbsp', 6),
+    (1, 'cup', 48),
+    (1, 'lb', 16),
+    (3, 'clove', 3),
+])
+def test_to_base(amount, unit, expected):
+    assert to_base(amount, unit) == expected
+
+
+@pytest.mark.parametrize('value, fractions, expected', [
+    (1.3, None, 1.333),
+    (1.6, None, 1.667),
+    (0.1, None, 0),
+    (2.9, None, 3),
+    (1.3, SPOON_FRACTIONS, 1.25),
+    (0.4, SPOON_FRACTIONS, 0.5),
+])
+def test_round_to_fraction(value, fractions, expected):
+    assert (round_to_fraction(value, fractions) if fractions else round_to_fraction(value)) == expected
+
+
+@pytest.mark.parametrize('base, dimension, unit, expected', [
+    (1, 'volume', 'tsp', (1, 'tsp')),
+    (6, 'volume', 'tsp', (2, 'tbsp')),
+    (36, 'volume', 'cup', (0.75, 'cup')),
+    (800, 'volume', 'cup', (1, 'gallon')),
+    (1000 * VOLUME_TSP['ml'], 'volume', 'ml', (1.0, 'l')),
+    (2.3, 'weight', 'oz', (2.5, 'oz')),
+    (20, 'weight', 'oz', (1.25, 'lb')),
+    (500 * WEIGHT_OZ['g'], 'weight', 'g', (500.0, 'g')),
+    (1.3, 'count', 'clove', (1.5, 'clove')),
+    (2.6, 'count', 'whole', (3.0, 'whole')),
+])
+def test_kitchen_amount(base, dimension, unit, expected):
+    assert kitchen_amount(base, dimension, unit) == expected
+
+
+@pytest.mark.parametrize('name, base, dimension, unit, category, expected', [
+    ('butter', 6, 'volume', 'tbsp', 'dairy', (1, 'stick', 1.50)),
+    ('unsalted butter', 48, 'volume', 'cup', 'dairy', (1, 'lb', 5.00)),
+    ('peanut butter', 6, 'volume', 'tbsp', 'pantry', (1, 'cup', 1.00)),
+    ('heavy cream', 48, 'volume', 'cup', 'dairy', (1, 'cup', 2.50)),
+    ('sour cream', 24, 'volume', 'cup', 'dairy', (8, 'oz', 2.00)),
+    ('cream cheese', 8, 'weight', 'oz', 'dairy', (8, 'oz', 2.50)),
+    ('vanilla ice cream', 96, 'volume', 'pt', 'frozen', (1, 'pint', 2.00)),
+    ('garlic', 3, 'count', 'clove', 'produce', (1, 'head', 0.60)),
+    ('eggs', 14, 'count', 'whole', 'dairy', (18, 'count', 5.00)),
+    ('milk', 100, 'volume', 'cup', 'dairy', (1, 'quart', 3.00)),
+    ('salt', 1, None, 'pinch', 'spices', (1, 'jar', 3.50)),
+    ('chicken thighs', 24, 'weight', 'lb', 'meat', (2, 'lb', 12.00)),
+    ('butternut squash', 2, 'count', 'whole', 'produce', (2, 'whole', 1.50)),
+])
+def test_shopping_entry(name, base, dimension, unit, category, expected):
+    entry = shopping_entry(name, base, dimension, unit, category)
+    assert (entry['amount'], entry['unit'], entry['estimated_price']) == expected
+
+
+@pytest.mark.parametrize('name, keyword', [
+    ('salted butter', 'butter'),
+    ('peanut butter', None),
+    ('almond butter', None),
+    ('heavy cream', 'cream'),
+    ('ice cream', None),
+    ('cream of tartar', None),
+    ('whole milk', 'milk'),
+    ('coconut milk', None),
+    ('eggplant', None),
+])
+def test_find_package_rule(name, keyword):
+    rule = find_package_rule(name)
+    assert (rule.keywords[0] if rule else None) == keyword
+
+
+def test_scale_locally():
+    recipe = {"recipe_name": "Test", "original_servings": 4, "ingredients": [
+        {"name": "salt", "amount": 1.5, "unit": "tsp", "category": "spices"},
+        {"name": "peanut butter", "amount": 2, "unit": "tbsp", "category": "pantry"},
+        {"name": "garlic", "amount": 3, "unit": "clove", "category": "produce"},
+        {"name": "mystery", "amount": 2, "unit": "glugs", "category": "pantry"},
+    ]}
+    scaled, unhandled = scale_locally(recipe, 8)
+
+    assert scaled['scaled_servings'] == 8
+    assert [(i['name'], i['amount'], i['unit']) for i in scaled['scaled_ingredients']] == [
+        ('salt', 1, 'tbsp'), ('peanut butter', 0.25, 'cup'), ('garlic', 6, 'clove'), ('mystery', 4, 'glugs'),
+    ]
+    assert [(i['name'], i['amount'], i['unit']) for i in scaled['shopping_list']] == [
+        ('salt', 1, 'jar'), ('peanut butter', 1, 'cup'), ('garlic', 1, 'head'), ('mystery', 4, 'glugs'),
+    ]
+    assert [i['name'] for i in unhandled] == ['mystery']
@@ -0,0 +1,51 @@
+"""BrowserPool keeps searching on the drivers it has when a launch fails"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from walmart_cart import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self, name: str):
+        self.name = name
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def search(driver, query):
+    time.sleep(0.02)
+    return driver.name, query
+
+
+def test_failed_launch_shrinks_the_pool():
+    launches = []
+
+    def launch():
+        launches.append(threading.current_thread().name)
+        if len(launches) > 1:
+            raise RuntimeError("chrome crashed")
+        return FakeDriver(f"launched-{len(launches)}")
+
+    pool = BrowserPool(launch, 4, first=FakeDriver("first"), delay=0)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda q: pool.run(search, q), range(20)))
+    pool.close()
+
+    assert [query for _, query in results] == list(range(20))
+    assert {name for name, _ in results} <= {"first", "launched-1"}
+    assert pool.size == 2
+    assert isinstance(pool.launch_error, RuntimeError)
+
+
+def test_no_driver_at_all_raises():
+    def launch():
+        raise RuntimeError("no chrome")
+
+    pool = BrowserPool(launch, 2, delay=0)
+    with pytest.raises(RuntimeError):
+        pool.run(search, "milk")
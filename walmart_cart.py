@@ -1,25 +1,88 @@
 """
 Walmart Cart Integration
 Handles browser automation for searching products and adding to cart.
+
+Searches run on a pool of Chrome windows (WALMART_WORKERS, default 1): the
+signed-in browser plus extra ones launched on demand, each searching one
+ingredient at a time. For less memory, WALMART_TABS > 1 instead spreads them
+over that many tabs of the signed-in browser, loading in parallel. Results
+come back in ingredient order. Adding to the cart stays on the signed-in
+browser.
+
+Pages are used as soon as page_readiness sees they're ready (results grid
+filled in, Add to cart button clickable, cart badge updated, network
+idle). The only fixed delays left are politeness floors: a browser or tab
+starts a search no sooner than WALMART_SEARCH_DELAY seconds after its
+previous one, and cart adds are WALMART_ADD_DELAY seconds apart.
+
+The signed-in browser keeps its Chrome profile in WALMART_PROFILE_DIR
+(set it empty for a throwaway profile each run), so a Walmart session and
+the HTTP cache carry over: login() skips the manual sign-in when the page
+already greets a signed-in customer. Extra search browsers use throwaway
+profiles, since Chrome locks a profile to one browser.
+
+WALMART_BLOCK picks a request_blocking profile (off, lean, minimal) that
+every browser and tab applies, so pages skip images, fonts, video and
+trackers; WALMART_BLOCK_URLS adds comma-separated URL patterns to it.
 """
 import os
 import time
 import json
-from typing import Dict, List, Optional
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 from urllib.parse import quote
 from dataclasses import dataclass, asdict
 
+from request_blocking import BlockPolicy, apply_block_options, apply_blocking, block_policy
+
 try:
     import undetected_chromedriver as uc
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import TimeoutException, NoSuchElementException
+    from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+    from page_readiness import (
+        NAVIGATE_JS, NetworkMonitor, cart_count, dom_ready, enable_network_events, results_ready, wait_for,
+        wait_for_cart_update,
+    )
     SELENIUM_AVAILABLE = True
 except ImportError:
     SELENIUM_AVAILABLE = False
     print("Warning: Selenium not available. Install with: pip install undetected-chromedriver selenium")
 
+WALMART_URL = os.getenv('WALMART_BASE_URL', 'https://www.walmart.com')
+DEFAULT_WORKERS = int(os.getenv('WALMART_WORKERS', 1))
+DEFAULT_TABS = int(os.getenv('WALMART_TABS', 1))
+# Politeness floors: least seconds from one search (per browser or tab) or cart add to the next
+DEFAULT_SEARCH_DELAY = float(os.getenv('WALMART_SEARCH_DELAY', 1.0))
+DEFAULT_ADD_DELAY = float(os.getenv('WALMART_ADD_DELAY', 2.0))
+DEFAULT_BLOCK = os.getenv('WALMART_BLOCK', 'off')
+DEFAULT_BLOCK_URLS = os.getenv('WALMART_BLOCK_URLS', '').split(',')
+DEFAULT_PROFILE_DIR = os.getenv('WALMART_PROFILE_DIR', os.path.expanduser('~/.cache/thought_to_table/walmart_profile'))
+# Seconds to wait for a results grid, an Add to Cart button, and any page's DOM
+SEARCH_TIMEOUT = 10.0
+ADD_BUTTON_TIMEOUT = 10.0
+PAGE_TIMEOUT = 30.0
+# Seconds between checks of the tabs when none has finished
+TAB_POLL_INTERVAL = 0.05
+
+ADD_BUTTON_SELECTORS = [
+    "button[data-automation-id='add-to-cart-button']",
+    "button[data-testid='add-to-cart-btn']",
+    "//button[contains(text(), 'Add to cart')]",
+    "//button[contains(@aria-label, 'Add to cart')]",
+]
+
+# The header account button reads "Hi, <name>" when signed in; without one, fall back to the session cookie
+ACCOUNT_SELECTORS = [
+    "[link-identifier='Account']",
+    "[data-automation-id='headerSignIn']",
+]
+SIGNED_IN_GREETING = "Hi,"
+SESSION_COOKIES = ['customer']
+
 
 @dataclass
 class WalmartProduct:
@@ -43,6 +106,8 @@ class CartItem:
     product: Optional[WalmartProduct] = None
     added_to_cart: bool = False
     error: Optional[str] = None
+    search_seconds: Optional[float] = None
+    add_seconds: Optional[float] = None
     
     def to_dict(self):
         result = asdict(self)
@@ -51,31 +116,294 @@ class CartItem:
         return result
 
 
+class BrowserPool:
+    """
+    Chrome drivers shared by search threads. Each search checks one out, so a
+    driver only ever runs one page at a time; drivers are launched as needed
+    up to size, one at a time (undetected_chromedriver patches a shared
+    chromedriver binary on launch). If a launch fails the pool shrinks to the
+    drivers it has and the search waits for one of them.
+    """
+    
+    def __init__(self, launch: Callable, size: int, first=None, delay: float = DEFAULT_SEARCH_DELAY):
+        """
+        Initialize the pool.
+        
+        Args:
+            launch: Returns a new driver
+            size: Most drivers to run at once, including first
+            first: An existing driver to use (and not quit on close)
+            delay: Least seconds from the start of a driver's search to the start of its next
+        """
+        self.launch = launch
+        self.size = max(1, size)
+        self.first = first
+        self.delay = delay
+        self.drivers = [first] if first is not None else []
+        self._idle: queue.Queue = queue.Queue()
+        self._ready_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._launch_lock = threading.Lock()
+        self.launch_error: Optional[Exception] = None
+        if first is not None:
+            self._idle.put(first)
+            
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            grow = len(self.drivers) < self.size
+            if grow:
+                self.drivers.append(None)  # reserve the slot
+        if not grow:
+            return self._wait_idle()
+        try:
+            with self._launch_lock:
+                driver = self.launch()
+        except Exception as e:
+            with self._lock:
+                self.drivers.remove(None)
+                self.size = max(1, len(self.drivers))
+                self.launch_error = e
+                alone = not self.drivers
+            if alone:
+                raise
+            print(f"⚠️  Couldn't launch another browser ({type(e).__name__}); searching with {self.size}")
+            return self._wait_idle()
+        with self._lock:
+            self.drivers[self.drivers.index(None)] = driver
+        return driver
+    
+    def _wait_idle(self):
+        """The next driver a search frees, or the launch error if no driver is left to wait for"""
+        while True:
+            try:
+                return self._idle.get(timeout=1.0)
+            except queue.Empty:
+                with self._lock:
+                    if not self.drivers and self.launch_error is not None:
+                        raise self.launch_error
+        
+    def run(self, search: Callable, *args):
+        """search(driver, *args) on a free driver, once that driver's politeness floor allows"""
+        driver = self._acquire()
+        try:
+            wait = self._ready_at.get(id(driver), 0.0) - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._ready_at[id(driver)] = time.monotonic() + self.delay
+            return search(driver, *args)
+        finally:
+            self._idle.put(driver)
+            
+    def close(self):
+        """Quit every driver the pool launched"""
+        with self._lock:
+            launched = [d for d in self.drivers if d is not None and d is not self.first]
+            self.drivers = [self.first] if self.first is not None else []
+        for driver in launched:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+class TabScheduler:
+    """
+    Searches spread over tabs of one driver. WebDriver runs one command at a
+    time, but a navigation started from script returns at once, so all tabs
+    load in parallel while the scheduler polls them and extracts the result
+    from whichever finishes first, then gives that tab the next search. The
+    driver must use the "none" page load strategy, or each poll would wait
+    for the tab's page to finish loading.
+    """
+    
+    def __init__(self, driver, tabs: int, extract: Callable, delay: float = DEFAULT_SEARCH_DELAY,
+                 timeout: float = SEARCH_TIMEOUT, setup: Optional[Callable] = None):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            driver: Driver whose current tab is kept; tabs - 1 more are opened
+            tabs: Tabs searching at once
+            extract: extract(driver, search_query, url) -> (product, error) for the current tab's results
+            delay: Least seconds from the start of a tab's search to the start of its next
+            timeout: Seconds to wait for a results grid
+            setup: Called with the driver in each tab it opens
+        """
+        self.driver = driver
+        self.extract = extract
+        self.delay = delay
+        self.timeout = timeout
+        self.home = driver.current_window_handle
+        self.handles = [self.home]
+        for _ in range(max(1, tabs) - 1):
+            driver.switch_to.new_window('tab')
+            if setup is not None:
+                setup(driver)
+            self.handles.append(driver.current_window_handle)
+        self.busy: Dict[str, Tuple[Future, str, str, float]] = {}
+        self._ready_at: Dict[str, float] = {}
+        
+    def _start(self, handle: str, future: Future, search_query: str, url: str):
+        self.driver.switch_to.window(handle)
+        self.driver.execute_script(NAVIGATE_JS, url)
+        started = time.monotonic()
+        self.busy[handle] = (future, search_query, url, started)
+        self._ready_at[handle] = started + self.delay
+        
+    def _finish(self, handle: str, result: Tuple[Optional[WalmartProduct], Optional[str]]):
+        future, _, _, started = self.busy.pop(handle)
+        future.set_result((*result, time.monotonic() - started))
+        
+    def _check(self, handle: str) -> bool:
+        """Finish the tab's search if its results are in (or it timed out); True if it finished"""
+        future, search_query, url, started = self.busy[handle]
+        try:
+            self.driver.switch_to.window(handle)
+            if results_ready(self.driver):
+                self._finish(handle, self.extract(self.driver, search_query, url))
+                return True
+            if time.monotonic() - started > self.timeout:
+                self._finish(handle, (None, f"No results found for: {search_query}"))
+                return True
+        except Exception as e:
+            self._finish(handle, (None, f"Error searching: {e}"))
+            return True
+        return False
+        
+    def run(self, jobs: queue.Queue, on_progress: Callable[[], None]):
+        """
+        Run (future, search_query, url) jobs from the queue until it yields
+        None, setting each future to (product, error, seconds). on_progress
+        is called after every round of polling.
+        """
+        waiting: deque = deque()
+        feeding = True
+        while feeding or waiting or self.busy:
+            progressed = False
+            while True:
+                try:
+                    job = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    feeding = False
+                else:
+                    waiting.append(job)
+            now = time.monotonic()
+            for handle in self.handles:
+                if waiting and handle not in self.busy and self._ready_at.get(handle, 0.0) <= now:
+                    self._start(handle, *waiting.popleft())
+                    progressed = True
+            for handle in list(self.busy):
+                progressed = self._check(handle) or progressed
+            on_progress()
+            if not progressed:
+                time.sleep(TAB_POLL_INTERVAL)
+                
+    def close(self):
+        """Close the opened tabs and go back to the driver's original one"""
+        for handle in self.handles[1:]:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        self.driver.switch_to.window(self.home)
+
+
 class WalmartCart:
     """Handles Walmart browser automation for cart management"""
     
-    def __init__(self, headless: bool = False):
+    def __init__(
+        self,
+        headless: bool = False,
+        workers: int = DEFAULT_WORKERS,
+        search_delay: float = DEFAULT_SEARCH_DELAY,
+        base_url: str = WALMART_URL,
+        tabs: int = DEFAULT_TABS,
+        add_delay: float = DEFAULT_ADD_DELAY,
+        profile_dir: Optional[str] = DEFAULT_PROFILE_DIR,
+        block: Union[str, BlockPolicy, None] = DEFAULT_BLOCK,
+        block_urls: Iterable[str] = DEFAULT_BLOCK_URLS,
+    ):
+        """
+        Initialize the cart.
+        
+        Args:
+            headless: Run Chrome without a window
+            workers: Browsers searching at once in search_and_preview (~300-500 MB each)
+            search_delay: Least seconds between the starts of one browser's (or tab's) searches
+            base_url: Store to automate (a local stand-in for benchmarks)
+            tabs: With more than 1, search in that many tabs of the signed-in browser instead of in workers
+            add_delay: Least seconds between the starts of cart adds
+            profile_dir: Chrome user data dir kept between runs for the signed-in browser (None for a fresh one)
+            block: Request blocking profile name (off, lean, minimal) or BlockPolicy for every browser and tab
+            block_urls: More URL patterns to block on top of block
+        """
         if not SELENIUM_AVAILABLE:
             raise ImportError("Selenium is required. Install with: pip install undetected-chromedriver selenium")
         
         self.driver = None
+        self.network: Optional[NetworkMonitor] = None
         self.headless = headless
+        self.workers = max(1, workers)
+        self.tabs = max(1, tabs)
+        self.search_delay = search_delay
+        self.add_delay = add_delay
+        self.profile_dir = os.path.expanduser(profile_dir) if profile_dir else None
+        self.block = block_policy(block, block_urls)
+        self.base_url = base_url.rstrip('/')
         self.logged_in = False
         self.cart_items: List[CartItem] = []
         
-    def _init_browser(self):
-        """Initialize the browser"""
-        if self.driver is not None:
-            return
-            
+    def _launch(self, profile_dir: Optional[str] = None):
+        """Start a Chrome window, with the profile in profile_dir or a throwaway one"""
         options = uc.ChromeOptions()
         if self.headless:
             options.add_argument('--headless')
         options.add_argument('--no-sandbox')
         options.add_argument('--disable-dev-shm-usage')
+        enable_network_events(options)
+        apply_block_options(options, self.block)
+        if self.tabs > 1:
+            # Let tabs load in the background; _open waits for pages itself
+            options.page_load_strategy = 'none'
+        
+        kwargs = {}
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            kwargs['user_data_dir'] = profile_dir
+        
+        driver = uc.Chrome(options=options, **kwargs)
+        driver.maximize_window()
+        apply_blocking(driver, self.block)
+        return driver
         
-        self.driver = uc.Chrome(options=options)
-        self.driver.maximize_window()
+    def _init_browser(self):
+        """Initialize the browser"""
+        if self.driver is not None:
+            return
+        try:
+            self.driver = self._launch(self.profile_dir)
+        except WebDriverException as e:
+            if not self.profile_dir:
+                raise
+            # Usually another Chrome still has the profile open
+            print(f"⚠️ Couldn't open Chrome profile {self.profile_dir} ({e.msg}); using a fresh one")
+            self.driver = self._launch()
+        self.network = NetworkMonitor(self.driver)
+        
+    def _open(self, driver, url: str):
+        """driver.get(url), also waiting for the new page's DOM when pages load in the background"""
+        if self.tabs == 1:
+            driver.get(url)
+            return
+        driver.execute_script(NAVIGATE_JS, url)
+        wait_for(driver, dom_ready, PAGE_TIMEOUT)
         
     def login(self, wait_for_manual: bool = True) -> bool:
         """
@@ -90,33 +418,37 @@ class WalmartCart:
         self._init_browser()
         
         print("\n🛒 Opening Walmart...")
-        self.driver.get("https://www.walmart.com")
-        time.sleep(3)
+        self._open(self.driver, self.base_url)
+        # The sign-in button and header load after the document
+        self.network.wait_idle()
         
-        if wait_for_manual:
+        if self.signed_in():
+            print("✅ Signed in from saved profile")
+        elif wait_for_manual:
             print("\n" + "="*50)
             print("📱 Please log in to your Walmart account")
             print("   (Sign in button is in the top right)")
             print("="*50)
             input("\nPress ENTER when you're logged in... ")
+            if self.profile_dir:
+                print(f"💾 Sign-in kept in {self.profile_dir} for next time")
             
         self.logged_in = True
         print("✅ Ready to shop!")
         return True
         
-    def search_product(self, query: str, category: str = "") -> Optional[WalmartProduct]:
-        """
-        Search for a product on Walmart.
-        
-        Args:
-            query: Search query string
-            category: Optional category hint (produce, dairy, meat, etc.)
-            
-        Returns:
-            WalmartProduct or None if not found
-        """
-        self._init_browser()
-        
+    def signed_in(self, driver=None) -> bool:
+        """Whether the open Walmart page belongs to a signed-in session"""
+        driver = driver or self.driver
+        for selector in ACCOUNT_SELECTORS:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                return any(element.text.strip().startswith(SIGNED_IN_GREETING) for element in elements)
+        return any(driver.get_cookie(name) for name in SESSION_COOKIES)
+        
+    @staticmethod
+    def _search_query(query: str, category: str = "") -> str:
+        """Search terms for an ingredient"""
         # Optimize search query based on category
         if category.lower() == 'produce':
             search_query = f"fresh {query}"
@@ -128,45 +460,65 @@ class WalmartCart:
             search_query = f"{query} spice seasoning"
         else:
             search_query = query
+        return search_query
+        
+    def _search_url(self, search_query: str) -> str:
+        return f"{self.base_url}/search?q={quote(search_query)}"
+        
+    def _search_on(self, driver, search_query: str) -> Optional[WalmartProduct]:
+        """First search result for search_query in driver; TimeoutException if there are none"""
+        url = self._search_url(search_query)
+        self._open(driver, url)
+        
+        # Wait for the product grid to fill in
+        WebDriverWait(driver, SEARCH_TIMEOUT, poll_frequency=0.1).until(results_ready)
+        return self._first_result(driver.find_element(By.CSS_SELECTOR, "div[data-item-id]"), url)
+        
+    def _first_result(self, product_container, url: str) -> Optional[WalmartProduct]:
+        """Product details from a results grid tile"""
+        # Extract product details
+        product_name = self._get_text_safe(product_container, [
+            "span[data-automation-id='product-title']",
+            "[data-automation-id='product-title']",
+            "span.normal",
+        ])
+        
+        price = self._get_text_safe(product_container, [
+            "[data-automation-id='product-price'] span.f2",
+            "[data-automation-id='product-price']",
+            "div[data-automation-id='product-price']",
+            ".price-main",
+        ])
+        
+        product_url = self._get_link_safe(product_container)
+        item_id = product_container.get_attribute('data-item-id')
+        
+        if product_name:
+            return WalmartProduct(
+                name=product_name,
+                price=price or "Price not found",
+                url=product_url or url,
+                item_id=item_id
+            )
+        return None
+        
+    def search_product(self, query: str, category: str = "") -> Optional[WalmartProduct]:
+        """
+        Search for a product on Walmart.
+        
+        Args:
+            query: Search query string
+            category: Optional category hint (produce, dairy, meat, etc.)
             
-        encoded_query = quote(search_query)
-        url = f"https://www.walmart.com/search?q={encoded_query}"
+        Returns:
+            WalmartProduct or None if not found
+        """
+        self._init_browser()
+        search_query = self._search_query(query, category)
         
         print(f"  🔍 Searching: {search_query}")
-        self.driver.get(url)
-        time.sleep(2)
-        
         try:
-            # Wait for product grid
-            product_container = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-item-id]"))
-            )
-            
-            # Extract product details
-            product_name = self._get_text_safe(product_container, [
-                "span[data-automation-id='product-title']",
-                "[data-automation-id='product-title']",
-                "span.normal",
-            ])
-            
-            price = self._get_text_safe(product_container, [
-                "[data-automation-id='product-price'] span.f2",
-                "[data-automation-id='product-price']",
-                "div[data-automation-id='product-price']",
-                ".price-main",
-            ])
-            
-            product_url = self._get_link_safe(product_container)
-            item_id = product_container.get_attribute('data-item-id')
-            
-            if product_name:
-                return WalmartProduct(
-                    name=product_name,
-                    price=price or "Price not found",
-                    url=product_url or url,
-                    item_id=item_id
-                )
-                
+            return self._search_on(self.driver, search_query)
         except TimeoutException:
             print(f"  ⚠️ No results found for: {search_query}")
         except Exception as e:
@@ -174,6 +526,24 @@ class WalmartCart:
             
         return None
     
+    def _find(self, driver, query: str, category: str) -> Tuple[Optional[WalmartProduct], Optional[str], float]:
+        """search_product for a pool thread: (product, None or why not, seconds), without printing"""
+        search_query = self._search_query(query, category)
+        start = time.monotonic()
+        try:
+            product = self._search_on(driver, search_query)
+        except TimeoutException:
+            return None, f"No results found for: {search_query}", time.monotonic() - start
+        except Exception as e:
+            return None, f"Error searching: {e}", time.monotonic() - start
+        error = None if product else f"No product details for: {search_query}"
+        return product, error, time.monotonic() - start
+    
+    def _extract(self, driver, search_query: str, url: str) -> Tuple[Optional[WalmartProduct], Optional[str]]:
+        """_find for a tab whose results have loaded"""
+        product = self._first_result(driver.find_element(By.CSS_SELECTOR, "div[data-item-id]"), url)
+        return product, None if product else f"No product details for: {search_query}"
+    
     def _get_text_safe(self, element, selectors: List[str]) -> Optional[str]:
         """Try multiple selectors to get text"""
         for selector in selectors:
@@ -202,6 +572,20 @@ class WalmartCart:
                 pass
         return None
     
+    def _await_cart_update(self, badge: Optional[str]) -> bool:
+        """Wait for the cart to take an add whose click happened with the badge at badge"""
+        return wait_for_cart_update(self.driver, badge, self.network)
+    
+    @staticmethod
+    def _add_button(driver):
+        """A clickable Add to Cart button, trying multiple selectors, or False"""
+        for selector in ADD_BUTTON_SELECTORS:
+            by = By.XPATH if selector.startswith("//") else By.CSS_SELECTOR
+            for button in driver.find_elements(by, selector):
+                if button.is_displayed() and button.is_enabled():
+                    return button
+        return False
+    
     def add_to_cart(self, product: WalmartProduct) -> bool:
         """
         Add a product to the Walmart cart.
@@ -222,56 +606,41 @@ class WalmartCart:
         
         try:
             # Navigate to product page
-            self.driver.get(product.url)
-            time.sleep(2)
-            
-            # Try multiple Add to Cart button selectors
-            add_button_selectors = [
-                "button[data-automation-id='add-to-cart-button']",
-                "button[data-testid='add-to-cart-btn']",
-                "//button[contains(text(), 'Add to cart')]",
-                "//button[contains(@aria-label, 'Add to cart')]",
-            ]
+            self._open(self.driver, product.url)
             
-            added = False
-            for selector in add_button_selectors:
-                try:
-                    if selector.startswith("//"):
-                        button = WebDriverWait(self.driver, 5).until(
-                            EC.element_to_be_clickable((By.XPATH, selector))
-                        )
-                    else:
-                        button = WebDriverWait(self.driver, 5).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                        )
-                    button.click()
-                    added = True
-                    break
-                except:
-                    continue
-                    
-            if added:
-                time.sleep(2)  # Wait for cart update
-                print(f"  ✅ Added!")
-                return True
-            else:
+            # Wait for whichever Add to Cart button the page has to become clickable
+            button = wait_for(self.driver, self._add_button, ADD_BUTTON_TIMEOUT)
+            if button is None:
                 print(f"  ⚠️ Could not find Add to Cart button")
                 return False
                 
+            badge = cart_count(self.driver)
+            button.click()
+            if not self._await_cart_update(badge):
+                print(f"  ⚠️ Cart didn't confirm the add yet")
+            print(f"  ✅ Added!")
+            return True
+                
         except Exception as e:
             print(f"  ❌ Error adding to cart: {e}")
             return False
     
-    def search_and_preview(self, ingredients: List[Dict]) -> List[CartItem]:
+    def search_and_preview(self, ingredients: Iterable[Dict]) -> List[CartItem]:
         """
         Search for all ingredients and return preview.
         Does NOT add to cart yet.
         
+        Searches run on up to self.workers browsers at once, or with
+        self.tabs > 1 in that many tabs of the signed-in browser. Browsers and
+        tabs beyond the signed-in one are opened as needed and closed at the end.
+        
         Args:
-            ingredients: List of ingredient dicts with name, amount, unit, category
+            ingredients: Ingredient dicts with name, amount, unit, category. May be
+                an iterator (e.g. RecipeAssistant.process_recipe_streaming), in which
+                case each item is searched as soon as it is produced
             
         Returns:
-            List of CartItem objects with search results
+            List of CartItem objects with search results, in ingredient order
         """
         self._init_browser()
         self.cart_items = []
@@ -280,34 +649,94 @@ class WalmartCart:
         print("🔍 SEARCHING WALMART FOR INGREDIENTS")
         print("="*50)
         
-        for ing in ingredients:
-            name = ing.get('name', 'Unknown')
-            amount = ing.get('amount', '')
-            unit = ing.get('unit', '')
-            category = ing.get('category', '')
-            
-            cart_item = CartItem(
-                ingredient_name=name,
-                search_query=name,
-                quantity_needed=f"{amount} {unit}".strip()
-            )
-            
-            print(f"\n📦 {name} ({cart_item.quantity_needed})")
-            
-            product = self.search_product(name, category)
-            if product:
-                cart_item.product = product
-                print(f"  ✅ Found: {product.name[:60]}")
-                print(f"     💰 {product.price}")
-            else:
-                cart_item.error = "Product not found"
-                print(f"  ❌ Not found")
-                
-            self.cart_items.append(cart_item)
-            time.sleep(1)  # Rate limiting
-            
+        # (CartItem, Future of (product, error)) in ingredient order, until reported
+        pending: deque = deque()
+        if self.tabs > 1:
+            self._search_tabs(ingredients, pending)
+        else:
+            self._search_pool(ingredients, pending)
         return self.cart_items
     
+    @staticmethod
+    def _cart_item(ing: Dict) -> Tuple[CartItem, str]:
+        """CartItem and category for an ingredient dict"""
+        name = ing.get('name', 'Unknown')
+        amount = ing.get('amount', '')
+        unit = ing.get('unit', '')
+        cart_item = CartItem(
+            ingredient_name=name,
+            search_query=name,
+            quantity_needed=f"{amount} {unit}".strip()
+        )
+        return cart_item, ing.get('category', '')
+    
+    def _report(self, pending: deque, wait: bool = False):
+        """Report finished searches once everything before them is reported (all of them with wait)"""
+        while pending and (wait or pending[0][1].done()):
+            self._preview(*pending.popleft())
+    
+    def _search_pool(self, ingredients: Iterable[Dict], pending: deque):
+        pool = BrowserPool(self._launch, self.workers, first=self.driver, delay=self.search_delay)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='walmart-search') as executor:
+                for ing in ingredients:
+                    cart_item, category = self._cart_item(ing)
+                    search = executor.submit(pool.run, self._find, cart_item.ingredient_name, category)
+                    pending.append((cart_item, search))
+                    self._report(pending)
+                self._report(pending, wait=True)
+        finally:
+            pool.close()
+    
+    def _search_tabs(self, ingredients: Iterable[Dict], pending: deque):
+        # The scheduler needs the driver to itself, so a thread reads the (possibly streaming) ingredients
+        jobs: queue.Queue = queue.Queue()
+        failure: List[BaseException] = []
+        
+        def feed():
+            try:
+                for ing in ingredients:
+                    cart_item, category = self._cart_item(ing)
+                    search_query = self._search_query(cart_item.ingredient_name, category)
+                    future: Future = Future()
+                    pending.append((cart_item, future))
+                    jobs.put((future, search_query, self._search_url(search_query)))
+            except BaseException as e:
+                failure.append(e)
+            finally:
+                jobs.put(None)
+        
+        feeder = threading.Thread(target=feed, name='walmart-ingredients', daemon=True)
+        feeder.start()
+        scheduler = TabScheduler(self.driver, self.tabs, self._extract, self.search_delay,
+                                 setup=lambda driver: apply_blocking(driver, self.block))
+        try:
+            scheduler.run(jobs, lambda: self._report(pending))
+        finally:
+            scheduler.close()
+        feeder.join()
+        self._report(pending, wait=True)
+        if failure:
+            raise failure[0]
+    
+    def _preview(self, cart_item: CartItem, search: Future):
+        """Record and print one finished search"""
+        try:
+            product, error, seconds = search.result()
+        except Exception as e:
+            product, error, seconds = None, f"Search failed: {e}", 0.0
+        cart_item.search_seconds = round(seconds, 3)
+        print(f"\n📦 {cart_item.ingredient_name} ({cart_item.quantity_needed})")
+        if product:
+            cart_item.product = product
+            print(f"  ✅ Found: {product.name[:60]}")
+            print(f"     💰 {product.price}")
+        else:
+            cart_item.error = "Product not found"
+            print(f"  ⚠️ {error}")
+            print(f"  ❌ Not found")
+        self.cart_items.append(cart_item)
+    
     def add_all_to_cart(self, items: Optional[List[CartItem]] = None) -> Dict:
         """
         Add all found products to cart.
@@ -329,6 +758,7 @@ class WalmartCart:
         
         success = 0
         failed = 0
+        next_add = 0.0
         
         for item in items:
             if not item.product:
@@ -338,14 +768,20 @@ class WalmartCart:
                 
             print(f"\n📦 {item.ingredient_name}")
             
+            # Rate limiting
+            wait = next_add - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            start = time.monotonic()
+            next_add = start + self.add_delay
+            
             if self.add_to_cart(item.product):
                 item.added_to_cart = True
                 success += 1
             else:
                 item.error = "Failed to add to cart"
                 failed += 1
-                
-            time.sleep(2)  # Rate limiting
+            item.add_seconds = round(time.monotonic() - start, 3)
             
         print("\n" + "="*50)
         print(f"✅ Added: {success} items")
@@ -407,15 +843,22 @@ class WalmartCart:
             self.driver = None
 
 
-def interactive_shopping(ingredients: List[Dict], auto_add: bool = False):
+def interactive_shopping(
+    ingredients: Iterable[Dict],
+    auto_add: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    tabs: int = DEFAULT_TABS,
+):
     """
     Interactive shopping flow with preview and confirmation.
     
     Args:
-        ingredients: List of ingredient dicts
+        ingredients: Ingredient dicts, or an iterator that streams them
         auto_add: If True, skip confirmation and add directly
+        workers: Browsers searching at once
+        tabs: Tabs of one browser searching at once, instead of workers
     """
-    cart = WalmartCart()
+    cart = WalmartCart(workers=workers, tabs=tabs)
     
     try:
         # Login first